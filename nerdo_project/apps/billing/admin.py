@@ -1,7 +1,48 @@
 from django.contrib import admin
-from .models import MpesaTransaction
+from django.db.models import Sum
+from .models import MpesaTransaction, ProviderUsage
 
 @admin.register(MpesaTransaction)
 class MpesaTransactionAdmin(admin.ModelAdmin):
     list_display = ('user', 'amount', 'phone_number', 'status', 'transaction_date')
-    list_filter = ('status', 'transaction_date')
\ No newline at end of file
+    list_filter = ('status', 'transaction_date')
+
+@admin.register(ProviderUsage)
+class ProviderUsageAdmin(admin.ModelAdmin):
+    """
+    Daily provider usage. The changelist shows totals per provider/feature
+    and the costliest users for the current filters.
+    """
+    change_list_template = 'admin/billing/providerusage/change_list.html'
+    list_display = ('day', 'provider', 'feature', 'user', 'calls', 'units', 'cost')
+    list_filter = ('provider', 'feature', 'day')
+    search_fields = ('user__username',)
+    date_hierarchy = 'day'
+    list_select_related = ('user',)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def changelist_view(self, request, extra_context=None):
+        response = super().changelist_view(request, extra_context)
+        try:
+            queryset = response.context_data['cl'].queryset
+        except (AttributeError, KeyError):
+            return response  # Redirect or error page
+
+        totals = {'calls': Sum('calls'), 'units': Sum('units'), 'cost': Sum('cost')}
+        response.context_data['usage_by_provider'] = (
+            queryset.order_by().values('provider', 'feature')
+            .annotate(**totals)
+            .order_by('provider', '-cost', '-units')
+        )
+        response.context_data['top_users'] = (
+            queryset.order_by().filter(user__isnull=False)
+            .values('user__username')
+            .annotate(**totals)
+            .order_by('-cost', '-units')[:10]
+        )
+        return response
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.8 on 2026-10-17 23:40
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('billing', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProviderUsage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('provider', models.CharField(choices=[('gemini', 'Gemini'), ('youtube', 'YouTube Data API'), ('africastalking', "Africa's Talking SMS"), ('mpesa', 'M-Pesa STK Push')], max_length=20)),
+                ('feature', models.CharField(help_text='What the call was for, e.g. roadmap, otp, job_reminder', max_length=50)),
+                ('calls', models.PositiveIntegerField(default=0)),
+                ('units', models.BigIntegerField(default=0, help_text='Gemini tokens, YouTube quota units, SMS messages, STK pushes')),
+                ('cost', models.DecimalField(decimal_places=4, default=0, help_text='KES', max_digits=12)),
+                ('user', models.ForeignKey(blank=True, help_text='Empty for system work (cache warming, revalidation)', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='provider_usage', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name_plural': 'provider usage',
+                'ordering': ['-day', 'provider'],
+                'indexes': [models.Index(fields=['provider', 'day'], name='provider_usage_day_idx')],
+                'constraints': [models.UniqueConstraint(fields=('day', 'user', 'provider', 'feature'), name='unique_provider_usage_per_day')],
+            },
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.8 on 2026-10-18 00:25
+
+from django.db import migrations, models
+
+
+def merge_system_rows(apps, schema_editor):
+    """Adds duplicate system rows (no user) into the oldest row of their day x provider x feature."""
+    ProviderUsage = apps.get_model('billing', 'ProviderUsage')
+
+    duplicates = (
+        ProviderUsage.objects.filter(user__isnull=True)
+        .values('day', 'provider', 'feature')
+        .annotate(total=models.Count('id'))
+        .filter(total__gt=1)
+    )
+    for key in duplicates:
+        rows = list(ProviderUsage.objects.filter(user__isnull=True, day=key['day'], provider=key['provider'], feature=key['feature']).order_by('id'))
+        kept = rows[0]
+        for row in rows[1:]:
+            kept.calls += row.calls
+            kept.units += row.units
+            kept.cost += row.cost
+        kept.save(update_fields=['calls', 'units', 'cost'])
+        ProviderUsage.objects.filter(id__in=[row.id for row in rows[1:]]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('billing', '0002_provider_usage'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_system_rows, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='providerusage',
+            constraint=models.UniqueConstraint(condition=models.Q(('user__isnull', True)), fields=('day', 'provider', 'feature'), name='unique_system_provider_usage_per_day'),
+        ),
+    ]
@@ -1,4 +1,7 @@
 from django.db import models
+from django.db.models import F, Q
+from django.db.models.signals import pre_delete
+from django.dispatch import receiver
 from django.contrib.auth.models import User
 
 class MpesaTransaction(models.Model):
@@ -12,4 +15,58 @@ class MpesaTransaction(models.Model):
     checkout_request_id = models.CharField(max_length=100, null=True, blank=True)
 
     def __str__(self):
-        return f"{self.user.username} - {self.amount} - {self.status}"
\ No newline at end of file
+        return f"{self.user.username} - {self.amount} - {self.status}"
+
+class ProviderUsage(models.Model):
+    """
+    Daily ledger of outbound provider calls, one row per
+    day x user x provider x feature. Written in batches by apps/billing/usage.py.
+    """
+    PROVIDER_GEMINI = 'gemini'
+    PROVIDER_YOUTUBE = 'youtube'
+    PROVIDER_SMS = 'africastalking'
+    PROVIDER_MPESA = 'mpesa'
+    PROVIDER_CHOICES = [
+        (PROVIDER_GEMINI, 'Gemini'),
+        (PROVIDER_YOUTUBE, 'YouTube Data API'),
+        (PROVIDER_SMS, "Africa's Talking SMS"),
+        (PROVIDER_MPESA, 'M-Pesa STK Push'),
+    ]
+
+    day = models.DateField()
+    user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='provider_usage', help_text="Empty for system work (cache warming, revalidation)")
+    provider = models.CharField(max_length=20, choices=PROVIDER_CHOICES)
+    feature = models.CharField(max_length=50, help_text="What the call was for, e.g. roadmap, otp, job_reminder")
+    calls = models.PositiveIntegerField(default=0)
+    units = models.BigIntegerField(default=0, help_text="Gemini tokens, YouTube quota units, SMS messages, STK pushes")
+    cost = models.DecimalField(max_digits=12, decimal_places=4, default=0, help_text="KES")
+
+    class Meta:
+        ordering = ['-day', 'provider']
+        verbose_name_plural = 'provider usage'
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'user', 'provider', 'feature'], name='unique_provider_usage_per_day'),
+            # NULLs never collide above, so system rows need their own constraint
+            models.UniqueConstraint(fields=['day', 'provider', 'feature'], condition=Q(user__isnull=True), name='unique_system_provider_usage_per_day'),
+        ]
+        indexes = [
+            models.Index(fields=['provider', 'day'], name='provider_usage_day_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.provider}/{self.feature}: {self.calls} calls"
+
+
+@receiver(pre_delete, sender=User)
+def fold_provider_usage(sender, instance, **kwargs):
+    """
+    Deleting a user turns their usage rows into system rows (SET_NULL). Rows
+    whose day x provider x feature already has a system row are added to it
+    first, so the system row constraint holds.
+    """
+    for row in ProviderUsage.objects.filter(user=instance):
+        merged = ProviderUsage.objects.filter(
+            day=row.day, user__isnull=True, provider=row.provider, feature=row.feature,
+        ).update(calls=F('calls') + row.calls, units=F('units') + row.units, cost=F('cost') + row.cost)
+        if merged:
+            row.delete()
@@ -0,0 +1,30 @@
+import threading
+
+_patched = False
+_patch_lock = threading.Lock()
+
+
+def get_mpesa_client():
+    """
+    A django_daraja MpesaClient, with the SDK imported on first use.
+
+    Importing django_daraja.mpesa.core at startup cost every web worker its
+    boot time and memory even if it never took a payment.
+
+    django_daraja calls requests.get/post directly (token + STK push). On
+    first use its modules are pointed at our pooled M-Pesa session so those
+    calls reuse keep-alive connections and get timeouts/retries.
+    """
+    global _patched
+    from django_daraja.mpesa import core, utils
+
+    if not _patched:
+        with _patch_lock:
+            if not _patched:
+                from nerdo_project.http_client import SessionModule
+
+                core.requests = SessionModule('mpesa')
+                utils.requests = SessionModule('mpesa')
+                _patched = True
+
+    return core.MpesaClient()
@@ -0,0 +1,134 @@
+"""
+Provider cost ledger.
+
+Every outbound call that costs money or quota (Gemini tokens, YouTube quota
+units, SMS, STK pushes) is reported with record_usage(). Calls are summed in
+memory per day x user x provider x feature and written to ProviderUsage in
+one batch every USAGE_FLUSH_INTERVAL seconds (or USAGE_FLUSH_MAX_KEYS
+distinct rows). Most calls only touch the buffer; the one that makes a flush
+due writes the whole batch inline before returning.
+
+Deep call sites (YouTube searches on the thread pool, Gemini retries) don't
+know who they work for; the caller sets that once:
+
+    with usage_context(user=learning_path.user_id, feature='roadmap'):
+        generate_complete_roadmap(...)
+"""
+import time
+import atexit
+import logging
+import threading
+from decimal import Decimal, InvalidOperation
+from contextlib import contextmanager
+from contextvars import ContextVar
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+from .models import ProviderUsage
+
+logger = logging.getLogger(__name__)
+
+_context = ContextVar('provider_usage_context', default=(None, ''))
+
+_buffer = {}  # (day, user_id, provider, feature) -> [calls, units, cost]
+_buffer_lock = threading.Lock()
+_last_flush = time.monotonic()
+
+
+@contextmanager
+def usage_context(user=None, feature=''):
+    """Attributes provider calls made inside the block to a user (or id) and feature."""
+    token = _context.set((getattr(user, 'pk', user), feature))
+    try:
+        yield
+    finally:
+        try:
+            _context.reset(token)
+        except ValueError:
+            # A streamed response may be resumed in another context (ASGI)
+            _context.set((None, ''))
+
+
+def parse_cost(value):
+    """Africa's Talking reports cost as e.g. 'KES 0.8000'."""
+    try:
+        return Decimal(str(value).split()[-1])
+    except (IndexError, InvalidOperation):
+        return Decimal('0')
+
+
+def gemini_cost(tokens):
+    return Decimal(str(getattr(settings, 'GEMINI_COST_PER_1K_TOKENS', '0'))) * tokens / 1000
+
+
+def record_usage(provider, units=1, cost=0, user=None, feature=None):
+    """
+    Adds one provider call to the ledger buffer, flushing it when due.
+
+    Args:
+        provider (str): One of ProviderUsage.PROVIDER_CHOICES
+        units (int): Tokens, quota units or messages the call used
+        cost (Decimal): Money spent, in KES
+        user: User or user id (defaults to the current usage_context)
+        feature (str): Defaults to the current usage_context, else 'other'
+    """
+    context_user, context_feature = _context.get()
+    user_id = getattr(user, 'pk', user) if user is not None else context_user
+    key = (timezone.localdate(), user_id, provider, feature or context_feature or 'other')
+
+    with _buffer_lock:
+        totals = _buffer.setdefault(key, [0, 0, Decimal('0')])
+        totals[0] += 1
+        totals[1] += units
+        totals[2] += Decimal(str(cost))
+        due = (
+            len(_buffer) >= getattr(settings, 'USAGE_FLUSH_MAX_KEYS', 200)
+            or time.monotonic() - _last_flush >= getattr(settings, 'USAGE_FLUSH_INTERVAL', 10)
+        )
+
+    if due:
+        flush_usage()
+
+
+def flush_usage():
+    """
+    Writes the buffered totals (one UPDATE per existing row, INSERT for a new row).
+    Totals that fail to write are put back and retried on the next flush.
+    """
+    global _buffer, _last_flush
+    with _buffer_lock:
+        pending, _buffer = _buffer, {}
+        _last_flush = time.monotonic()
+
+    for key, totals in pending.items():
+        try:
+            _write_row(key, *totals)
+        except Exception as e:
+            logger.error(f"Could not write provider usage {key}: {e}")
+            with _buffer_lock:
+                merged = _buffer.setdefault(key, [0, 0, Decimal('0')])
+                for i, value in enumerate(totals):
+                    merged[i] += value
+
+
+def _write_row(key, calls, units, cost):
+    day, user_id, provider, feature = key
+    rows = ProviderUsage.objects.filter(day=day, user_id=user_id, provider=provider, feature=feature)
+    increments = {'calls': F('calls') + calls, 'units': F('units') + units, 'cost': F('cost') + cost}
+
+    if rows.update(**increments):
+        return
+    try:
+        with transaction.atomic():
+            ProviderUsage.objects.create(
+                day=day, user_id=user_id, provider=provider, feature=feature,
+                calls=calls, units=units, cost=cost,
+            )
+    except IntegrityError:
+        # Another process created the row first
+        rows.update(**increments)
+
+
+# Don't lose the last few seconds of calls when a worker or command exits
+atexit.register(flush_usage)
@@ -5,8 +5,9 @@ from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.contrib.auth.models import User
 from django.conf import settings # Import settings to debug keys
-from django_daraja.mpesa.core import MpesaClient
-from .models import MpesaTransaction
+from .models import MpesaTransaction, ProviderUsage
+from .usage import record_usage
+from .mpesa import get_mpesa_client
 from .forms import PaymentForm
 import json
 
@@ -41,11 +42,12 @@ def pay_premium(request):
             
             callback_url = 'http://mysite.com/billing/callback' 
 
-            cl = MpesaClient()
+            cl = get_mpesa_client()
             try:
                 # 4. INITIATE STK PUSH
                 print(f"Sending request to Safaricom...")
                 response = cl.stk_push(phone_number, amount, account_reference, transaction_desc, callback_url)
+                record_usage(ProviderUsage.PROVIDER_MPESA, user=request.user, feature='premium')
                 
                 print(f"Safaricom Response Code: {response.response_code}")
                 print(f"Safaricom Description: {response.response_description}")
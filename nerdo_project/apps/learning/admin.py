@@ -1,3 +1,35 @@
 from django.contrib import admin
+from .models import YouTubeKeyQuota, CircuitBreaker, Video
+from .catalog import invalidate_catalog
 
-# Register your models here.
+@admin.register(YouTubeKeyQuota)
+class YouTubeKeyQuotaAdmin(admin.ModelAdmin):
+    list_display = ('label', 'quota_day', 'units_used', 'cooldown_until', 'last_error', 'last_used_at')
+    readonly_fields = ('key_fingerprint', 'label')
+
+
+@admin.register(CircuitBreaker)
+class CircuitBreakerAdmin(admin.ModelAdmin):
+    list_display = ('name', 'state', 'consecutive_failures', 'trip_count', 'opened_at', 'retry_at', 'last_error', 'last_success_at')
+    readonly_fields = ('name', 'trip_count', 'opened_at', 'last_failure_at', 'last_success_at')
+    actions = ['close_circuit']
+
+    @admin.action(description="Close selected circuits (resume calls now)")
+    def close_circuit(self, request, queryset):
+        queryset.update(state=CircuitBreaker.STATE_CLOSED, consecutive_failures=0, retry_at=None)
+
+
+@admin.register(Video)
+class VideoAdmin(admin.ModelAdmin):
+    list_display = ('video_id', 'title', 'channel', 'duration', 'view_count', 'curated', 'excluded', 'available', 'updated_at')
+    list_filter = ('curated', 'excluded', 'available')
+    list_editable = ('curated', 'excluded')
+    search_fields = ('video_id', 'title', 'channel', 'catalog_topics')
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        invalidate_catalog()
+
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        invalidate_catalog()
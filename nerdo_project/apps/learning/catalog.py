@@ -0,0 +1,181 @@
+"""
+Local video catalog, searched before the YouTube API.
+
+Every video a roadmap has used lives in the Video table, tagged with the
+phase titles it was picked for. This module keeps an in-process BM25 index
+over those videos so a phase like "Python Data Structures" can be answered
+from videos we already vetted instead of spending 100 quota units on
+search.list.
+"""
+import re
+import math
+import time
+import logging
+import threading
+from collections import Counter
+from django.conf import settings
+from .models import Video
+from .roadmap_storage import VIDEO_FIELDS
+
+logger = logging.getLogger(__name__)
+
+TOKEN = re.compile(r'[a-z0-9][a-z0-9+#]*')
+STOP_WORDS = {
+    'a', 'an', 'and', 'the', 'of', 'to', 'in', 'for', 'on', 'with', 'by', 'at', 'from', 'into',
+    'is', 'are', 'how', 'what', 'your', 'you', 'part', 'tutorial', 'course', 'full', 'complete',
+}
+
+# Field weights: a video picked for a phase title is the strongest signal
+FIELD_WEIGHTS = (('catalog_topics', 3), ('title', 2), ('description', 1), ('channel', 1))
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+CURATED_BOOST = 1.25
+
+
+def tokenize(text):
+    return [token for token in TOKEN.findall(str(text).lower()) if token not in STOP_WORDS]
+
+
+class CatalogIndex:
+    """Inverted BM25 index over catalog videos (immutable once built)."""
+
+    def __init__(self, videos):
+        self.videos = []
+        self.curated = []
+        self.doc_lengths = []
+        self.postings = {}  # term -> [(doc, term frequency)]
+
+        for video in videos:
+            terms = Counter()
+            for field, weight in FIELD_WEIGHTS:
+                for token in tokenize(video.get(field, '')):
+                    terms[token] += weight
+            video.pop('catalog_topics', None)  # Index-only field
+
+            doc = len(self.videos)
+            self.curated.append(video.pop('curated'))
+            self.videos.append(video)
+            self.doc_lengths.append(sum(terms.values()))
+            for term, frequency in terms.items():
+                self.postings.setdefault(term, []).append((doc, frequency))
+
+        self.size = len(self.videos)
+        self.avg_length = (sum(self.doc_lengths) / self.size) if self.size else 0
+
+    def idf(self, term):
+        df = len(self.postings.get(term, ()))
+        return math.log(1 + (self.size - df + 0.5) / (df + 0.5))
+
+    def search(self, query, limit):
+        """
+        Ranks videos for a query.
+
+        Each hit carries a BM25 score (for ranking) and a coverage in [0, 1]:
+        the idf-weighted share of the query's terms the video matches. Words
+        the catalog has never seen count against coverage, so novel topics
+        fall through to the API.
+
+        Returns:
+            list: (coverage, bm25 score, video dict), best first
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms or not self.size:
+            return []
+
+        idfs = {term: self.idf(term) for term in terms}
+        total_idf = sum(idfs.values())
+        scores = {}
+        matched_idf = {}
+
+        for term in terms:
+            for doc, frequency in self.postings.get(term, ()):
+                length_norm = 1 - BM25_B + BM25_B * self.doc_lengths[doc] / self.avg_length
+                scores[doc] = scores.get(doc, 0) + idfs[term] * frequency * (BM25_K1 + 1) / (frequency + BM25_K1 * length_norm)
+                matched_idf[doc] = matched_idf.get(doc, 0) + idfs[term]
+
+        ranked = []
+        for doc, score in scores.items():
+            if self.curated[doc]:
+                score *= CURATED_BOOST
+            ranked.append((matched_idf[doc] / total_idf, score, doc))
+        ranked.sort(key=lambda hit: (round(hit[0], 2), hit[1]), reverse=True)
+
+        return [(coverage, score, dict(self.videos[doc])) for coverage, score, doc in ranked[:limit]]
+
+
+_index = None
+_index_built_at = 0
+_index_lock = threading.Lock()
+
+
+def build_index():
+    videos = Video.objects.filter(available=True, excluded=False).values(
+        'video_id', 'curated', 'catalog_topics', *VIDEO_FIELDS
+    )
+    index = CatalogIndex(
+        {key: value for key, value in video.items() if value is not None}
+        for video in videos
+    )
+    logger.info(f"Built video catalog index ({index.size} videos, {len(index.postings)} terms)")
+    return index
+
+
+def get_index():
+    """The process-wide index, rebuilt every VIDEO_CATALOG_INDEX_TTL seconds."""
+    global _index, _index_built_at
+    ttl = getattr(settings, 'VIDEO_CATALOG_INDEX_TTL', 600)
+
+    if _index is None or time.monotonic() - _index_built_at > ttl:
+        with _index_lock:
+            if _index is None or time.monotonic() - _index_built_at > ttl:
+                _index = build_index()
+                _index_built_at = time.monotonic()
+    return _index
+
+
+def invalidate_catalog():
+    """
+    Forces a rebuild on the next lookup in this process (e.g. after admin
+    curation). Other processes pick up new rankings on their next TTL
+    rebuild; exclusions apply everywhere at once (see find_catalog_videos).
+    """
+    global _index
+    with _index_lock:
+        _index = None
+
+
+def find_catalog_videos(topic, max_results=3):
+    """
+    Videos for a phase from the local catalog, if it has confident matches.
+
+    At least min(max_results, VIDEO_CATALOG_MIN_RESULTS) videos must reach
+    VIDEO_CATALOG_MIN_COVERAGE, otherwise the caller should search the API.
+    Matches are re-checked against the Video table, because the index may
+    predate an admin exclusion or a dead-video check made in another process.
+
+    Returns:
+        list or None
+    """
+    if not getattr(settings, 'VIDEO_CATALOG_ENABLED', True):
+        return None
+
+    min_coverage = getattr(settings, 'VIDEO_CATALOG_MIN_COVERAGE', 0.8)
+    min_results = min(max_results, getattr(settings, 'VIDEO_CATALOG_MIN_RESULTS', 2))
+
+    # A few spare hits stand in for videos dropped by the re-check
+    hits = get_index().search(topic, limit=max_results * 2)
+    videos = [video for coverage, score, video in hits if coverage >= min_coverage]
+    if len(videos) < min_results:
+        return None
+
+    servable = set(
+        Video.objects.filter(video_id__in=[video['video_id'] for video in videos], available=True, excluded=False)
+        .values_list('video_id', flat=True)
+    )
+    videos = [video for video in videos if video['video_id'] in servable][:max_results]
+    if len(videos) < min_results:
+        return None
+
+    logger.info(f"Catalog hit for '{topic}' ({len(videos)} videos)")
+    return videos
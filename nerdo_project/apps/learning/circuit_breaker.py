@@ -0,0 +1,129 @@
+import logging
+from datetime import timedelta
+from django.conf import settings
+from django.db.models import F, Q
+from django.utils import timezone
+from .models import CircuitBreaker
+
+logger = logging.getLogger(__name__)
+
+GEMINI = 'gemini'
+
+
+class CircuitOpen(Exception):
+    """Raised instead of calling a provider whose breaker is open."""
+
+
+def _breaker_settings():
+    return {
+        'threshold': max(1, getattr(settings, 'CIRCUIT_BREAKER_FAILURE_THRESHOLD', 5)),
+        'cooldown': getattr(settings, 'CIRCUIT_BREAKER_COOLDOWN', 60),
+        'probe_timeout': getattr(settings, 'CIRCUIT_BREAKER_PROBE_TIMEOUT', 30),
+    }
+
+
+def _breaker(name):
+    return CircuitBreaker.objects.get_or_create(name=name)[0]
+
+
+def is_open(name):
+    """True while calls to the provider are being skipped (open or probing)."""
+    return CircuitBreaker.objects.filter(name=name).exclude(state=CircuitBreaker.STATE_CLOSED).exists()
+
+
+def allow_request(name):
+    """
+    Decides whether a call to the provider may go ahead.
+
+    Closed: always. Open: only once retry_at has passed, and then only for
+    the one caller whose conditional UPDATE flips the row to half-open (the
+    probe). While the probe is running everyone else keeps failing fast; if
+    the probe never reports back, another one is allowed after
+    CIRCUIT_BREAKER_PROBE_TIMEOUT seconds.
+
+    Returns:
+        bool: True if the caller should make the call
+    """
+    breaker = _breaker(name)
+    if breaker.state == CircuitBreaker.STATE_CLOSED:
+        return True
+
+    now = timezone.now()
+    if breaker.retry_at and breaker.retry_at > now:
+        return False
+
+    claimed = CircuitBreaker.objects.filter(
+        Q(retry_at__isnull=True) | Q(retry_at__lte=now),
+        name=name,
+        state__in=[CircuitBreaker.STATE_OPEN, CircuitBreaker.STATE_HALF_OPEN],
+    ).update(
+        state=CircuitBreaker.STATE_HALF_OPEN,
+        retry_at=now + timedelta(seconds=_breaker_settings()['probe_timeout']),
+    ) == 1
+
+    if claimed:
+        logger.info(f"Circuit '{name}' half-open: sending a probe request")
+    return claimed
+
+
+def record_success(name):
+    """Closes the breaker after a successful call."""
+    updated = CircuitBreaker.objects.filter(name=name).exclude(
+        state=CircuitBreaker.STATE_CLOSED, consecutive_failures=0,
+    ).update(
+        state=CircuitBreaker.STATE_CLOSED,
+        consecutive_failures=0,
+        retry_at=None,
+        last_success_at=timezone.now(),
+    )
+    if updated:
+        logger.info(f"Circuit '{name}' closed: provider is healthy again")
+
+
+def record_failure(name, error=''):
+    """
+    Counts a transient failure (429/5xx/timeout) and opens the breaker
+    once CIRCUIT_BREAKER_FAILURE_THRESHOLD failures happen in a row, or
+    straight away if a half-open probe fails.
+
+    Returns:
+        bool: True if the breaker is now open
+    """
+    config = _breaker_settings()
+    now = timezone.now()
+    _breaker(name)
+
+    CircuitBreaker.objects.filter(name=name).update(
+        consecutive_failures=F('consecutive_failures') + 1,
+        last_error=str(error)[:255],
+        last_failure_at=now,
+    )
+
+    # Only the caller that flips the state counts the trip
+    tripped = CircuitBreaker.objects.filter(
+        Q(state=CircuitBreaker.STATE_HALF_OPEN)
+        | Q(state=CircuitBreaker.STATE_CLOSED, consecutive_failures__gte=config['threshold']),
+        name=name,
+    ).update(
+        state=CircuitBreaker.STATE_OPEN,
+        opened_at=now,
+        retry_at=now + timedelta(seconds=config['cooldown']),
+        trip_count=F('trip_count') + 1,
+    )
+    if tripped:
+        logger.warning(f"Circuit '{name}' opened after repeated failures ({error}). Failing fast for {config['cooldown']}s.")
+        return True
+
+    return _breaker(name).state == CircuitBreaker.STATE_OPEN
+
+
+def is_transient_error(error):
+    """Rate limits, 5xx and timeouts: the kind of failure worth tripping the breaker for."""
+    code = getattr(error, 'code', None)
+    if code == 429 or (isinstance(code, int) and 500 <= code < 600):
+        return True
+
+    message = str(error)
+    markers = ('429', 'Quota exceeded', 'ResourceExhausted', '500', '502', '503', '504',
+               'ServiceUnavailable', 'InternalServerError', 'DeadlineExceeded', 'timed out')
+    return any(marker in message for marker in markers)
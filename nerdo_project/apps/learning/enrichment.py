@@ -0,0 +1,220 @@
+import re
+import logging
+from django.conf import settings
+from django.core.cache import cache
+from nerdo_project.http_client import get_session
+from .models import Video
+from .youtube_keys import acquire_api_key, report_key_failure, error_reason, fingerprint, YouTubeQuotaExhausted, VIDEOS_LIST_COST
+from .metrics import span
+
+logger = logging.getLogger(__name__)
+
+VIDEOS_LIST_URL = "https://www.googleapis.com/youtube/v3/videos"
+VIDEOS_PER_REQUEST = 50  # videos.list accepts up to 50 IDs for 1 quota unit
+
+ISO_DURATION = re.compile(r'P(?:(\d+)D)?T?(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?')
+
+
+def _video_cache_key(video_id):
+    return f"yt_video_{video_id}"
+
+
+def parse_iso_duration(value):
+    """Converts an ISO 8601 duration ("PT1H2M3S") to seconds."""
+    match = ISO_DURATION.fullmatch(value or '')
+    if not match:
+        return 0
+    days, hours, minutes, seconds = (int(part or 0) for part in match.groups())
+    return ((days * 24 + hours) * 60 + minutes) * 60 + seconds
+
+
+def format_duration(seconds):
+    """Seconds -> "1:02:03" / "4:05" for video cards."""
+    hours, remainder = divmod(seconds, 3600)
+    minutes, seconds = divmod(remainder, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{seconds:02d}"
+    return f"{minutes}:{seconds:02d}"
+
+
+def _parse_video(item):
+    status = item.get('status', {})
+    seconds = parse_iso_duration(item.get('contentDetails', {}).get('duration'))
+    return {
+        'available': status.get('privacyStatus') != 'private' and status.get('uploadStatus', 'processed') == 'processed',
+        'duration_seconds': seconds,
+        'duration': format_duration(seconds) if seconds else '',
+        'view_count': int(item.get('statistics', {}).get('viewCount', 0) or 0),
+    }
+
+
+def _fetch_video_batch(video_ids):
+    """
+    One videos.list call for up to 50 IDs.
+    IDs missing from the response were deleted (or never existed).
+
+    Returns:
+        dict: video_id -> metadata, or None if the call failed
+    """
+    for attempt in range(2):
+        api_key = acquire_api_key(VIDEOS_LIST_COST)
+        if not api_key:
+            return None
+
+        params = {
+            'part': 'contentDetails,statistics,status',
+            'id': ','.join(video_ids),
+            'maxResults': VIDEOS_PER_REQUEST,
+            'key': api_key,
+        }
+        try:
+            with span('youtube_videos_list', key=fingerprint(api_key)[:8], videos=len(video_ids), attempt=attempt) as attrs:
+                response = get_session('youtube').get(VIDEOS_LIST_URL, params=params)
+                attrs['outcome'] = response.status_code
+        except Exception as e:
+            logger.error(f"YouTube Connection Error: {e}")
+            continue
+
+        if response.status_code == 403:
+            report_key_failure(api_key, error_reason(response))
+            continue
+
+        if response.status_code != 200:
+            logger.error(f"YouTube API Error: {response.status_code} - {response.text}")
+            return None
+
+        details = {video_id: {'available': False} for video_id in video_ids}
+        for item in response.json().get('items', []):
+            details[item['id']] = _parse_video(item)
+        return details
+
+    return None
+
+
+def get_video_details(video_ids, refresh=False):
+    """
+    Resolves metadata for many videos with as few API calls as possible.
+
+    Cached videos are answered from the cache (unless refresh=True); the
+    rest are looked up 50 at a time. Unavailable videos are cached too, so
+    they aren't looked up again on every visit.
+
+    Args:
+        video_ids (iterable): YouTube video IDs
+        refresh (bool): Ignore cached metadata (used by the background sweep)
+
+    Returns:
+        dict: video_id -> {'available', 'duration', 'duration_seconds', 'view_count'}
+              Videos that couldn't be checked are left out.
+    """
+    video_ids = list(dict.fromkeys(v for v in video_ids if v))
+    details = {}
+
+    if not refresh:
+        cached = cache.get_many([_video_cache_key(v) for v in video_ids])
+        for video_id in video_ids:
+            if _video_cache_key(video_id) in cached:
+                details[video_id] = cached[_video_cache_key(video_id)]
+
+    missing = [v for v in video_ids if v not in details]
+    timeout = getattr(settings, 'YOUTUBE_VIDEO_CACHE_TIMEOUT', 7 * 86400)
+
+    for start in range(0, len(missing), VIDEOS_PER_REQUEST):
+        try:
+            batch = _fetch_video_batch(missing[start:start + VIDEOS_PER_REQUEST])
+        except YouTubeQuotaExhausted as e:
+            logger.warning(f"Video enrichment stopped: {e}")
+            break
+        if batch is None:
+            continue
+        cache.set_many({_video_cache_key(v): meta for v, meta in batch.items()}, timeout)
+        details.update(batch)
+
+        # Keep dead videos out of the local catalog
+        dead = [video_id for video_id, meta in batch.items() if not meta['available']]
+        if dead:
+            Video.objects.filter(video_id__in=dead).update(available=False)
+
+    return details
+
+
+def enrich_roadmap_videos(roadmap_data, refresh=False, replace_dead=False, details=None):
+    """
+    Adds duration/view counts to every video in a roadmap and drops dead ones.
+
+    Args:
+        roadmap_data (list): Phase objects (modified in place)
+        refresh (bool): Re-check videos even if their metadata is cached
+        replace_dead (bool): Run a fresh search for phases that lost videos
+        details (dict): Pre-fetched get_video_details() result (for bulk sweeps)
+
+    Returns:
+        bool: True if anything changed
+    """
+    if details is None:
+        video_ids = [video.get('video_id') for phase in roadmap_data for video in phase.get('videos', [])]
+        details = get_video_details(video_ids, refresh=refresh)
+
+    changed, lost = apply_video_details(roadmap_data, details)
+    if replace_dead:
+        replace_lost_videos(lost)
+    return changed
+
+
+def apply_video_details(roadmap_data, details):
+    """
+    Applies get_video_details() results to phase objects (in place).
+
+    Returns:
+        tuple: (True if anything changed, phases that lost videos)
+    """
+    changed = False
+    lost = []
+    for phase in roadmap_data:
+        kept = []
+        for video in phase.get('videos', []):
+            meta = details.get(video.get('video_id'))
+            if meta is None:
+                kept.append(video)  # Couldn't check it: keep as is
+                continue
+            if not meta['available']:
+                changed = True
+                continue
+            if video.get('duration') != meta['duration'] or video.get('view_count') != meta['view_count']:
+                video['duration'] = meta['duration']
+                video['view_count'] = meta['view_count']
+                changed = True
+            kept.append(video)
+
+        if len(kept) < len(phase.get('videos', [])):
+            lost.append(phase)
+        phase['videos'] = kept
+
+    return changed, lost
+
+
+def replace_lost_videos(phases):
+    """
+    Runs a fresh search for each phase that lost videos. The replacements of
+    all phases are checked with one get_video_details() call; a phase keeps
+    its remaining videos if the search found nothing usable.
+
+    Args:
+        phases (list): Phase objects (modified in place), e.g. from apply_video_details()
+    """
+    # Imported here: utils imports this module for the generation pipeline
+    from .utils import search_youtube_videos_uncached
+
+    searched = [
+        (phase, search_youtube_videos_uncached(phase['search_query']))
+        for phase in phases
+        if phase.get('search_query')
+    ]
+    if not searched:
+        return
+
+    details = get_video_details(video.get('video_id') for _, videos in searched for video in videos)
+    for phase, videos in searched:
+        replacement = {'videos': videos}
+        apply_video_details([replacement], details)
+        phase['videos'] = replacement['videos'] or phase['videos']
@@ -0,0 +1,50 @@
+import time
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from apps.learning.tasks import (
+    claim_next_learning_path,
+    process_learning_path,
+    requeue_stale_learning_paths,
+)
+from apps.billing.usage import flush_usage
+
+class Command(BaseCommand):
+    help = 'Background worker that generates pending learning roadmaps'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Drain the queue once and exit (cron mode)')
+        parser.add_argument('--poll-interval', type=float, default=2.0, help='Seconds to sleep when the queue is empty')
+        parser.add_argument('--stale-after', type=int, default=300, help='Requeue paths stuck in "generating" for this many seconds')
+
+    def handle(self, *args, **options):
+        once = options['once']
+        poll_interval = options['poll_interval']
+        stale_after = options['stale_after']
+
+        self.stdout.write("Roadmap worker started. Waiting for pending roadmaps...")
+        processed = 0
+
+        while True:
+            close_old_connections()
+
+            # 1. Recover work abandoned by a crashed worker
+            requeued = requeue_stale_learning_paths(stale_after)
+            if requeued:
+                self.stdout.write(self.style.WARNING(f"Requeued {requeued} stale roadmap(s)."))
+
+            # 2. Claim and build the next roadmap
+            learning_path = claim_next_learning_path()
+            if learning_path is None:
+                flush_usage()  # Idle: write out buffered provider usage
+                if once:
+                    break
+                time.sleep(poll_interval)
+                continue
+
+            self.stdout.write(f"Generating roadmap {learning_path.id}: {learning_path.topic}")
+            if process_learning_path(learning_path):
+                processed += 1
+            else:
+                self.stdout.write(self.style.ERROR(f" -> Roadmap {learning_path.id} failed"))
+
+        self.stdout.write(self.style.SUCCESS(f"Done. Generated {processed} roadmap(s)."))
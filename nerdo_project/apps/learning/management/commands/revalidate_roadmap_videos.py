@@ -0,0 +1,96 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from apps.learning.models import LearningPath, Video
+from apps.learning.enrichment import get_video_details, apply_video_details, replace_lost_videos
+from apps.learning.roadmap_storage import phase_topics_by_video
+from apps.billing.usage import usage_context
+
+class Command(BaseCommand):
+    help = 'Re-checks videos stored in saved roadmaps and drops or replaces deleted/private ones'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=200, help='Roadmaps checked per round of videos.list calls')
+        parser.add_argument('--no-replace', action='store_true', help='Only drop dead videos, never run a new search')
+        parser.add_argument('--use-cache', action='store_true', help='Trust cached video metadata instead of re-checking')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        replace_dead = not options['no_replace']
+        refresh = not options['use_cache']
+
+        self.stdout.write("Revalidating roadmap videos...")
+
+        paths = (
+            LearningPath.objects.filter(generation_status=LearningPath.GENERATION_READY)
+            .only('id', 'roadmap_data', 'updated_at', *LearningPath.SUMMARY_FIELDS)
+            .order_by('id')
+        )
+
+        checked = 0
+        updated = 0
+        batch = []
+
+        # videos.list checks and replacement searches go on the ledger as system work
+        with usage_context(feature='revalidate'):
+            for learning_path in paths.iterator(chunk_size=batch_size):
+                batch.append(learning_path)
+                if len(batch) >= batch_size:
+                    updated += self._revalidate(batch, refresh, replace_dead)
+                    checked += len(batch)
+                    batch = []
+
+            if batch:
+                updated += self._revalidate(batch, refresh, replace_dead)
+                checked += len(batch)
+
+        self.stdout.write(self.style.SUCCESS(f"Done. Checked {checked} roadmaps, updated {updated}."))
+
+    def _revalidate(self, learning_paths, refresh, replace_dead):
+        # 1. One Video query and one set of batched videos.list calls for this chunk
+        LearningPath.prefetch_phases(learning_paths)
+        video_ids = [
+            video.get('video_id')
+            for learning_path in learning_paths
+            for phase in learning_path.phases
+            for video in phase.get('videos', [])
+        ]
+        details = get_video_details(video_ids, refresh=refresh)
+        dead = sum(1 for meta in details.values() if not meta['available'])
+        self.stdout.write(f" -> {len(details)} videos checked, {dead} unavailable")
+
+        # 2. Apply the results, then search for phases that lost videos and
+        # check all their replacements with one more set of videos.list calls
+        changed = []
+        lost = []
+        for learning_path in learning_paths:
+            path_changed, path_lost = apply_video_details(learning_path.phases, details)
+            if path_changed:
+                changed.append(learning_path)
+            lost.extend(path_lost)
+        if replace_dead and lost:
+            self.stdout.write(f" -> Searching replacements for {len(lost)} phase(s)")
+            replace_lost_videos(lost)
+
+        # 3. New durations/view counts only touch the Video rows; a roadmap is
+        # rewritten (and its updated_at, which keys the page's ETag and fragment
+        # cache, bumped) only when its list of videos changed.
+        now = timezone.now()
+        videos_by_id = {}
+        topics_by_id = {}
+        rewritten = []
+        for learning_path in changed:
+            stored = learning_path.roadmap_data
+            videos_by_id.update(learning_path.set_phases(learning_path.phases, store_videos=False))
+            for video_id, topics in phase_topics_by_video(learning_path.phases).items():
+                topics_by_id.setdefault(video_id, []).extend(topics)
+            if learning_path.roadmap_data != stored:
+                learning_path.updated_at = now  # bulk_update skips auto_now
+                rewritten.append(learning_path)
+
+        if videos_by_id:
+            Video.store_many(videos_by_id)
+            Video.add_catalog_topics(topics_by_id)
+        if rewritten:
+            LearningPath.objects.bulk_update(rewritten, ['roadmap_data', *LearningPath.SUMMARY_FIELDS, 'updated_at'])
+
+        return len(rewritten)
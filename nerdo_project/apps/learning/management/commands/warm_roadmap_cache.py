@@ -0,0 +1,206 @@
+import time
+from collections import Counter
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+from django.utils import timezone
+from apps.learning.models import LearningPath, Video
+from apps.learning.catalog import find_catalog_videos, invalidate_catalog
+from apps.learning.roadmap_storage import compact_phases, phase_topics_by_video
+from apps.learning.circuit_breaker import is_open, GEMINI
+from apps.learning.topic_cache import cached_topic_variants, normalize_topic, duration_bucket
+from apps.learning.youtube_keys import YouTubeQuotaExhausted
+from apps.learning.utils import generate_roadmap_topics, get_cached_youtube_videos, get_youtube_videos_for_topic
+from apps.opportunities.models import Job
+from apps.billing.usage import usage_context
+
+# The featured cards on learning/home.html (keep in sync with the template)
+FEATURED_ROADMAPS = [
+    ('Python for Data Science', 'beginner', 12),
+    ('Full Stack Web Development', 'beginner', 12),
+    ('UI/UX Design', 'beginner', 8),
+    ('Blockchain Development', 'intermediate', 12),
+    ('Digital Marketing', 'beginner', 12),
+]
+
+SKILL_LEVELS = ('beginner', 'intermediate', 'advanced')
+
+
+class Command(BaseCommand):
+    help = (
+        'Pre-generates topic lists and video results for the most popular roadmap requests. '
+        'Safe to re-run: fully cached combinations are skipped, so an interrupted run resumes '
+        'where it stopped. Searched videos are stored in the local video catalog, so web '
+        'workers serve them without quota whatever the cache backend.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=50, help='Number of topic x level x duration combinations to warm')
+        parser.add_argument('--delay', type=float, default=2.0, help='Seconds to wait between API calls')
+        parser.add_argument('--max-gemini-calls', type=int, default=100, help='Stop after this many Gemini generations')
+        parser.add_argument('--max-searches', type=int, default=60, help='Stop after this many YouTube searches (100 quota units each)')
+        parser.add_argument('--sessions', type=int, default=5000, help='Recent sessions scanned for recent_searches')
+        parser.add_argument('--dry-run', action='store_true', help='Only list the combinations that would be warmed')
+
+    def handle(self, *args, **options):
+        self.delay = options['delay']
+        self.gemini_budget = options['max_gemini_calls']
+        self.search_budget = options['max_searches']
+
+        combinations = self._popular_combinations(options['limit'], options['sessions'])
+        self.stdout.write(f"Warming {len(combinations)} roadmap combination(s)...")
+
+        warmed = 0
+        with usage_context(feature='cache_warm'):
+            for topic, skill_level, duration in combinations:
+                label = f"{topic} / {skill_level} / {duration}w"
+                if options['dry_run']:
+                    self.stdout.write(f" - {label}")
+                    continue
+
+                if self._is_warm(topic, skill_level, duration):
+                    self.stdout.write(f" -> {label}: already cached")
+                    continue
+
+                self.stdout.write(f" -> {label}")
+                try:
+                    stopped = self._warm(topic, skill_level, duration)
+                except YouTubeQuotaExhausted:
+                    self.stdout.write(self.style.WARNING("YouTube quota exhausted. Run again after the daily reset."))
+                    break
+                if stopped:
+                    self.stdout.write(self.style.WARNING(f"Stopping: {stopped}. Run again to resume."))
+                    break
+                warmed += 1
+
+        self.stdout.write(self.style.SUCCESS(f"Done. Warmed {warmed} combination(s)."))
+
+    def _popular_combinations(self, limit, session_limit):
+        """
+        Ranks topic x level x duration combinations by demand.
+
+        Saved paths count with their exact level/duration. Searches, job
+        categories and featured cards only name a topic, so they are spread
+        over the level/duration pairs users pick most often.
+        """
+        scores = Counter()
+
+        # 1. Paths users actually created
+        saved = (
+            LearningPath.objects.values('normalized_topic', 'skill_level', 'duration')
+            .annotate(total=Count('id'))
+            .order_by('-total')[:limit * 5]
+        )
+        display = {}
+        pair_counts = Counter()
+        for row in saved:
+            key = (row['normalized_topic'], row['skill_level'], duration_bucket(row['duration']))
+            scores[key] += row['total']
+            pair_counts[key[1:]] += row['total']
+        for topic in LearningPath.objects.filter(normalized_topic__in={k[0] for k in scores}).values_list('topic', flat=True):
+            display.setdefault(normalize_topic(topic), topic)
+
+        # 2. Topic-only demand
+        topic_scores = Counter()
+        for topic, count in self._recent_searches(session_limit).items():
+            topic_scores[topic] += count
+        for _, label in Job.CATEGORY_CHOICES:
+            topic_scores[label] += 1
+        for topic, skill_level, duration in FEATURED_ROADMAPS:
+            scores[(normalize_topic(topic), skill_level, duration)] += 1
+            display.setdefault(normalize_topic(topic), topic)
+
+        # Most requested level/duration pairs (beginner / 3 months if nobody has a path yet)
+        pairs = [pair for pair, _ in pair_counts.most_common(3)] or [('beginner', 12)]
+        for topic, count in topic_scores.items():
+            display.setdefault(normalize_topic(topic), topic)
+            for rank, (skill_level, duration) in enumerate(pairs):
+                scores[(normalize_topic(topic), skill_level, duration)] += count / (rank + 1)
+
+        return [
+            (display.get(topic, topic), skill_level, duration)
+            for (topic, skill_level, duration), _ in scores.most_common(limit)
+            if skill_level in SKILL_LEVELS
+        ]
+
+    def _recent_searches(self, session_limit):
+        """Counts topics in the recent_searches list of live sessions."""
+        counts = Counter()
+        sessions = Session.objects.filter(expire_date__gt=timezone.now()).order_by('-expire_date')[:session_limit]
+        for session in sessions.iterator():
+            try:
+                searches = session.get_decoded().get('recent_searches', [])
+            except Exception:
+                continue  # Corrupt or foreign session data
+            for topic in searches:
+                if str(topic).strip():
+                    counts[str(topic).strip()] += 1
+        return counts
+
+    def _variants_wanted(self):
+        return max(1, getattr(settings, 'ROADMAP_TOPIC_VARIANTS', 3))
+
+    def _is_warm(self, topic, skill_level, duration):
+        variants = cached_topic_variants(topic, skill_level, duration)
+        if len(variants) < self._variants_wanted():
+            return False
+        return all(self._has_videos(phase) for topics in variants for phase in topics)
+
+    def _has_videos(self, phase):
+        """True when a lookup for this phase would not spend quota (cache or catalog hit)."""
+        return bool(get_cached_youtube_videos(phase) or find_catalog_videos(phase))
+
+    def _store_videos(self, phase, videos):
+        """Adds search results to the Video table, tagged with the phase they were found for."""
+        phases = [{'title': phase, 'videos': videos}]
+        _, videos_by_id = compact_phases(phases)
+        Video.store_many(videos_by_id)
+        Video.add_catalog_topics(phase_topics_by_video(phases))
+
+    def _warm(self, topic, skill_level, duration):
+        """
+        Fills every topic variant and the video search for every phase.
+
+        Search results are persisted to the catalog rather than only cached,
+        so they outlive a per-process cache (LocMemCache) and this command.
+
+        Returns:
+            str or None: Why warming had to stop (budget spent, Gemini down)
+        """
+        # 1. Topic variants (each generate call stores one new variant)
+        while len(cached_topic_variants(topic, skill_level, duration)) < self._variants_wanted():
+            if self.gemini_budget <= 0:
+                return "Gemini call budget spent"
+            if is_open(GEMINI):
+                return "Gemini circuit breaker is open"
+
+            before = len(cached_topic_variants(topic, skill_level, duration))
+            generate_roadmap_topics(topic, skill_level, duration)
+            self.gemini_budget -= 1
+            time.sleep(self.delay)
+
+            if len(cached_topic_variants(topic, skill_level, duration)) <= before:
+                # Gemini failed and the fallback list was served (never cached)
+                return "Gemini did not return topics"
+
+        # 2. Video results for every phase of every variant
+        phases = dict.fromkeys(phase for topics in cached_topic_variants(topic, skill_level, duration) for phase in topics)
+        stored = False
+        try:
+            for phase in phases:
+                if self._has_videos(phase):
+                    continue
+                if self.search_budget <= 0:
+                    return "YouTube search budget spent"
+                videos = get_youtube_videos_for_topic(phase)
+                self.search_budget -= 1
+                if videos:
+                    self._store_videos(phase, videos)
+                    stored = True
+                time.sleep(self.delay)
+        finally:
+            if stored:
+                invalidate_catalog()  # Later combinations see the new videos
+
+        return None
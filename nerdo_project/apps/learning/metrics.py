@@ -0,0 +1,182 @@
+"""
+Per-stage timing for roadmap generation.
+
+Code wraps each stage in a span:
+
+    with span('gemini', stream=True) as attrs:
+        ...
+        attrs['retries'] = 1
+
+Every span feeds two places:
+  * the in-process registry (counters + latency histograms), served by the
+    staff-only learning/metrics/ endpoint, and
+  * the current generation's trace, if one is active, which is stored on
+    LearningPath.generation_trace so slow roadmaps can be inspected later.
+
+The trace lives in a context variable; work handed to the YouTube thread
+pool runs in a copy of the caller's context so its spans land in the same
+trace.
+"""
+import os
+import time
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Histogram bucket upper bounds (milliseconds)
+BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+# Spans kept per generation trace (a roadmap makes ~20 calls)
+MAX_TRACE_SPANS = 200
+
+_current_trace = ContextVar('roadmap_generation_trace', default=None)
+
+
+class Registry:
+    """Process-wide counters and histograms (thread-safe)."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started_at = time.time()
+        self.counters = {}
+        self.histograms = {}
+
+    def incr(self, name, amount=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def observe(self, stage, duration_ms):
+        with self.lock:
+            histogram = self.histograms.setdefault(stage, {'buckets': [0] * len(BUCKETS_MS), 'count': 0, 'sum_ms': 0.0})
+            histogram['count'] += 1
+            histogram['sum_ms'] += duration_ms
+            for i, bound in enumerate(BUCKETS_MS):
+                if duration_ms <= bound:
+                    histogram['buckets'][i] += 1
+
+    def snapshot(self):
+        with self.lock:
+            counters = {}
+            for (name, labels), value in sorted(self.counters.items()):
+                label_text = ','.join(f"{k}={v}" for k, v in labels)
+                counters[f"{name}{{{label_text}}}" if labels else name] = value
+            histograms = {
+                stage: {
+                    'count': h['count'],
+                    'avg_ms': round(h['sum_ms'] / h['count'], 1) if h['count'] else 0,
+                    'buckets_ms': dict(zip([str(b) for b in BUCKETS_MS], h['buckets'])),
+                }
+                for stage, h in sorted(self.histograms.items())
+            }
+        return {
+            'pid': os.getpid(),
+            'uptime_seconds': round(time.time() - self.started_at),
+            'counters': counters,
+            'histograms': histograms,
+        }
+
+    def prometheus(self):
+        """Prometheus text exposition of the same data."""
+        lines = []
+        with self.lock:
+            for (name, labels), value in sorted(self.counters.items()):
+                label_text = ','.join(f'{k}="{v}"' for k, v in labels)
+                lines.append(f"nerdo_learning_{name}_total{{{label_text}}} {value}" if labels else f"nerdo_learning_{name}_total {value}")
+            for stage, h in sorted(self.histograms.items()):
+                metric = 'nerdo_learning_stage_duration_ms'
+                for bound, count in zip(BUCKETS_MS, h['buckets']):
+                    lines.append(f'{metric}_bucket{{stage="{stage}",le="{bound}"}} {count}')
+                lines.append(f'{metric}_bucket{{stage="{stage}",le="+Inf"}} {h["count"]}')
+                lines.append(f'{metric}_sum{{stage="{stage}"}} {round(h["sum_ms"], 3)}')
+                lines.append(f'{metric}_count{{stage="{stage}"}} {h["count"]}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+
+class Trace:
+    """Spans recorded during one roadmap generation."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.lock = threading.Lock()
+        self.spans = []
+
+    def add(self, record):
+        with self.lock:
+            if len(self.spans) < MAX_TRACE_SPANS:
+                self.spans.append(record)
+
+    def as_dict(self):
+        """Spans in start order plus per-stage sums (parallel lookups can add up past total_ms)."""
+        with self.lock:
+            spans = sorted(self.spans, key=lambda record: record['start_ms'])
+        stage_totals = {}
+        for record in spans:
+            stage_totals[record['stage']] = round(stage_totals.get(record['stage'], 0) + record['ms'], 1)
+        return {
+            'total_ms': round((time.perf_counter() - self.started) * 1000, 1),
+            'stages_ms': stage_totals,
+            'spans': spans,
+        }
+
+
+@contextmanager
+def generation_trace():
+    """Collects the spans of one generation; yields the Trace."""
+    trace = Trace()
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        try:
+            _current_trace.reset(token)
+        except ValueError:
+            # A streamed response may be resumed in another context (ASGI)
+            _current_trace.set(None)
+
+
+def current_trace():
+    return _current_trace.get()
+
+
+def incr(name, amount=1, **labels):
+    """Counts an event (e.g. a cache hit) in the registry."""
+    registry.incr(name, amount, **labels)
+
+
+@contextmanager
+def span(stage, **attrs):
+    """
+    Times a stage. Callers may add attributes (key used, outcome, retries)
+    to the yielded dict; an exception sets outcome='error'.
+    """
+    start = time.perf_counter()
+    try:
+        yield attrs
+    except Exception as e:
+        attrs.setdefault('outcome', 'error')
+        attrs.setdefault('error', type(e).__name__)
+        raise
+    finally:
+        duration_ms = (time.perf_counter() - start) * 1000
+        registry.observe(stage, duration_ms)
+        registry.incr('stage', stage=stage, outcome=attrs.get('outcome', 'ok'))
+
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.add({
+                'stage': stage,
+                'start_ms': round((start - trace.started) * 1000, 1),
+                'ms': round(duration_ms, 1),
+                **{key: value for key, value in attrs.items() if isinstance(value, (str, int, float, bool))},
+            })
+
+
+def percentile(values, pct):
+    if not values:
+        return 0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.8 on 2026-10-17 20:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('learning', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='learningpath',
+            name='generation_error',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='learningpath',
+            name='generation_started_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        # Existing roadmaps were generated inline, so they are already ready
+        migrations.AddField(
+            model_name='learningpath',
+            name='generation_status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('generating', 'Generating'), ('ready', 'Ready'), ('failed', 'Failed')], default='ready', max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='learningpath',
+            name='generation_status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('generating', 'Generating'), ('ready', 'Ready'), ('failed', 'Failed')], default='pending', max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='learningpath',
+            name='roadmap_data',
+            field=models.JSONField(blank=True, default=list, help_text='The generated roadmap structure'),
+        ),
+    ]
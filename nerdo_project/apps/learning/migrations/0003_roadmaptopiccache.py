@@ -0,0 +1,31 @@
+# Generated by Django 5.2.8 on 2026-10-17 20:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('learning', '0002_learningpath_generation_status'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RoadmapTopicCache',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('query_key', models.CharField(help_text='Normalized search query', max_length=255)),
+                ('skill_level', models.CharField(max_length=50)),
+                ('duration_bucket', models.IntegerField(help_text='Duration rounded up to a standard length (weeks)')),
+                ('variant', models.PositiveSmallIntegerField(default=0)),
+                ('topics', models.JSONField()),
+                ('hits', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_used_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['last_used_at'], name='learning_ro_last_us_7b4514_idx')],
+                'unique_together': {('query_key', 'skill_level', 'duration_bucket', 'variant')},
+            },
+        ),
+    ]
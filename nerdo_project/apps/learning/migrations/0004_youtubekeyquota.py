@@ -0,0 +1,26 @@
+# Generated by Django 5.2.8 on 2026-10-17 20:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('learning', '0003_roadmaptopiccache'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='YouTubeKeyQuota',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key_fingerprint', models.CharField(max_length=64, unique=True)),
+                ('label', models.CharField(help_text='First characters of the key, for display', max_length=20)),
+                ('quota_day', models.DateField(help_text='Quota day (Pacific Time) that units_used belongs to')),
+                ('units_used', models.PositiveIntegerField(default=0)),
+                ('cooldown_until', models.DateTimeField(blank=True, help_text='Key is skipped until this time (e.g. after a 403)', null=True)),
+                ('last_error', models.CharField(blank=True, max_length=255)),
+                ('last_used_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.8 on 2026-10-17 21:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('learning', '0005_circuitbreaker'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Video',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('video_id', models.CharField(max_length=20, unique=True)),
+                ('title', models.CharField(blank=True, max_length=255)),
+                ('description', models.TextField(blank=True)),
+                ('thumbnail', models.URLField(blank=True, max_length=500)),
+                ('playlist_id', models.CharField(blank=True, max_length=64)),
+                ('channel', models.CharField(blank=True, max_length=255)),
+                ('published_at', models.CharField(blank=True, help_text='YYYY-MM-DD, as returned by the search API', max_length=10)),
+                ('duration', models.CharField(blank=True, max_length=12)),
+                ('view_count', models.PositiveBigIntegerField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='learningpath',
+            name='roadmap_data',
+            field=models.JSONField(blank=True, default=list, help_text='Compact phase list referencing Video IDs (see roadmap_storage.py)'),
+        ),
+    ]
@@ -0,0 +1,152 @@
+# Generated by Django 5.2.8 on 2026-10-17 21:41
+
+from django.db import migrations
+
+BATCH_SIZE = 500
+
+# Frozen copies of the apps.learning.roadmap_storage helpers as of this
+# migration, so later changes to them don't change what it does.
+VIDEO_FIELDS = ('title', 'description', 'thumbnail', 'playlist_id', 'channel', 'published_at', 'duration', 'view_count')
+
+
+def is_compact(roadmap_data):
+    return not any('videos' in phase for phase in roadmap_data or [])
+
+
+def compact_phases(phases):
+    compact = []
+    videos_by_id = {}
+
+    for phase in phases:
+        title = phase.get('title') or phase.get('phase_title', '')
+        video_ids = []
+        for video in phase.get('videos', []):
+            video_id = video.get('video_id')
+            if not video_id:
+                continue
+            video_ids.append(video_id)
+            videos_by_id[video_id] = {field: video[field] for field in VIDEO_FIELDS if field in video}
+
+        entry = {
+            'title': title,
+            'estimated_duration': phase.get('estimated_duration', ''),
+            'video_ids': video_ids,
+        }
+        if phase.get('search_query', title) != title:
+            entry['search_query'] = phase['search_query']
+        if phase.get('videos_pending'):
+            entry['videos_pending'] = True
+        compact.append(entry)
+
+    return compact, videos_by_id
+
+
+def phase_video_ids(roadmap_data):
+    video_ids = []
+    for phase in roadmap_data or []:
+        if 'videos' in phase:
+            video_ids.extend(video.get('video_id') for video in phase['videos'] if video.get('video_id'))
+        else:
+            video_ids.extend(phase.get('video_ids', []))
+    return video_ids
+
+
+def expand_phases(roadmap_data, videos_by_id):
+    phases = []
+
+    for idx, stored in enumerate(roadmap_data or [], 1):
+        if 'videos' in stored:
+            phases.append(stored)
+            continue
+
+        title = stored.get('title', '')
+        videos = [
+            {'video_id': video_id, **videos_by_id[video_id]}
+            for video_id in stored.get('video_ids', [])
+            if video_id in videos_by_id
+        ]
+        phase = {
+            'phase_number': idx,
+            'phase_title': title,
+            'title': title,
+            'estimated_duration': stored.get('estimated_duration', ''),
+            'videos': videos,
+            'search_query': stored.get('search_query', title),
+        }
+        if stored.get('videos_pending'):
+            phase['videos_pending'] = True
+        phases.append(phase)
+
+    return phases
+
+
+def _store_videos(Video, videos_by_id):
+    groups = {}
+    for video_id, fields in videos_by_id.items():
+        known = tuple(field for field in VIDEO_FIELDS if fields.get(field) is not None)
+        video = Video(video_id=video_id, **{field: fields[field] for field in known})
+        video.title = video.title[:255]
+        video.channel = video.channel[:255]
+        groups.setdefault(known, []).append(video)
+
+    for known, videos in groups.items():
+        Video.objects.bulk_create(videos, update_conflicts=True, unique_fields=['video_id'], update_fields=list(known))
+
+
+def _rewrite(LearningPath, convert):
+    """Runs convert(batch) over every roadmap, BATCH_SIZE rows at a time."""
+    paths = LearningPath.objects.only('id', 'roadmap_data').order_by('id')
+    batch = []
+    for path in paths.iterator(chunk_size=BATCH_SIZE):
+        batch.append(path)
+        if len(batch) >= BATCH_SIZE:
+            convert(batch)
+            batch = []
+    if batch:
+        convert(batch)
+
+
+def compact_roadmaps(apps, schema_editor):
+    LearningPath = apps.get_model('learning', 'LearningPath')
+    Video = apps.get_model('learning', 'Video')
+
+    def convert(batch):
+        changed = []
+        videos_by_id = {}
+        for path in batch:
+            if is_compact(path.roadmap_data):
+                continue
+            path.roadmap_data, videos = compact_phases(path.roadmap_data)
+            videos_by_id.update(videos)
+            changed.append(path)
+        _store_videos(Video, videos_by_id)
+        LearningPath.objects.bulk_update(changed, ['roadmap_data'])
+
+    _rewrite(LearningPath, convert)
+
+
+def expand_roadmaps(apps, schema_editor):
+    LearningPath = apps.get_model('learning', 'LearningPath')
+    Video = apps.get_model('learning', 'Video')
+
+    def convert(batch):
+        video_ids = {v for path in batch for v in phase_video_ids(path.roadmap_data)}
+        videos_by_id = {}
+        for row in Video.objects.filter(video_id__in=video_ids).values('video_id', *VIDEO_FIELDS):
+            videos_by_id[row.pop('video_id')] = {k: v for k, v in row.items() if v is not None}
+        for path in batch:
+            path.roadmap_data = expand_phases(path.roadmap_data, videos_by_id)
+        LearningPath.objects.bulk_update(batch, ['roadmap_data'])
+
+    _rewrite(LearningPath, convert)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('learning', '0006_video'),
+    ]
+
+    operations = [
+        migrations.RunPython(compact_roadmaps, expand_roadmaps),
+    ]
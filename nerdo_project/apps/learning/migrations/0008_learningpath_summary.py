@@ -0,0 +1,80 @@
+# Generated by Django 5.2.8 on 2026-10-17 22:05
+
+from django.db import migrations, models
+
+BATCH_SIZE = 500
+
+# Frozen copies of the apps.learning.roadmap_storage helpers as of this
+# migration, so later changes to them don't change what it does.
+VIDEO_FIELDS = ('title', 'description', 'thumbnail', 'playlist_id', 'channel', 'published_at', 'duration', 'view_count')
+
+
+def phase_video_ids(roadmap_data):
+    video_ids = []
+    for phase in roadmap_data or []:
+        if 'videos' in phase:
+            video_ids.extend(video.get('video_id') for video in phase['videos'] if video.get('video_id'))
+        else:
+            video_ids.extend(phase.get('video_ids', []))
+    return video_ids
+
+
+def summarize_roadmap(roadmap_data, videos_by_id):
+    """(phase count, video count, first thumbnail) of a stored roadmap, compact or legacy."""
+    videos = []
+    for phase in roadmap_data or []:
+        if 'videos' in phase:
+            videos.extend(phase['videos'])
+        else:
+            videos.extend(videos_by_id[video_id] for video_id in phase.get('video_ids', []) if video_id in videos_by_id)
+    first_thumbnail = next((video.get('thumbnail') for video in videos if video.get('thumbnail')), '')
+    return len(roadmap_data or []), len(videos), first_thumbnail
+
+
+def fill_summaries(apps, schema_editor):
+    LearningPath = apps.get_model('learning', 'LearningPath')
+    Video = apps.get_model('learning', 'Video')
+
+    def fill(batch):
+        video_ids = {v for path in batch for v in phase_video_ids(path.roadmap_data)}
+        videos_by_id = {}
+        for row in Video.objects.filter(video_id__in=video_ids).values('video_id', *VIDEO_FIELDS):
+            videos_by_id[row.pop('video_id')] = row
+        for path in batch:
+            path.phase_count, path.video_count, path.first_thumbnail = summarize_roadmap(path.roadmap_data, videos_by_id)
+        LearningPath.objects.bulk_update(batch, ['phase_count', 'video_count', 'first_thumbnail'])
+
+    batch = []
+    for path in LearningPath.objects.only('id', 'roadmap_data').order_by('id').iterator(chunk_size=BATCH_SIZE):
+        batch.append(path)
+        if len(batch) >= BATCH_SIZE:
+            fill(batch)
+            batch = []
+    if batch:
+        fill(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('learning', '0007_compact_roadmap_data'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='learningpath',
+            name='first_thumbnail',
+            field=models.URLField(blank=True, max_length=500),
+        ),
+        migrations.AddField(
+            model_name='learningpath',
+            name='phase_count',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='learningpath',
+            name='video_count',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.RunPython(fill_summaries, migrations.RunPython.noop),
+    ]
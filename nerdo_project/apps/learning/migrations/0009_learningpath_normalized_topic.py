@@ -0,0 +1,73 @@
+# Generated by Django 5.2.8 on 2026-10-17 22:30
+
+from django.conf import settings
+from django.db import migrations, models
+
+BATCH_SIZE = 500
+
+
+# LearningPath.DUPLICATE_SUFFIX
+DUPLICATE_SUFFIX = ' #duplicate-'
+
+
+def fill_normalized_topics(apps, schema_editor):
+    """
+    Backfills normalized_topic, then makes duplicate paths (the old
+    topic__iexact check could race) distinct so the unique constraint can be
+    added. Of each duplicate group the path the user got furthest with keeps
+    the plain key (completed > active > archived, then ready, then oldest);
+    the others keep their data under a suffixed normalized_topic.
+    """
+    LearningPath = apps.get_model('learning', 'LearningPath')
+
+    batch = []
+    for path in LearningPath.objects.only('id', 'topic').order_by('id').iterator(chunk_size=BATCH_SIZE):
+        path.normalized_topic = ' '.join(path.topic.split()).lower()[:255]  # topic_cache.normalize_topic
+        batch.append(path)
+        if len(batch) >= BATCH_SIZE:
+            LearningPath.objects.bulk_update(batch, ['normalized_topic'])
+            batch = []
+    if batch:
+        LearningPath.objects.bulk_update(batch, ['normalized_topic'])
+
+    seen = set()
+    duplicates = []
+    paths = LearningPath.objects.order_by(
+        'user_id', 'normalized_topic', 'skill_level', 'duration',
+        models.Case(
+            models.When(status='completed', then=0),
+            models.When(status='active', then=1),
+            default=2,
+        ),
+        models.Case(models.When(generation_status='ready', then=0), default=1),
+        'created_at',
+    ).only('id', 'user_id', 'normalized_topic', 'skill_level', 'duration')
+    for path in paths.iterator(chunk_size=BATCH_SIZE):
+        key = (path.user_id, path.normalized_topic, path.skill_level, path.duration)
+        if key in seen:
+            suffix = f"{DUPLICATE_SUFFIX}{path.id}"
+            path.normalized_topic = path.normalized_topic[:255 - len(suffix)] + suffix
+            duplicates.append(path)
+        else:
+            seen.add(key)
+
+    LearningPath.objects.bulk_update(duplicates, ['normalized_topic'], batch_size=BATCH_SIZE)
+    if duplicates:
+        print(f"\n  Renamed the normalized_topic of {len(duplicates)} duplicate learning path(s) (none deleted)")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('learning', '0008_learningpath_summary'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='learningpath',
+            name='normalized_topic',
+            field=models.CharField(default='', editable=False, help_text='Lowercased, whitespace-collapsed topic for dedup lookups', max_length=255),
+        ),
+        migrations.RunPython(fill_normalized_topics, migrations.RunPython.noop),
+    ]
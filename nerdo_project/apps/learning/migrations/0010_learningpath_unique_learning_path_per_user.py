@@ -0,0 +1,21 @@
+# Generated by Django 5.2.8 on 2026-10-17 22:31
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    # Separate from 0009 so the constraint isn't added in the same
+    # transaction as the backfill (PostgreSQL pending trigger events)
+    dependencies = [
+        ('learning', '0009_learningpath_normalized_topic'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='learningpath',
+            constraint=models.UniqueConstraint(fields=('user', 'normalized_topic', 'skill_level', 'duration'), name='unique_learning_path_per_user'),
+        ),
+    ]
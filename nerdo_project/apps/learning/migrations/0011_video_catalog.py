@@ -0,0 +1,56 @@
+# Generated by Django 5.2.8 on 2026-10-17 23:00
+
+from django.db import migrations, models
+
+BATCH_SIZE = 500
+
+
+def seed_catalog_topics(apps, schema_editor):
+    """Seeds Video.catalog_topics with the phase titles of every saved roadmap."""
+    LearningPath = apps.get_model('learning', 'LearningPath')
+    Video = apps.get_model('learning', 'Video')
+
+    topics_by_id = {}
+    for roadmap_data in LearningPath.objects.values_list('roadmap_data', flat=True).iterator(chunk_size=BATCH_SIZE):
+        for phase in roadmap_data or []:
+            topic = phase.get('search_query') or phase.get('title', '')
+            for video_id in phase.get('video_ids', []):
+                topics_by_id.setdefault(video_id, {})[topic] = None  # Ordered set
+
+    changed = []
+    for video in Video.objects.only('id', 'video_id').iterator(chunk_size=BATCH_SIZE):
+        if video.video_id in topics_by_id:
+            video.catalog_topics = '\n'.join(t for t in topics_by_id[video.video_id] if t)
+            changed.append(video)
+    Video.objects.bulk_update(changed, ['catalog_topics'], batch_size=BATCH_SIZE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('learning', '0010_learningpath_unique_learning_path_per_user'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='video',
+            name='available',
+            field=models.BooleanField(default=True, help_text='False once videos.list reports it deleted/private'),
+        ),
+        migrations.AddField(
+            model_name='video',
+            name='catalog_topics',
+            field=models.TextField(blank=True, help_text='Phase titles this video was picked for, one per line'),
+        ),
+        migrations.AddField(
+            model_name='video',
+            name='curated',
+            field=models.BooleanField(default=False, help_text='Vetted by an admin: ranked higher in catalog matches'),
+        ),
+        migrations.AddField(
+            model_name='video',
+            name='excluded',
+            field=models.BooleanField(default=False, help_text='Never serve from the local catalog'),
+        ),
+        migrations.RunPython(seed_catalog_topics, migrations.RunPython.noop),
+    ]
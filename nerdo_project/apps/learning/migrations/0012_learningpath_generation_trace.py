@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-17 23:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('learning', '0011_video_catalog'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='learningpath',
+            name='generation_trace',
+            field=models.JSONField(blank=True, default=dict, help_text='Per-stage timings of the last generation (see metrics.py)'),
+        ),
+    ]
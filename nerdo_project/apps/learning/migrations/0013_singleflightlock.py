@@ -0,0 +1,27 @@
+# Generated by Django 5.2.8 on 2026-10-18 00:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('learning', '0012_learningpath_generation_trace'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SingleFlightLock',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(help_text='MD5 of the single-flight key', max_length=32, unique=True)),
+                ('token', models.CharField(blank=True, help_text='Current holder; empty when free', max_length=32)),
+                ('locked_until', models.DateTimeField(blank=True, help_text='Lock is up for grabs after this (leader hung or crashed)', null=True)),
+                ('result', models.JSONField(blank=True, help_text='[value] published by the last leader', null=True)),
+                ('expires_at', models.DateTimeField(blank=True, help_text='When the published result stops being served', null=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['expires_at'], name='learning_si_expires_ea2897_idx')],
+            },
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.db import models
 from django.conf import settings
+from .roadmap_storage import VIDEO_FIELDS, compact_phases, expand_phases, phase_video_ids, phase_topics_by_video, summarize_phases
 
 # Create your models here.
 
@@ -10,17 +11,285 @@ class LearningPath(models.Model):
         ('archived', 'Archived')
     ]
 
+    # Background generation lifecycle (see management/commands/process_roadmaps.py)
+    GENERATION_PENDING = 'pending'
+    GENERATION_RUNNING = 'generating'
+    GENERATION_READY = 'ready'
+    GENERATION_FAILED = 'failed'
+    GENERATION_STATUS_CHOICES = [
+        (GENERATION_PENDING, 'Pending'),
+        (GENERATION_RUNNING, 'Generating'),
+        (GENERATION_READY, 'Ready'),
+        (GENERATION_FAILED, 'Failed'),
+    ]
+
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='learning_paths')
     topic = models.CharField(max_length=255)
+    normalized_topic = models.CharField(max_length=255, default='', editable=False, help_text="Lowercased, whitespace-collapsed topic for dedup lookups")
     skill_level = models.CharField(max_length=50, default='beginner')
     duration = models.IntegerField(help_text="Duration in weeks")
-    roadmap_data = models.JSONField(help_text="The generated roadmap structure")
+    roadmap_data = models.JSONField(default=list, blank=True, help_text="Compact phase list referencing Video IDs (see roadmap_storage.py)")
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='active')
+    generation_status = models.CharField(max_length=20, choices=GENERATION_STATUS_CHOICES, default=GENERATION_PENDING)
+    generation_error = models.TextField(blank=True)
+    generation_started_at = models.DateTimeField(null=True, blank=True)
+    generation_trace = models.JSONField(default=dict, blank=True, help_text="Per-stage timings of the last generation (see metrics.py)")
+
+    # Summary of roadmap_data for list pages (kept in sync by set_phases/save)
+    phase_count = models.PositiveSmallIntegerField(default=0)
+    video_count = models.PositiveSmallIntegerField(default=0)
+    first_thumbnail = models.URLField(max_length=500, blank=True)
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Columns the history/home cards need; list views load only these
+    LIST_FIELDS = (
+        'id', 'user_id', 'topic', 'skill_level', 'duration', 'status', 'generation_status',
+        'phase_count', 'video_count', 'first_thumbnail', 'created_at',
+    )
+    SUMMARY_FIELDS = ('phase_count', 'video_count', 'first_thumbnail')
+
+    # Migration 0009 kept duplicate paths by appending this (and the id) to their normalized_topic
+    DUPLICATE_SUFFIX = ' #duplicate-'
+
     class Meta:
         ordering = ['-created_at']
+        constraints = [
+            # One path per user per topic/level/duration; also the index for dedup lookups
+            models.UniqueConstraint(
+                fields=['user', 'normalized_topic', 'skill_level', 'duration'],
+                name='unique_learning_path_per_user',
+            ),
+        ]
 
     def __str__(self):
         return f"{self.topic} ({self.skill_level})"
+
+    def save(self, *args, **kwargs):
+        from .topic_cache import normalize_topic  # topic_cache imports this module
+        normalized = normalize_topic(self.topic)[:255]
+        base, suffix, _ = self.normalized_topic.partition(self.DUPLICATE_SUFFIX)
+        if not (suffix and normalized.startswith(base)):
+            self.normalized_topic = normalized
+        # Summary columns travel with roadmap_data on partial saves
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'roadmap_data' in update_fields:
+            kwargs['update_fields'] = set(update_fields) | set(self.SUMMARY_FIELDS)
+        if update_fields is not None and 'topic' in update_fields:
+            kwargs['update_fields'] = set(kwargs['update_fields']) | {'normalized_topic'}
+        super().save(*args, **kwargs)
+
+    @property
+    def is_ready(self):
+        return self.generation_status == self.GENERATION_READY
+
+    @property
+    def phases(self):
+        """Full phase objects (with video dicts) for templates and enrichment."""
+        if not hasattr(self, '_phases'):
+            LearningPath.prefetch_phases([self])
+        return self._phases
+
+    def set_phases(self, phases, store_videos=True):
+        """
+        Stores full phase objects in compact form.
+
+        Args:
+            phases (list): Phase objects as built by build_roadmap_phases
+            store_videos (bool): Upsert the videos now; pass False to batch
+                several paths into one Video.store_many() call
+
+        Returns:
+            dict: video_id -> video fields referenced by these phases
+        """
+        self.roadmap_data, videos_by_id = compact_phases(phases)
+        self._phases = phases
+        self.phase_count, self.video_count, self.first_thumbnail = summarize_phases(phases)
+        if store_videos:
+            Video.store_many(videos_by_id)
+            Video.add_catalog_topics(phase_topics_by_video(phases))
+        return videos_by_id
+
+    @staticmethod
+    def prefetch_phases(learning_paths):
+        """Expands several paths' phases with a single Video query."""
+        video_ids = {v for path in learning_paths for v in phase_video_ids(path.roadmap_data)}
+        videos_by_id = Video.fields_by_id(video_ids)
+        for path in learning_paths:
+            path._phases = expand_phases(path.roadmap_data, videos_by_id)
+
+
+class Video(models.Model):
+    """
+    A YouTube video referenced by roadmaps, stored once however many
+    roadmaps include it. Updated in place by enrichment/revalidation.
+    """
+    video_id = models.CharField(max_length=20, unique=True)
+    title = models.CharField(max_length=255, blank=True)
+    description = models.TextField(blank=True)
+    thumbnail = models.URLField(max_length=500, blank=True)
+    playlist_id = models.CharField(max_length=64, blank=True)
+    channel = models.CharField(max_length=255, blank=True)
+    published_at = models.CharField(max_length=10, blank=True, help_text="YYYY-MM-DD, as returned by the search API")
+    duration = models.CharField(max_length=12, blank=True)
+    view_count = models.PositiveBigIntegerField(null=True, blank=True)
+
+    # Local catalog (see catalog.py), searched before the YouTube API
+    catalog_topics = models.TextField(blank=True, help_text="Phase titles this video was picked for, one per line")
+    curated = models.BooleanField(default=False, help_text="Vetted by an admin: ranked higher in catalog matches")
+    excluded = models.BooleanField(default=False, help_text="Never serve from the local catalog")
+    available = models.BooleanField(default=True, help_text="False once videos.list reports it deleted/private")
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return self.title or self.video_id
+
+    @classmethod
+    def add_catalog_topics(cls, topics_by_id):
+        """
+        Records which phase titles each video was picked for (the catalog's
+        strongest matching signal). Only the VIDEO_CATALOG_MAX_TOPICS most
+        recently added titles are kept, so rows and the index stay bounded.
+
+        Args:
+            topics_by_id (dict): video_id -> iterable of phase titles
+        """
+        max_topics = max(1, getattr(settings, 'VIDEO_CATALOG_MAX_TOPICS', 20))
+        changed = []
+        for video in cls.objects.filter(video_id__in=list(topics_by_id)).only('id', 'video_id', 'catalog_topics'):
+            known = [line for line in video.catalog_topics.splitlines() if line]
+            new = [topic for topic in dict.fromkeys(topics_by_id[video.video_id]) if topic and topic not in known]
+            if new:
+                video.catalog_topics = '\n'.join((known + new)[-max_topics:])
+                changed.append(video)
+        if changed:
+            cls.objects.bulk_update(changed, ['catalog_topics'])
+
+    @classmethod
+    def fields_by_id(cls, video_ids):
+        """video_id -> dict of the fields roadmaps use"""
+        rows = cls.objects.filter(video_id__in=list(video_ids)).values('video_id', *VIDEO_FIELDS)
+        videos_by_id = {}
+        for row in rows:
+            video_id = row.pop('video_id')
+            if row['view_count'] is None:
+                row.pop('view_count')  # Not enriched yet
+            videos_by_id[video_id] = row
+        return videos_by_id
+
+    @classmethod
+    def store_many(cls, videos_by_id):
+        """
+        Inserts new videos and refreshes existing ones (one upsert per set of
+        known fields, so un-enriched copies never blank out a stored duration).
+        """
+        groups = {}
+        for video_id, fields in videos_by_id.items():
+            known = tuple(field for field in VIDEO_FIELDS if fields.get(field) is not None)
+            video = cls(video_id=video_id, **{field: fields[field] for field in known})
+            video.title = video.title[:255]
+            video.channel = video.channel[:255]
+            groups.setdefault(known, []).append(video)
+
+        for known, videos in groups.items():
+            cls.objects.bulk_create(
+                videos,
+                update_conflicts=True,
+                unique_fields=['video_id'],
+                update_fields=list(known) + ['updated_at'],
+            )
+
+
+class RoadmapTopicCache(models.Model):
+    """
+    Shared cache of Gemini topic lists, keyed by the normalized query.
+    Several variants can be stored per key so repeat searches still get some variety.
+    """
+    query_key = models.CharField(max_length=255, help_text="Normalized search query")
+    skill_level = models.CharField(max_length=50)
+    duration_bucket = models.IntegerField(help_text="Duration rounded up to a standard length (weeks)")
+    variant = models.PositiveSmallIntegerField(default=0)
+    topics = models.JSONField()
+    hits = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ('query_key', 'skill_level', 'duration_bucket', 'variant')
+        indexes = [
+            models.Index(fields=['last_used_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.query_key} ({self.skill_level}, {self.duration_bucket}w) #{self.variant}"
+
+
+class YouTubeKeyQuota(models.Model):
+    """
+    Daily quota usage for one YouTube Data API key, shared by every worker process.
+    Keys are stored by fingerprint only; the key itself stays in settings.
+    """
+    key_fingerprint = models.CharField(max_length=64, unique=True)
+    label = models.CharField(max_length=20, help_text="First characters of the key, for display")
+    quota_day = models.DateField(help_text="Quota day (Pacific Time) that units_used belongs to")
+    units_used = models.PositiveIntegerField(default=0)
+    cooldown_until = models.DateTimeField(null=True, blank=True, help_text="Key is skipped until this time (e.g. after a 403)")
+    last_error = models.CharField(max_length=255, blank=True)
+    last_used_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.label} ({self.units_used} units on {self.quota_day})"
+
+
+class CircuitBreaker(models.Model):
+    """
+    Health of an external provider (e.g. Gemini), shared by every worker process.
+
+    closed    -> calls go through; consecutive failures are counted
+    open      -> calls are skipped until retry_at
+    half_open -> one probe call is in flight to see if the provider recovered
+    """
+    STATE_CLOSED = 'closed'
+    STATE_OPEN = 'open'
+    STATE_HALF_OPEN = 'half_open'
+    STATE_CHOICES = [
+        (STATE_CLOSED, 'Closed'),
+        (STATE_OPEN, 'Open'),
+        (STATE_HALF_OPEN, 'Half-open (probing)'),
+    ]
+
+    name = models.CharField(max_length=50, unique=True)
+    state = models.CharField(max_length=10, choices=STATE_CHOICES, default=STATE_CLOSED)
+    consecutive_failures = models.PositiveIntegerField(default=0)
+    trip_count = models.PositiveIntegerField(default=0, help_text="Times the breaker has opened")
+    opened_at = models.DateTimeField(null=True, blank=True)
+    retry_at = models.DateTimeField(null=True, blank=True, help_text="When the next probe call is allowed")
+    last_error = models.CharField(max_length=255, blank=True)
+    last_failure_at = models.DateTimeField(null=True, blank=True)
+    last_success_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.name} ({self.get_state_display()})"
+
+
+class SingleFlightLock(models.Model):
+    """
+    Cross-process lock for singleflight.single_flight, shared by every worker
+    process. The leader holds it while computing, then publishes its result
+    here for a few seconds so followers in other processes can pick it up.
+    """
+    key = models.CharField(max_length=32, unique=True, help_text="MD5 of the single-flight key")
+    token = models.CharField(max_length=32, blank=True, help_text="Current holder; empty when free")
+    locked_until = models.DateTimeField(null=True, blank=True, help_text="Lock is up for grabs after this (leader hung or crashed)")
+    result = models.JSONField(null=True, blank=True, help_text="[value] published by the last leader")
+    expires_at = models.DateTimeField(null=True, blank=True, help_text="When the published result stops being served")
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['expires_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.key} ({'held' if self.token else 'free'})"
@@ -0,0 +1,139 @@
+"""
+Compact storage format for LearningPath.roadmap_data.
+
+Phases are stored without their video objects; each one only lists the
+YouTube IDs of its videos, which live once in the shared Video table:
+
+    {'title': 'Python Basics', 'estimated_duration': '1 week(s)', 'video_ids': ['abc', ...]}
+
+phase_number, phase_title and search_query are derived on the way out
+(search_query is only stored when it differs from the title), so templates
+keep getting the same phase shape that build_roadmap_phases() produces.
+
+The helpers are pure (no database access). Data migrations carry frozen
+copies of them rather than importing this module.
+"""
+
+# Video fields kept in the Video table (everything the search/enrichment stages produce)
+VIDEO_FIELDS = ('title', 'description', 'thumbnail', 'playlist_id', 'channel', 'published_at', 'duration', 'view_count')
+
+
+def is_compact(roadmap_data):
+    """True if no phase carries embedded video objects (legacy rows do)."""
+    return not any('videos' in phase for phase in roadmap_data or [])
+
+
+def has_pending_videos(roadmap_data):
+    """True if any phase is still waiting for its videos (same key in both formats)."""
+    return any(phase.get('videos_pending') for phase in roadmap_data or [])
+
+
+def compact_phases(phases):
+    """
+    Splits full phase objects into compact phases and their videos.
+
+    Videos without a video_id can't be referenced and are dropped (search
+    only returns type=video results, so this doesn't happen in practice).
+
+    Returns:
+        tuple: (compact phase list, dict of video_id -> video fields)
+    """
+    compact = []
+    videos_by_id = {}
+
+    for phase in phases:
+        title = phase.get('title') or phase.get('phase_title', '')
+        video_ids = []
+        for video in phase.get('videos', []):
+            video_id = video.get('video_id')
+            if not video_id:
+                continue
+            video_ids.append(video_id)
+            videos_by_id[video_id] = {field: video[field] for field in VIDEO_FIELDS if field in video}
+
+        entry = {
+            'title': title,
+            'estimated_duration': phase.get('estimated_duration', ''),
+            'video_ids': video_ids,
+        }
+        if phase.get('search_query', title) != title:
+            entry['search_query'] = phase['search_query']
+        if phase.get('videos_pending'):
+            entry['videos_pending'] = True
+        compact.append(entry)
+
+    return compact, videos_by_id
+
+
+def phase_video_ids(roadmap_data):
+    """Every video ID referenced by a stored roadmap (compact or legacy)."""
+    video_ids = []
+    for phase in roadmap_data or []:
+        if 'videos' in phase:
+            video_ids.extend(video.get('video_id') for video in phase['videos'] if video.get('video_id'))
+        else:
+            video_ids.extend(phase.get('video_ids', []))
+    return video_ids
+
+
+def phase_topics_by_video(phases):
+    """video_id -> search queries of the phases it appears in."""
+    topics_by_id = {}
+    for phase in phases:
+        topic = phase.get('search_query') or phase.get('title', '')
+        for video in phase.get('videos', []):
+            if video.get('video_id'):
+                topics_by_id.setdefault(video['video_id'], []).append(topic)
+    return topics_by_id
+
+
+def expand_phases(roadmap_data, videos_by_id):
+    """
+    Rebuilds full phase objects (the build_roadmap_phases shape).
+
+    Args:
+        roadmap_data (list): Stored phases; legacy phases with embedded videos pass through
+        videos_by_id (dict): video_id -> video fields
+
+    Returns:
+        list: Phase objects with phase_number, phase_title, title, estimated_duration,
+              videos, search_query (and videos_pending when set)
+    """
+    phases = []
+
+    for idx, stored in enumerate(roadmap_data or [], 1):
+        if 'videos' in stored:
+            phases.append(stored)  # Legacy row, not migrated yet
+            continue
+
+        title = stored.get('title', '')
+        videos = [
+            {'video_id': video_id, **videos_by_id[video_id]}
+            for video_id in stored.get('video_ids', [])
+            if video_id in videos_by_id
+        ]
+        phase = {
+            'phase_number': idx,
+            'phase_title': title,
+            'title': title,
+            'estimated_duration': stored.get('estimated_duration', ''),
+            'videos': videos,
+            'search_query': stored.get('search_query', title),
+        }
+        if stored.get('videos_pending'):
+            phase['videos_pending'] = True
+        phases.append(phase)
+
+    return phases
+
+
+def summarize_phases(phases):
+    """
+    Summary columns for list pages.
+
+    Returns:
+        tuple: (phase count, video count, first video thumbnail or '')
+    """
+    videos = [video for phase in phases for video in phase.get('videos', [])]
+    first_thumbnail = next((video.get('thumbnail') for video in videos if video.get('thumbnail')), '')
+    return len(phases), len(videos), first_thumbnail
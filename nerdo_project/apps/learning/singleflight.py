@@ -0,0 +1,148 @@
+import json
+import time
+import uuid
+import hashlib
+import logging
+import threading
+from datetime import timedelta
+from django.conf import settings
+from django.db import DatabaseError
+from django.db.models import Q
+from django.utils import timezone
+from .models import SingleFlightLock
+
+logger = logging.getLogger(__name__)
+
+# Calls currently running in this process, by key
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+def _digest(key):
+    return hashlib.md5(key.encode('utf-8')).hexdigest()
+
+
+def single_flight(key, compute, timeout=None, poll_interval=0.1):
+    """
+    Runs compute() once for all concurrent callers that share the same key.
+
+    Inside a process, followers wait on the leader's thread. Across worker
+    processes, the leader holds a SingleFlightLock row and publishes its
+    result there (if it is JSON-serializable) for a short while so followers
+    can pick it up. If the leader hangs or crashes, followers give up waiting
+    after `timeout` seconds and compute the value themselves.
+
+    Args:
+        key (str): Identifies the work (e.g. normalized query)
+        compute (callable): Produces the value; called with no arguments
+        timeout (float): Max seconds to wait on another caller
+
+    Returns:
+        Whatever compute() returns
+    """
+    if timeout is None:
+        timeout = getattr(settings, 'SINGLE_FLIGHT_TIMEOUT', 30)
+
+    # 1. Coalesce with other threads in this process
+    with _inflight_lock:
+        call = _inflight.get(key)
+        is_leader = call is None
+        if is_leader:
+            call = _Call()
+            _inflight[key] = call
+
+    if not is_leader:
+        if call.done.wait(timeout):
+            if call.error is not None:
+                raise call.error
+            return call.result
+        logger.warning(f"Single-flight leader for '{key}' timed out after {timeout}s; computing locally")
+        return compute()
+
+    # 2. This thread leads locally; coalesce with other processes
+    try:
+        call.result = _run_across_processes(key, compute, timeout, poll_interval)
+        return call.result
+    except Exception as e:
+        call.error = e
+        raise
+    finally:
+        with _inflight_lock:
+            _inflight.pop(key, None)
+        call.done.set()
+
+
+def _release(digest, token, published):
+    """Frees the lock, publishing [result] (or nothing) for SINGLE_FLIGHT_RESULT_TTL seconds."""
+    now = timezone.now()
+    ttl = getattr(settings, 'SINGLE_FLIGHT_RESULT_TTL', 10) if published is not None else 0
+    SingleFlightLock.objects.filter(key=digest, token=token).update(
+        token='', locked_until=None, result=published, expires_at=now + timedelta(seconds=ttl),
+    )
+    # Drop free rows whose result is no longer served
+    SingleFlightLock.objects.filter(token='', expires_at__lt=now).delete()
+
+
+def _run_across_processes(key, compute, timeout, poll_interval):
+    digest = _digest(key)
+    token = uuid.uuid4().hex
+    now = timezone.now()
+
+    # Same claim pattern as the circuit breaker: make sure the row exists, then
+    # whoever flips it to locked with a conditional UPDATE leads. The lock
+    # expires on its own so a dead leader can't block followers forever.
+    try:
+        SingleFlightLock.objects.bulk_create([SingleFlightLock(key=digest)], ignore_conflicts=True)
+        acquired = SingleFlightLock.objects.filter(
+            Q(locked_until__isnull=True) | Q(locked_until__lte=now),
+            key=digest,
+        ).update(token=token, locked_until=now + timedelta(seconds=timeout + 1), result=None) == 1
+    except DatabaseError as e:
+        logger.warning(f"Single-flight lock for '{key}' unavailable ({e}); computing without it")
+        return compute()
+
+    if acquired:
+        published = None
+        try:
+            result = compute()
+            published = _publishable(result)
+            return result
+        finally:
+            try:
+                _release(digest, token, published)
+            except DatabaseError as e:
+                logger.warning(f"Could not release single-flight lock for '{key}': {e}")
+
+    # Another process is computing: wait for its published result
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            row = SingleFlightLock.objects.filter(key=digest).values('token', 'result', 'expires_at').first()
+        except DatabaseError:
+            break
+        if row and row['result'] is not None and row['expires_at'] and row['expires_at'] > timezone.now():
+            return row['result'][0]
+        if not row or not row['token']:
+            # Leader finished without publishing (it failed, or the value isn't JSON): do it ourselves
+            break
+        time.sleep(poll_interval)
+    else:
+        logger.warning(f"Single-flight leader for '{key}' in another process timed out after {timeout}s")
+
+    return compute()
+
+
+def _publishable(result):
+    """[result] if it can be stored as JSON, else None (followers then compute it themselves)."""
+    try:
+        json.dumps(result)
+    except (TypeError, ValueError):
+        return None
+    return [result]
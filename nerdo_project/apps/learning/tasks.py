@@ -0,0 +1,175 @@
+import logging
+from datetime import timedelta
+from django.utils import timezone
+from .models import LearningPath
+from .topic_cache import normalize_topic
+from .utils import generate_complete_roadmap, resolve_pending_videos
+from .metrics import generation_trace, span
+from apps.billing.usage import usage_context
+
+logger = logging.getLogger(__name__)
+
+
+def get_or_enqueue_learning_path(user, topic, skill_level, duration):
+    """
+    Returns the id of the user's identical path, queueing a new one if needed.
+    Asking again for a failed roadmap counts as a retry.
+
+    The insert is an upsert on the (user, normalized_topic, skill_level,
+    duration) unique constraint: one round trip that either creates the
+    path or hands back the existing row's id, so concurrent identical
+    requests can never create duplicates.
+
+    Returns:
+        int: LearningPath id
+    """
+    learning_path = LearningPath(
+        user=user,
+        topic=topic,
+        normalized_topic=normalize_topic(topic)[:255],
+        skill_level=skill_level,
+        duration=duration,
+        roadmap_data=[],
+        generation_status=LearningPath.GENERATION_PENDING,
+    )
+    # On conflict the no-op update makes the existing row's id come back
+    LearningPath.objects.bulk_create(
+        [learning_path],
+        update_conflicts=True,
+        unique_fields=['user', 'normalized_topic', 'skill_level', 'duration'],
+        update_fields=['normalized_topic'],
+    )
+
+    # Only touches the row if an earlier attempt failed
+    LearningPath.objects.filter(
+        id=learning_path.pk,
+        generation_status=LearningPath.GENERATION_FAILED,
+    ).update(generation_status=LearningPath.GENERATION_PENDING, generation_error='')
+
+    return learning_path.pk
+
+
+def claim_learning_path(path_id):
+    """
+    Moves a pending path to 'generating' for the caller.
+
+    The conditional UPDATE only succeeds for one caller, so several
+    process_roadmaps workers (and the streaming view) can share the queue.
+
+    Returns:
+        bool: True if this caller now owns the path
+    """
+    return LearningPath.objects.filter(
+        id=path_id,
+        generation_status=LearningPath.GENERATION_PENDING,
+    ).update(
+        generation_status=LearningPath.GENERATION_RUNNING,
+        generation_started_at=timezone.now(),
+    ) == 1
+
+
+def claim_next_learning_path():
+    """
+    Atomically claims the oldest pending path for this worker.
+
+    Returns:
+        LearningPath or None if the queue is empty
+    """
+    pending = LearningPath.objects.filter(generation_status=LearningPath.GENERATION_PENDING)
+
+    for path_id in pending.order_by('created_at').values_list('id', flat=True)[:10]:
+        if claim_learning_path(path_id):
+            return LearningPath.objects.get(id=path_id)
+
+    return None
+
+
+def requeue_stale_learning_paths(stale_after_seconds):
+    """Returns paths stuck in 'generating' (e.g. a worker was killed) to the queue."""
+    cutoff = timezone.now() - timedelta(seconds=stale_after_seconds)
+    return LearningPath.objects.filter(
+        generation_status=LearningPath.GENERATION_RUNNING,
+        generation_started_at__lt=cutoff,
+    ).update(generation_status=LearningPath.GENERATION_PENDING)
+
+
+def complete_learning_path(learning_path, roadmap_data):
+    """Stores a finished roadmap and marks the path ready."""
+    with span('db_save', phases=len(roadmap_data)):
+        learning_path.set_phases(roadmap_data)
+        learning_path.generation_status = LearningPath.GENERATION_READY
+        learning_path.generation_error = ''
+        learning_path.save(update_fields=['roadmap_data', 'generation_status', 'generation_error', 'updated_at'])
+    logger.info(f"Roadmap {learning_path.id} ready ({len(roadmap_data)} phases)")
+
+
+def fail_learning_path(learning_path, error):
+    """Marks a path failed so the user can retry it."""
+    logger.error(f"Error generating roadmap {learning_path.id}: {error}")
+    learning_path.generation_status = LearningPath.GENERATION_FAILED
+    learning_path.generation_error = str(error)[:500]
+    learning_path.save(update_fields=['generation_status', 'generation_error', 'updated_at'])
+
+
+def fill_pending_videos(learning_path, roadmap_data):
+    """
+    Finishes the phases that missed the video deadline and writes them to the row.
+
+    The late lookups only reach this worker's cache, which the web process
+    can't read, so the worker stores them itself once the roadmap is saved.
+
+    Returns:
+        bool: True if any phase was filled in
+    """
+    with span('pending_videos'):
+        if not resolve_pending_videos(roadmap_data):
+            return False
+        learning_path.set_phases(roadmap_data)
+        learning_path.save(update_fields=['roadmap_data', 'updated_at'])
+    return True
+
+
+def save_generation_trace(learning_path, trace):
+    """Stores the per-stage timings of a generation on its path (see metrics.py)."""
+    learning_path.generation_trace = trace.as_dict()
+    LearningPath.objects.filter(id=learning_path.id).update(generation_trace=learning_path.generation_trace)
+
+
+def process_learning_path(learning_path):
+    """
+    Generates the roadmap for a claimed path and stores the outcome.
+
+    Returns:
+        bool: True if the roadmap is ready
+    """
+    with generation_trace() as trace, usage_context(user=learning_path.user_id, feature='roadmap'):
+        with span('generation', mode='worker') as attrs:
+            try:
+                roadmap_data = generate_complete_roadmap(
+                    learning_path.topic,
+                    learning_path.skill_level,
+                    learning_path.duration,
+                )
+                complete_learning_path(learning_path, roadmap_data)
+            except Exception as e:
+                attrs['outcome'] = 'failed'
+                try:
+                    fail_learning_path(learning_path, e)
+                except Exception as save_error:
+                    # Left in 'generating'; requeue_stale_learning_paths() retries it
+                    logger.error(f"Could not mark roadmap {learning_path.id} failed: {save_error}")
+                    learning_path.generation_status = LearningPath.GENERATION_FAILED
+                    return False
+
+        if learning_path.is_ready:
+            try:
+                fill_pending_videos(learning_path, roadmap_data)
+            except Exception as e:
+                # The roadmap is saved; the page retries from the cache
+                logger.error(f"Could not fill pending videos for roadmap {learning_path.id}: {e}")
+
+    try:
+        save_generation_trace(learning_path, trace)
+    except Exception as e:
+        logger.error(f"Could not save the generation trace of roadmap {learning_path.id}: {e}")
+    return learning_path.is_ready
@@ -0,0 +1,149 @@
+import re
+import random
+import logging
+from datetime import timedelta
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+from .models import RoadmapTopicCache
+
+logger = logging.getLogger(__name__)
+
+# Phrases and words that don't change what the user wants to learn
+FILLER_PHRASES = (
+    'i want to', 'i would like to', 'teach me', 'how to', 'how do i',
+    'introduction to', 'intro to', 'getting started with', 'basics of',
+)
+FILLER_WORDS = {'learn', 'learning', 'study', 'master', 'about', 'the', 'a', 'an', 'please'}
+
+# Durations offered on the learning home page
+DURATION_BUCKETS = (4, 8, 12, 24)
+
+
+def normalize_topic(topic):
+    """Case/whitespace-insensitive form of a topic (stored as LearningPath.normalized_topic)."""
+    return ' '.join(str(topic).split()).lower()
+
+
+def normalize_roadmap_query(user_query):
+    """
+    Reduces a search to its subject so equivalent searches share a cache entry.
+    e.g. "Learn Python!", "how to learn python" and "  PYTHON " all become "python".
+    """
+    text = normalize_topic(user_query)
+    text = re.sub(r'[^\w\s+#]', ' ', text)  # Keep c++ / c# intact
+    text = ' '.join(text.split())
+
+    for phrase in FILLER_PHRASES:
+        text = re.sub(rf'\b{re.escape(phrase)}\b', ' ', text)
+
+    words = [word for word in text.split() if word not in FILLER_WORDS]
+
+    # Never collapse a query to nothing (e.g. a user searching "Learn")
+    return ' '.join(words) or normalize_topic(user_query)
+
+
+def duration_bucket(duration_weeks):
+    """Rounds a duration up to the nearest standard length."""
+    for bucket in DURATION_BUCKETS:
+        if duration_weeks <= bucket:
+            return bucket
+    return DURATION_BUCKETS[-1]
+
+
+def _cache_filter(user_query, skill_level, duration_weeks):
+    return {
+        'query_key': normalize_roadmap_query(user_query)[:255],
+        'skill_level': skill_level.lower(),
+        'duration_bucket': duration_bucket(duration_weeks),
+    }
+
+
+def topic_cache_key(user_query, skill_level, duration_weeks):
+    """Flat string form of the cache lookup, for locks and logging."""
+    lookup = _cache_filter(user_query, skill_level, duration_weeks)
+    return f"{lookup['query_key']}|{lookup['skill_level']}|{lookup['duration_bucket']}"
+
+
+def _expired_before():
+    return timezone.now() - timedelta(seconds=getattr(settings, 'ROADMAP_TOPIC_CACHE_TTL', 30 * 86400))
+
+
+def _live_entries(lookup):
+    return RoadmapTopicCache.objects.filter(created_at__gte=_expired_before(), **lookup)
+
+
+def get_cached_topics(user_query, skill_level, duration_weeks, min_variants=None):
+    """
+    Serves a cached topic list once enough variants exist for this query.
+
+    While fewer than ROADMAP_TOPIC_VARIANTS variants are stored this returns
+    None, so callers generate (and store) a fresh variant instead.
+
+    Args:
+        min_variants (int): Override the variant count needed (1 = any cached
+            variant, used while Gemini is unavailable)
+
+    Returns:
+        list or None
+    """
+    variants_wanted = max(1, min_variants or getattr(settings, 'ROADMAP_TOPIC_VARIANTS', 3))
+    lookup = _cache_filter(user_query, skill_level, duration_weeks)
+
+    # Expired variants are skipped (so they get regenerated), never deleted
+    # here: a read must not take the write lock
+    variants = list(_live_entries(lookup).values_list('id', 'topics', 'last_used_at'))
+    if len(variants) < variants_wanted:
+        return None
+
+    entry_id, topics, last_used_at = random.choice(variants)
+
+    # Recency only feeds LRU eviction, so it is recorded at most once per interval
+    now = timezone.now()
+    if now - last_used_at >= timedelta(seconds=getattr(settings, 'ROADMAP_TOPIC_CACHE_TOUCH_INTERVAL', 300)):
+        RoadmapTopicCache.objects.filter(id=entry_id).update(hits=F('hits') + 1, last_used_at=now)
+    return topics
+
+
+def cached_topic_variants(user_query, skill_level, duration_weeks):
+    """All stored topic lists for a query (no hit counting; used by the cache warmer)."""
+    lookup = _cache_filter(user_query, skill_level, duration_weeks)
+    return list(_live_entries(lookup).order_by('variant').values_list('topics', flat=True))
+
+
+def store_topics(user_query, skill_level, duration_weeks, topics):
+    """Saves a freshly generated topic list as a new variant, then evicts old entries."""
+    variants_wanted = max(1, getattr(settings, 'ROADMAP_TOPIC_VARIANTS', 3))
+    lookup = _cache_filter(user_query, skill_level, duration_weeks)
+
+    # Expired variants of this query free their slot for the new one
+    RoadmapTopicCache.objects.filter(created_at__lt=_expired_before(), **lookup).delete()
+
+    used = set(RoadmapTopicCache.objects.filter(**lookup).values_list('variant', flat=True))
+    free = [variant for variant in range(variants_wanted) if variant not in used]
+    if not free:
+        return
+
+    try:
+        with transaction.atomic():
+            RoadmapTopicCache.objects.create(variant=free[0], topics=topics, **lookup)
+    except IntegrityError:
+        # Another worker stored this variant first
+        return
+
+    evict_topic_cache()
+
+
+def evict_topic_cache():
+    """Drops expired entries, then the least recently used ones above the size cap."""
+    max_entries = getattr(settings, 'ROADMAP_TOPIC_CACHE_MAX_ENTRIES', 5000)
+
+    RoadmapTopicCache.objects.filter(created_at__lt=_expired_before()).delete()
+
+    stale_ids = list(
+        RoadmapTopicCache.objects.order_by('-last_used_at').values_list('id', flat=True)[max_entries:]
+    )
+    if stale_ids:
+        RoadmapTopicCache.objects.filter(id__in=stale_ids).delete()
+        logger.info(f"Evicted {len(stale_ids)} roadmap topic cache entries")
@@ -5,7 +5,10 @@ urlpatterns = [
     path('', views.learning_home, name='learning_home'),
     path('search/', views.search_roadmap, name='search_roadmap'),
     path('roadmap/', views.roadmap_view, name='roadmap_view'),
+    path('roadmap/stream/', views.roadmap_stream, name='roadmap_stream'),
     path('roadmap/<int:path_id>/', views.roadmap_view_id, name='roadmap_view_id'),
+    path('roadmap/<int:path_id>/status/', views.roadmap_status, name='roadmap_status'),
     path('history/', views.learning_history, name='learning_history'),
     path('quick-search/<str:topic>/', views.quick_search, name='quick_search'),
+    path('metrics/', views.learning_metrics, name='learning_metrics'),
 ]
@@ -1,18 +1,60 @@
 import time
-import requests
+import random
 import logging
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeout
 from django.conf import settings
 from django.core.cache import cache
-import google.generativeai as genai
+from django.db import close_old_connections, OperationalError
+from .topic_cache import get_cached_topics, store_topics, topic_cache_key
+from .singleflight import single_flight
+from .circuit_breaker import allow_request, record_success, record_failure, is_transient_error, CircuitOpen, GEMINI
+from .youtube_keys import acquire_api_key, get_api_keys, report_key_failure, error_reason, fingerprint, YouTubeQuotaExhausted, SEARCH_COST
+from .enrichment import enrich_roadmap_videos
+from .catalog import find_catalog_videos
+from .metrics import span, incr
+from nerdo_project.http_client import get_session
+from apps.billing.models import ProviderUsage
+from apps.billing.usage import record_usage, gemini_cost
 
 logger = logging.getLogger(__name__)
 
-# Configure Gemini AI
-try:
-    if hasattr(settings, 'GEMINI_API_KEY') and settings.GEMINI_API_KEY:
-        genai.configure(api_key=settings.GEMINI_API_KEY)
-except Exception as e:
-    logger.error(f"Failed to configure Gemini AI: {e}")
+MAX_ROADMAP_PHASES = 8
+
+# Shared pool for per-phase YouTube lookups (bounded so a burst of roadmaps
+# can't open an unlimited number of outbound connections)
+_youtube_executor = ThreadPoolExecutor(
+    max_workers=getattr(settings, 'YOUTUBE_FETCH_WORKERS', 4),
+    thread_name_prefix='youtube-fetch',
+)
+
+_genai = None
+_genai_lock = threading.Lock()
+
+
+def get_genai():
+    """
+    The google.generativeai module, imported and configured on first use.
+
+    The SDK pulls in grpc, protobuf and pydantic, so importing it at module
+    level made every web worker pay for it at boot (see
+    benchmarks/worker_startup.py), even workers that never build a roadmap.
+    """
+    global _genai
+    if _genai is None:
+        with _genai_lock:
+            if _genai is None:
+                import google.generativeai as genai
+
+                # Configure Gemini AI
+                try:
+                    if hasattr(settings, 'GEMINI_API_KEY') and settings.GEMINI_API_KEY:
+                        genai.configure(api_key=settings.GEMINI_API_KEY)
+                except Exception as e:
+                    logger.error(f"Failed to configure Gemini AI: {e}")
+                _genai = genai
+    return _genai
 
 def generate_roadmap_topics(user_query, skill_level="beginner", duration_weeks=12):
     """
@@ -27,90 +69,26 @@ def generate_roadmap_topics(user_query, skill_level="beginner", duration_weeks=1
     Returns:
         list: Structured learning topics/phases
     """
+    # Identical concurrent requests (e.g. a trending topic) share one Gemini call
+    return single_flight(
+        f"roadmap_topics:{topic_cache_key(user_query, skill_level, duration_weeks)}",
+        lambda: _generate_roadmap_topics(user_query, skill_level, duration_weeks),
+    )
+
+
+def _generate_roadmap_topics(user_query, skill_level, duration_weeks):
+    # Shared cache first: popular queries don't need a fresh Gemini call
+    cached_topics = get_cached_topics(user_query, skill_level, duration_weeks)
+    incr('cache', cache='topics', outcome='hit' if cached_topics else 'miss')
+    if cached_topics:
+        logger.info(f"Serving cached roadmap topics for: {user_query}")
+        return cached_topics
+
     try:
         # Initialize the Gemini model (using flash for speed/cost balance)
-        model = genai.GenerativeModel('gemini-flash-latest')
-        
-        # Adjust phase count based on skill level
-        if skill_level.lower() == 'beginner':
-            # Beginners need shorter, less overwhelming roadmaps
-            num_phases = min(6, max(3, duration_weeks // 2))
-        else:
-            num_phases = duration_weeks // 2 if duration_weeks < 8 else 6
-        
-        # Custom instructions based on skill level
-        if skill_level.lower() == 'beginner':
-            focus_instruction = """
-            1. Focus primarily on "WHAT IS" and FOUNDATIONAL CONCEPTS (e.g., "What is Python?", "Understanding Variables", "How the Blockchain works").
-            2. Start with definitions and conceptual understanding before moving to syntax or usage.
-            3. Keep topics simple, clear, and easy to digest for an absolute beginner.
-            """
-        else:
-            focus_instruction = """
-            1. Make it PRACTICAL and PROJECT-BASED (e.g., "Build a Weather App" instead of "Variables").
-            2. Focus on implementation, building, and real-world application.
-            """
-
-        # Create a structured prompt that respects the user's parameters
-        prompt = f"""You are an expert curriculum designer creating a unique learning path. 
-        A student wants to learn about: "{user_query}"
-        
-        Parameters:
-        - Current Skill Level: {skill_level}
-        - Available Time: {duration_weeks} weeks
-        - Target Phase Count: Roughly {num_phases}
-        
-        Create a partitioned learning roadmap.
-        CRITICAL: 
-        {focus_instruction}
-        3. Ensure it is UNIQUE to this specific request. 
-        4. Each phase MUST be a search-friendly topic for YouTube.
-
-        Format your response EXACTLY as a numbered list:
-        1. [Phase Title]
-        2. [Phase Title]
-        ...
-
-        Requirements:
-        - Phases should be 4-8 words long.
-        - Include terms like "tutorial", "explained", "course", "crash course" where appropriate.
-        - Ensure the progression makes logical sense for a {skill_level}.
-        
-        Now create the roadmap topics:
-        """
-        
-        # Generate content with retry logic
-        max_retries = 3
-        response = None
-        
-        for attempt in range(max_retries):
-            try:
-                response = model.generate_content(
-                    prompt,
-                    generation_config=genai.types.GenerationConfig(
-                        temperature=0.8, # Increase temperature for uniqueness
-                        max_output_tokens=1024, # Increased to prevent cut-off
-                    ),
-                    safety_settings={
-                        genai.types.HarmCategory.HARM_CATEGORY_HARASSMENT: genai.types.HarmBlockThreshold.BLOCK_ONLY_HIGH,
-                        genai.types.HarmCategory.HARM_CATEGORY_HATE_SPEECH: genai.types.HarmBlockThreshold.BLOCK_ONLY_HIGH,
-                        genai.types.HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT: genai.types.HarmBlockThreshold.BLOCK_ONLY_HIGH,
-                        genai.types.HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT: genai.types.HarmBlockThreshold.BLOCK_ONLY_HIGH,
-                    }
-                )
-                break # Success
-            except Exception as e:
-                # Check for rate limit (429) or other transient errors
-                if "429" in str(e) or "Quota exceeded" in str(e):
-                    if attempt < max_retries - 1:
-                        sleep_time = 2 * (2 ** attempt) # Exponential backoff: 2s, 4s, 8s
-                        logger.warning(f"Gemini API rate limit hit. Retrying in {sleep_time}s...")
-                        time.sleep(sleep_time)
-                        continue
-                raise e # Re-raise if not a rate limit or max retries reached
-                
-        if not response:
-             raise Exception("Failed to generate content after retries")
+        model = get_genai().GenerativeModel('gemini-flash-latest')
+        prompt = _build_roadmap_prompt(user_query, skill_level, duration_weeks)
+        response = _call_gemini(model, prompt)
         
         # Parse the response safely
         roadmap_text = ""
@@ -127,75 +105,296 @@ def generate_roadmap_topics(user_query, skill_level="beginner", duration_weeks=1
                   # For now, let's treat it as empty so fallback triggers
                   pass
         
+        _record_gemini_usage(response)
+
         # Extract numbered lines
         topics = []
         for line in roadmap_text.split('\n'):
-            line = line.strip()
-            # Remove numbering: "1. " or "1) " or "- "
-            if line and (line[0].isdigit() or line.startswith('-')):
-                # Remove the number and any punctuation
-                parts = line.split('.', 1)
-                if len(parts) > 1:
-                    topic = parts[-1].strip()
-                else:
-                    # Try splitting by paren if dot failed
-                    parts = line.split(')', 1)
-                    if len(parts) > 1:
-                        topic = parts[-1].strip()
-                    else:
-                        topic = line.lstrip('-0123456789. )').strip()
-                        
-                if topic:
-                    topics.append(topic)
+            topic = _parse_topic_line(line)
+            if topic:
+                topics.append(topic)
         
         logger.info(f"Generated {len(topics)} roadmap topics for: {user_query}")
-        return topics[:8]  # Cap at 8 phases max
+        topics = topics[:MAX_ROADMAP_PHASES]  # Cap at 8 phases max
+
+        # Only real Gemini output is shared, never the fallback below
+        if topics:
+            store_topics(user_query, skill_level, duration_weeks, topics)
+        return topics
         
+    except CircuitOpen:
+        logger.warning(f"Gemini circuit open, skipping generation for: {user_query}")
+        return _degraded_topics(user_query, skill_level, duration_weeks)
     except Exception as e:
         logger.error(f"Gemini AI Error: {e}")
-        # Fallback: return a generic structure based on the query
-        return [
-            f"{user_query} crash course for {skill_level}",
-            f"{user_query} practical project tutorial",
-            f"Build a real world app with {user_query}",
-            f"{user_query} step by step guide",
-            f"{user_query} best practices and tips",
-        ]
+        return _degraded_topics(user_query, skill_level, duration_weeks)
 
 
+def _degraded_topics(user_query, skill_level, duration_weeks):
+    """Topics to serve when Gemini can't be used: any cached variant, else the fallback list."""
+    cached_topics = get_cached_topics(user_query, skill_level, duration_weeks, min_variants=1)
+    if cached_topics:
+        logger.info(f"Serving cached roadmap topics (degraded) for: {user_query}")
+        return cached_topics
+    return _fallback_topics(user_query, skill_level)
 
-def get_next_api_key():
-    """Round-robin API key rotation to handle quota limits"""
-    api_keys = getattr(settings, 'YOUTUBE_API_KEYS', [])
-    
-    # Fallback to single key if list is empty or not defined
-    if not api_keys:
-        single_key = getattr(settings, 'YOUTUBE_API_KEY', '')
-        return single_key if single_key else None
-        
-    # Filter out None/Empty keys just in case
-    valid_keys = [k for k in api_keys if k]
-    if not valid_keys:
-        return None
 
-    key_index = cache.get('youtube_key_index', 0)
-    
-    # Safety check if index is out of bounds (e.g. keys removed)
-    if key_index >= len(valid_keys):
-        key_index = 0
-        
-    key = valid_keys[key_index]
-    
-    # Move to next key
-    next_index = (key_index + 1) % len(valid_keys)
-    cache.set('youtube_key_index', next_index, timeout=None)
-    
-    return key
+def iter_roadmap_topics(user_query, skill_level="beginner", duration_weeks=12):
+    """
+    Streaming version of generate_roadmap_topics.
+
+    Uses Gemini's streaming generation and yields each numbered line as soon
+    as it is complete, so callers can start work on early phases while the
+    rest of the list is still being written. Parsing rules and the 8-phase
+    cap are the same as generate_roadmap_topics.
+
+    Yields:
+        str: Roadmap topics, in order
+    """
+    cached_topics = get_cached_topics(user_query, skill_level, duration_weeks)
+    incr('cache', cache='topics', outcome='hit' if cached_topics else 'miss')
+    if cached_topics:
+        logger.info(f"Serving cached roadmap topics for: {user_query}")
+        yield from cached_topics
+        return
+
+    topics = []
+    complete = False  # Only a fully read stream is shared through the topic cache
+    try:
+        model = get_genai().GenerativeModel('gemini-flash-latest')
+        prompt = _build_roadmap_prompt(user_query, skill_level, duration_weeks)
+        response = _call_gemini(model, prompt, stream=True)
+
+        buffer = ""
+        blocked = False
+        # Time until the last chunk (includes time spent by the consumer between topics)
+        with span('gemini_stream') as stream_attrs:
+            try:
+                for chunk in response:
+                    try:
+                        buffer += chunk.text
+                    except Exception:
+                        # Blocked/empty chunk: keep whatever complete lines we have
+                        logger.warning("Gemini stream returned a chunk without text")
+                        stream_attrs['outcome'] = 'blocked'
+                        blocked = True
+                        break
+
+                    # Hand over every complete line straight away
+                    *lines, buffer = buffer.split('\n')
+                    for line in lines:
+                        topic = _parse_topic_line(line)
+                        if topic and len(topics) < MAX_ROADMAP_PHASES:
+                            topics.append(topic)
+                            yield topic
+
+                    if len(topics) >= MAX_ROADMAP_PHASES:
+                        break
+            except Exception as e:
+                # _call_gemini only sees errors raised before the first chunk
+                if is_transient_error(e):
+                    record_failure(GEMINI, e)
+                raise
+            stream_attrs['topics'] = len(topics)
+        _record_gemini_usage(response)
+
+        # Last line has no trailing newline (a blocked chunk may have cut it short)
+        topic = _parse_topic_line(buffer) if not blocked else None
+        if topic and len(topics) < MAX_ROADMAP_PHASES:
+            topics.append(topic)
+            yield topic
+        complete = not blocked
+
+    except CircuitOpen:
+        logger.warning(f"Gemini circuit open, skipping generation for: {user_query}")
+    except Exception as e:
+        logger.error(f"Gemini AI Error: {e}")
+
+    if topics:
+        logger.info(f"Streamed {len(topics)} roadmap topics for: {user_query}")
+        if complete:
+            store_topics(user_query, skill_level, duration_weeks, topics)
+        else:
+            logger.warning(f"Not caching the {len(topics)} topics of an interrupted stream for: {user_query}")
+    else:
+        yield from _degraded_topics(user_query, skill_level, duration_weeks)
+
+
+def _build_roadmap_prompt(user_query, skill_level, duration_weeks):
+    """Builds the Gemini prompt for a roadmap request."""
+    # Adjust phase count based on skill level
+    if skill_level.lower() == 'beginner':
+        # Beginners need shorter, less overwhelming roadmaps
+        num_phases = min(6, max(3, duration_weeks // 2))
+    else:
+        num_phases = duration_weeks // 2 if duration_weeks < 8 else 6
+
+    # Custom instructions based on skill level
+    if skill_level.lower() == 'beginner':
+        focus_instruction = """
+        1. Focus primarily on "WHAT IS" and FOUNDATIONAL CONCEPTS (e.g., "What is Python?", "Understanding Variables", "How the Blockchain works").
+        2. Start with definitions and conceptual understanding before moving to syntax or usage.
+        3. Keep topics simple, clear, and easy to digest for an absolute beginner.
+        """
+    else:
+        focus_instruction = """
+        1. Make it PRACTICAL and PROJECT-BASED (e.g., "Build a Weather App" instead of "Variables").
+        2. Focus on implementation, building, and real-world application.
+        """
+
+    # Create a structured prompt that respects the user's parameters
+    prompt = f"""You are an expert curriculum designer creating a unique learning path. 
+    A student wants to learn about: "{user_query}"
+
+    Parameters:
+    - Current Skill Level: {skill_level}
+    - Available Time: {duration_weeks} weeks
+    - Target Phase Count: Roughly {num_phases}
+
+    Create a partitioned learning roadmap.
+    CRITICAL: 
+    {focus_instruction}
+    3. Ensure it is UNIQUE to this specific request. 
+    4. Each phase MUST be a search-friendly topic for YouTube.
+
+    Format your response EXACTLY as a numbered list:
+    1. [Phase Title]
+    2. [Phase Title]
+    ...
+
+    Requirements:
+    - Phases should be 4-8 words long.
+    - Include terms like "tutorial", "explained", "course", "crash course" where appropriate.
+    - Ensure the progression makes logical sense for a {skill_level}.
+
+    Now create the roadmap topics:
+    """
+
+    return prompt
+
+
+def _call_gemini(model, prompt, stream=False):
+    """
+    Calls Gemini with the roadmap generation settings, behind a circuit breaker.
+
+    Rate limits and 5xx errors are retried with a short backoff, but each one
+    counts towards the shared breaker; once it opens, this raises CircuitOpen
+    immediately instead of sleeping in the web worker.
+
+    Raises:
+        CircuitOpen: Gemini is failing and the breaker is open
+    """
+    max_retries = max(1, getattr(settings, 'GEMINI_MAX_RETRIES', 2))
+
+    with span('gemini', stream=stream) as attrs:
+        response = _call_gemini_with_retries(model, prompt, stream, max_retries, attrs)
+
+    record_success(GEMINI)
+    return response
+
+
+def _call_gemini_with_retries(model, prompt, stream, max_retries, attrs):
+    """The retry loop of _call_gemini; attempts and outcome go on the span attrs."""
+    genai = get_genai()
+    response = None
+
+    for attempt in range(max_retries):
+        attrs['retries'] = attempt
+        if not allow_request(GEMINI):
+            attrs['outcome'] = 'circuit_open'
+            raise CircuitOpen("Gemini circuit is open")
+
+        try:
+            response = model.generate_content(
+                prompt,
+                stream=stream,
+                generation_config=genai.types.GenerationConfig(
+                    temperature=0.8, # Increase temperature for uniqueness
+                    max_output_tokens=1024, # Increased to prevent cut-off
+                ),
+                safety_settings={
+                    genai.types.HarmCategory.HARM_CATEGORY_HARASSMENT: genai.types.HarmBlockThreshold.BLOCK_ONLY_HIGH,
+                    genai.types.HarmCategory.HARM_CATEGORY_HATE_SPEECH: genai.types.HarmBlockThreshold.BLOCK_ONLY_HIGH,
+                    genai.types.HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT: genai.types.HarmBlockThreshold.BLOCK_ONLY_HIGH,
+                    genai.types.HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT: genai.types.HarmBlockThreshold.BLOCK_ONLY_HIGH,
+                }
+            )
+            break # Success
+        except Exception as e:
+            if not is_transient_error(e):
+                raise e
+            # Rate limit (429) or server error: count it, then retry unless the breaker tripped
+            if record_failure(GEMINI, e) or attempt == max_retries - 1:
+                raise e
+            incr('gemini_retry')
+            sleep_time = random.uniform(0.5, 1.0) * (2 ** attempt) # Short jittered backoff: 0.5-1s, doubling
+            logger.warning(f"Gemini API error ({e}). Retrying in {sleep_time:.1f}s...")
+            time.sleep(sleep_time)
+
+    if not response:
+        raise Exception("Failed to generate content after retries")
+    return response
+
+
+def _record_gemini_usage(response):
+    """Puts a generation's token count on the cost ledger (apps/billing/usage.py)."""
+    usage = getattr(response, 'usage_metadata', None)
+    tokens = getattr(usage, 'total_token_count', 0) or 0
+    record_usage(ProviderUsage.PROVIDER_GEMINI, units=tokens, cost=gemini_cost(tokens))
+
+
+def _parse_topic_line(line):
+    """
+    Extracts the phase title from one line of Gemini output.
+
+    Returns:
+        str or None if the line isn't a numbered/bulleted item
+    """
+    line = line.strip()
+    # Remove numbering: "1. " or "1) " or "- "
+    if line and (line[0].isdigit() or line.startswith('-')):
+        # Remove the number and any punctuation
+        parts = line.split('.', 1)
+        if len(parts) > 1:
+            topic = parts[-1].strip()
+        else:
+            # Try splitting by paren if dot failed
+            parts = line.split(')', 1)
+            if len(parts) > 1:
+                topic = parts[-1].strip()
+            else:
+                topic = line.lstrip('-0123456789. )').strip()
+
+        return topic or None
+
+    return None
+
+
+def _fallback_topics(user_query, skill_level):
+    """Fallback: return a generic structure based on the query"""
+    return [
+        f"{user_query} crash course for {skill_level}",
+        f"{user_query} practical project tutorial",
+        f"Build a real world app with {user_query}",
+        f"{user_query} step by step guide",
+        f"{user_query} best practices and tips",
+    ]
+
+
+
+def _youtube_cache_key(topic, max_results):
+    return f"yt_search_{topic.replace(' ', '_')}_{max_results}"
+
+
+def get_cached_youtube_videos(topic, max_results=3):
+    """Returns cached videos for a topic without touching the network (None on a miss)."""
+    return cache.get(_youtube_cache_key(topic, max_results)) or None
 
 
 def get_youtube_videos_for_topic(topic, max_results=3):
     """
     Fetches YouTube playlists/videos for a specific learning topic.
+    Confident matches from the local catalog are used before the API.
     
     Args:
         topic (str): A roadmap phase/topic
@@ -203,30 +402,53 @@ def get_youtube_videos_for_topic(topic, max_results=3):
     
     Returns:
         list: Video/playlist objects
+
+    Raises:
+        YouTubeQuotaExhausted: every API key is out of quota (fails fast, no retries)
     """
+    cache_key = _youtube_cache_key(topic, max_results)
+
+    with span('youtube_topic', topic=topic) as attrs:
+        # Check cache
+        cached = cache.get(cache_key)
+        incr('cache', cache='youtube', outcome='hit' if cached else 'miss')
+        if cached:
+            attrs['outcome'] = 'cache'
+            return cached
+
+        # Vetted videos from our own catalog cost no quota
+        catalog_videos = find_catalog_videos(topic, max_results)
+        if catalog_videos:
+            attrs['outcome'] = 'catalog'
+            return catalog_videos
+
+        # Concurrent lookups of the same topic share one API call
+        attrs['outcome'] = 'api'
+        return single_flight(
+            f"youtube_search:{cache_key}",
+            lambda: _search_youtube_videos(topic, max_results, cache_key),
+            timeout=getattr(settings, 'YOUTUBE_SINGLE_FLIGHT_TIMEOUT', 15),
+        )
+
+
+def _search_youtube_videos(topic, max_results, cache_key):
     base_url = "https://www.googleapis.com/youtube/v3/search"
-    cache_key = f"yt_search_{topic.replace(' ', '_')}_{max_results}"
-    
-    # Check cache
+
+    # The leader may have been beaten to it while waiting on the lock
     cached = cache.get(cache_key)
     if cached:
         return cached
 
-    # Try each key if quota is exceeded (403)
-    max_retries = 3 
-    try:
-        all_keys = getattr(settings, 'YOUTUBE_API_KEYS', [])
-        if all_keys:
-            max_retries = len(all_keys)
-    except:
-        pass
-
-    for attempt in range(max_retries + 1):
-        api_key = get_next_api_key()
+    # One attempt per key at most (each one is charged SEARCH_COST); the
+    # scheduler skips keys that are cooling down
+    attempts = max(1, len(get_api_keys()))
+
+    for attempt in range(attempts):
+        # Raises YouTubeQuotaExhausted straight away once every key is spent
+        api_key = acquire_api_key(SEARCH_COST)
         if not api_key:
-            if attempt == 0:
-                logger.warning("No YouTube API Key configured")
-            continue
+            logger.warning("No YouTube API Key configured")
+            return []
     
         params = {
             'part': 'snippet',
@@ -240,8 +462,10 @@ def get_youtube_videos_for_topic(topic, max_results=3):
         }
         
         try:
-            response = requests.get(base_url, params=params, timeout=5)
-            
+            with span('youtube_search', topic=topic, key=fingerprint(api_key)[:8], attempt=attempt) as attrs:
+                response = get_session('youtube').get(base_url, params=params)
+                attrs['outcome'] = response.status_code
+
             if response.status_code == 200:
                 data = response.json()
                 videos = []
@@ -267,8 +491,8 @@ def get_youtube_videos_for_topic(topic, max_results=3):
                 return videos
 
             elif response.status_code == 403:
-                # Quota exceeded or permission denied, try next key
-                logger.warning(f"YouTube API Key {api_key[:5]}... failed (403). Rotating to next key.")
+                # Quota exceeded or permission denied: cool this key down, try the next
+                report_key_failure(api_key, error_reason(response))
                 continue
 
             else:
@@ -277,15 +501,164 @@ def get_youtube_videos_for_topic(topic, max_results=3):
                 return []
                 
         except Exception as e:
+            # The session's adapter already retried connection and read errors;
+            # another attempt would only charge another key
             logger.error(f"YouTube Connection Error: {e}")
-            if attempt < max_retries:
-                continue # Retry network errors too
             return []
 
-    return [] # All retries failed
+    return [] # Every key was rejected
+
+
+
+def search_youtube_videos_uncached(topic, max_results=3):
+    """Runs a fresh search for a topic, replacing whatever was cached for it."""
+    cache.delete(_youtube_cache_key(topic, max_results))
+    try:
+        return get_youtube_videos_for_topic(topic, max_results)
+    except YouTubeQuotaExhausted as e:
+        logger.warning(f"YouTube search skipped for '{topic}': {e}")
+        return []
+
+
+def _fetch_videos_in_worker(topic, max_results):
+    """Runs on the YouTube pool; releases the thread's DB connection afterwards."""
+    try:
+        return get_youtube_videos_for_topic(topic, max_results)
+    finally:
+        close_old_connections()
+
+
+def iter_videos_for_topics(topics, max_results=3, deadline=None):
+    """
+    Fetches YouTube videos for several topics concurrently, yielding each
+    topic as soon as its videos are known.
+
+    Cache hits are yielded straight away; only the misses are handed to the
+    shared thread pool. Anything still running when the deadline expires is
+    left to finish in the background (its result lands in the cache) and is
+    yielded with None so the caller can fill it in later.
+
+    Topics are consumed lazily, so when they come from a generator (e.g.
+    iter_roadmap_topics) lookups start while the producer is still running.
+    The deadline starts once the last topic has been submitted.
+
+    Args:
+        topics (iterable): Roadmap phase titles
+        max_results (int): Number of results per topic
+        deadline (float): Overall budget in seconds for all lookups
+
+    Yields:
+        tuple: (topic, list of videos or None if the topic missed the deadline
+            or its lookup hit a database error)
+    """
+    if deadline is None:
+        deadline = getattr(settings, 'ROADMAP_VIDEO_DEADLINE', 8)
+
+    seen = set()
+    futures = {}
+
+    for topic in topics:
+        if topic in seen:
+            continue
+        seen.add(topic)
+        with span('youtube_cache', topic=topic) as attrs:
+            cached = get_cached_youtube_videos(topic, max_results)
+            attrs['outcome'] = 'hit' if cached else 'miss'
+        if cached:
+            incr('cache', cache='youtube', outcome='hit')  # Misses are counted by the worker's lookup
+            yield topic, cached
+            continue
+        # Run in a copy of this context so the worker's spans join the current trace
+        future = _youtube_executor.submit(contextvars.copy_context().run, _fetch_videos_in_worker, topic, max_results)
+        futures[future] = topic
+
+    if not futures:
+        return
+
+    try:
+        for future in as_completed(futures, timeout=deadline):
+            try:
+                videos = future.result()
+            except YouTubeQuotaExhausted as e:
+                logger.warning(f"YouTube fetch skipped for '{futures[future]}': {e}")
+                videos = []
+            except OperationalError as e:
+                # e.g. the quota row was locked: not "no videos", so leave the phase pending
+                logger.error(f"YouTube fetch for '{futures[future]}' hit a database error: {e}")
+                videos = None
+            except Exception as e:
+                logger.error(f"YouTube fetch failed for '{futures[future]}': {e}")
+                videos = []
+            yield futures.pop(future), videos
+    except FuturesTimeout:
+        for future, topic in futures.items():
+            logger.warning(f"YouTube fetch for '{topic}' missed the {deadline}s deadline")
+            yield topic, None
 
 
-def generate_complete_roadmap(user_query, skill_level="beginner", duration_weeks=12):
+def fetch_videos_for_topics(topics, max_results=3, deadline=None):
+    """
+    Collects iter_videos_for_topics() into a dict.
+
+    Returns:
+        dict: topic -> list of videos, or None if the topic missed the deadline
+    """
+    return dict(iter_videos_for_topics(topics, max_results, deadline))
+
+
+def fill_missing_videos(roadmap_data, max_results=3):
+    """
+    Fills in phases that missed the fetch deadline, using the cache only.
+
+    Returns:
+        bool: True if any phase was updated
+    """
+    changed = False
+    for phase in roadmap_data:
+        if not phase.get('videos_pending'):
+            continue
+        cached = get_cached_youtube_videos(phase.get('search_query', ''), max_results)
+        if cached:
+            phase['videos'] = cached
+            phase.pop('videos_pending', None)
+            changed = True
+    return changed
+
+
+def resolve_pending_videos(roadmap_data, max_results=3, deadline=None):
+    """
+    Fills in phases that missed the fetch deadline by finishing their lookups.
+
+    Lookups still running on the pool are joined (single flight) rather than
+    repeated, and finished ones come from the cache. Phases that miss this
+    second deadline stay pending.
+
+    Returns:
+        list: The phases that were filled in (enriched, modified in place)
+    """
+    pending = [phase for phase in roadmap_data if phase.get('videos_pending')]
+    if not pending:
+        return []
+    if deadline is None:
+        deadline = getattr(settings, 'ROADMAP_PENDING_VIDEO_DEADLINE', 30)
+
+    videos_by_topic = fetch_videos_for_topics(
+        [phase.get('search_query', '') for phase in pending], max_results, deadline,
+    )
+    filled = []
+    for phase in pending:
+        videos = videos_by_topic.get(phase.get('search_query', ''))
+        if videos is not None:
+            phase['videos'] = videos
+            phase.pop('videos_pending', None)
+            filled.append(phase)
+
+    if filled:
+        enrich_roadmap_videos(filled)
+    return filled
+
+
+def generate_complete_roadmap(user_query, skill_level="beginner", duration_weeks=12, pipelined=None):
     """
     MAIN FUNCTION: Generates AI-powered roadmap with YouTube videos.
     
@@ -293,30 +666,82 @@ def generate_complete_roadmap(user_query, skill_level="beginner", duration_weeks
         user_query (str): What the user wants to learn
         skill_level (str): Difficulty
         duration_weeks (int): Duration
+        pipelined (bool): Overlap Gemini streaming with YouTube lookups
+                          (defaults to settings.ROADMAP_PIPELINED)
     
     Returns:
         list: List of phase objects compatible with the LearningPath model
     """
+    if pipelined is None:
+        pipelined = getattr(settings, 'ROADMAP_PIPELINED', False)
+
+    if pipelined:
+        return _generate_complete_roadmap_pipelined(user_query, skill_level, duration_weeks)
     
     # Step 1: Use AI to generate learning phases
     roadmap_topics = generate_roadmap_topics(user_query, skill_level, duration_weeks)
     
-    # Step 2: For each phase, fetch YouTube videos
+    # Step 2: Fetch YouTube videos for all phases at once
+    videos_by_topic = fetch_videos_for_topics(roadmap_topics, max_results=3)
+
+    # Step 3: Add durations/view counts and drop dead videos (one batched call)
+    roadmap_phases = build_roadmap_phases(roadmap_topics, duration_weeks, videos_by_topic)
+    enrich_roadmap_videos(roadmap_phases)
+    return roadmap_phases
+
+
+def _generate_complete_roadmap_pipelined(user_query, skill_level, duration_weeks):
+    """
+    Each topic streamed from Gemini is handed straight to the YouTube stage,
+    so video lookups for early phases run while later phases are generated.
+    """
+    roadmap_topics = []
+
+    def stream_topics():
+        for topic in iter_roadmap_topics(user_query, skill_level, duration_weeks):
+            roadmap_topics.append(topic)
+            yield topic
+
+    videos_by_topic = dict(iter_videos_for_topics(stream_topics(), max_results=3))
+
+    roadmap_phases = build_roadmap_phases(roadmap_topics, duration_weeks, videos_by_topic)
+    enrich_roadmap_videos(roadmap_phases)
+    return roadmap_phases
+
+
+def build_roadmap_phases(roadmap_topics, duration_weeks, videos_by_topic):
+    """
+    Assembles the phase objects saved with LearningPath.set_phases().
+
+    Args:
+        roadmap_topics (list): Phase titles in order
+        duration_weeks (int): Duration
+        videos_by_topic (dict): topic -> videos (None if still pending)
+
+    Returns:
+        list: List of phase objects compatible with the LearningPath model
+    """
     roadmap_phases = []
     
     for idx, topic in enumerate(roadmap_topics, 1):
-        videos = get_youtube_videos_for_topic(topic, max_results=3)
+        videos = videos_by_topic.get(topic)
         
         # Estimate duration per phase
         phase_weeks = max(1, duration_weeks // len(roadmap_topics))
         
-        roadmap_phases.append({
+        phase = {
             'phase_number': idx,
             'phase_title': topic, # Use 'phase_title' to match legacy usage or 'title'
             'title': topic,       # Redundant but safe for template compatibility
             'estimated_duration': f"{phase_weeks} week(s)",
-            'videos': videos,
+            'videos': videos or [],
             'search_query': topic
-        })
+        }
+        if videos is None:
+            # Missed the deadline: filled in by the worker once the roadmap is saved
+            # (resolve_pending_videos), or from the cache on a later visit
+            phase['videos_pending'] = True
+
+        roadmap_phases.append(phase)
     
     return roadmap_phases
@@ -1,14 +1,67 @@
+import hashlib
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib import messages
 from django.core.paginator import Paginator
-from .utils import generate_complete_roadmap
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.template.loader import render_to_string
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from django.middleware.csrf import get_token
+from django.conf import settings
+from .utils import fill_missing_videos, generate_roadmap_topics, iter_videos_for_topics, build_roadmap_phases
+from .enrichment import enrich_roadmap_videos
 from .models import LearningPath
+from .tasks import get_or_enqueue_learning_path, claim_learning_path, complete_learning_path, fail_learning_path, save_generation_trace
+from .metrics import registry, generation_trace, span, percentile
+from .singleflight import single_flight
+from .topic_cache import normalize_topic
+from .roadmap_storage import has_pending_videos
 from apps.users.decorators import premium_required
+from apps.billing.usage import usage_context
 import logging
 
 logger = logging.getLogger(__name__)
 
+
+def _refresh_pending_videos(learning_path):
+    """Fill in phases whose videos missed the generation deadline (cache only)."""
+    phases = learning_path.phases
+    if fill_missing_videos(phases):
+        learning_path.set_phases(phases)
+        learning_path.save(update_fields=['roadmap_data', 'updated_at'])
+
+
+def _roadmap_generation_view():
+    """URL name new roadmaps are sent to: streamed inline, or queued for the worker"""
+    return 'roadmap_stream' if getattr(settings, 'ROADMAP_STREAMING', False) else 'roadmap_view'
+
+
+def _roadmap_params(request):
+    """Reads topic / level / duration from the query string"""
+    topic = request.GET.get('topic', '').strip()
+    skill_level = request.GET.get('level', 'beginner')
+    
+    try:
+        duration = int(request.GET.get('duration', 12))
+    except:
+        duration = 12
+
+    return topic, skill_level, duration
+
+
+def _path_for_request(request, topic, skill_level, duration):
+    """
+    Reuse an identical path if one exists. Concurrent identical requests
+    (double clicks, refreshes) are coalesced so only one path is created.
+    """
+    return single_flight(
+        f"learning_path:{request.user.id}:{normalize_topic(topic)}:{skill_level}:{duration}",
+        lambda: get_or_enqueue_learning_path(request.user, topic, skill_level, duration),
+        timeout=10,
+    )
+
 @login_required
 @premium_required
 def learning_home(request):
@@ -22,7 +75,8 @@ def learning_home(request):
     recent_searches = request.session.get('recent_searches', [])[:5]
     
     # Get User's Learning History (Active Learning Paths)
-    learning_paths = LearningPath.objects.filter(user=request.user).order_by('-created_at')[:3]
+    # Summary columns only: roadmap_data is never loaded for the cards
+    learning_paths = LearningPath.objects.filter(user=request.user).only(*LearningPath.LIST_FIELDS).order_by('-created_at')[:3]
     
     context = {
         'categories': categories,
@@ -64,11 +118,11 @@ def search_roadmap(request):
         
         # Check if identical roadmap already exists for this user to avoid duplicates
         existing_path = LearningPath.objects.filter(
-            user=request.user, 
-            topic__iexact=topic, 
+            user=request.user,
+            normalized_topic=normalize_topic(topic),
             skill_level=skill_level,
             duration=duration
-        ).first()
+        ).only('id').first()
 
         if existing_path:
             # Redirect to existing one
@@ -78,7 +132,7 @@ def search_roadmap(request):
         from django.urls import reverse
         from django.utils.http import urlencode
         
-        base_url = reverse('roadmap_view')
+        base_url = reverse(_roadmap_generation_view())
         query_string = urlencode({'topic': topic, 'level': skill_level, 'duration': duration})
         url = f"{base_url}?{query_string}"
         
@@ -89,70 +143,183 @@ def search_roadmap(request):
 @login_required
 @premium_required
 def roadmap_view(request):
-    """Generate and Display roadmap (Creates new DB entry if needed)"""
-    # Get parameters
-    topic = request.GET.get('topic', '').strip()
-    skill_level = request.GET.get('level', 'beginner')
-    
-    try:
-        duration = int(request.GET.get('duration', 12))
-    except:
-        duration = 12
+    """Queue a roadmap for generation (Creates new DB entry if needed)"""
+    topic, skill_level, duration = _roadmap_params(request)
     
     if not topic:
         messages.warning(request, "No topic specified. Try searching for something!")
         return redirect('learning_home')
         
-    # Check if a similar path exists recently (e.g. created/updated in last few minutes? or just exact match)
-    # For now, let's look for exact match to prevent re-generation on page refresh if params are same
-    existing_path = LearningPath.objects.filter(
-        user=request.user, 
-        topic__iexact=topic, 
-        skill_level=skill_level,
-        duration=duration
-    ).first()
-
-    if existing_path:
-        return render(request, 'learning/roadmap.html', {'roadmap': existing_path, 'roadmap_data': existing_path.roadmap_data})
-    
+    # Generation itself happens in the process_roadmaps worker
+    path_id = _path_for_request(request, topic, skill_level, duration)
+    return redirect('roadmap_view_id', path_id=path_id)
+
+@login_required
+@premium_required
+def roadmap_stream(request):
+    """
+    Streaming variant of roadmap_view.
+    Sends the page shell straight away, then the phase titles, then each
+    phase's videos as soon as its YouTube lookup completes.
+    """
+    topic, skill_level, duration = _roadmap_params(request)
+
+    if not topic:
+        messages.warning(request, "No topic specified. Try searching for something!")
+        return redirect('learning_home')
+
+    path_id = _path_for_request(request, topic, skill_level, duration)
+
+    # Already generated, or being generated by a worker: use the normal page
+    if not claim_learning_path(path_id):
+        return redirect('roadmap_view_id', path_id=path_id)
+
+    learning_path = LearningPath.objects.get(id=path_id)
+    response = StreamingHttpResponse(_stream_roadmap(request, learning_path), content_type='text/html')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # Stop nginx from buffering the stream
+    return response
+
+
+STREAM_MARKER = '<!--ROADMAP_STREAM-->'
+
+def _stream_roadmap(request, learning_path):
+    """
+    Yields the roadmap page in chunks while it is generated.
+    If the client disconnects mid-stream the path stays 'generating' and the
+    process_roadmaps worker requeues it once it goes stale.
+    """
+    page = render_to_string('learning/roadmap_stream.html', {'roadmap': learning_path, 'roadmap_data': []}, request=request)
+    head, tail = page.split(STREAM_MARKER, 1)
+    yield head
+
+    with generation_trace() as trace, usage_context(user=learning_path.user_id, feature='roadmap'):
+        with span('generation', mode='stream') as attrs:
+            yield from _stream_roadmap_body(learning_path, attrs)
+    save_generation_trace(learning_path, trace)
+
+    yield tail
+
+
+def _stream_roadmap_body(learning_path, attrs):
+    """The generated part of the streamed page (phases, then videos)."""
     try:
-        # Generate complete roadmap
-        roadmap_data = generate_complete_roadmap(topic, skill_level, duration)
-        
-        # Save to Database
-        learning_path = LearningPath.objects.create(
-            user=request.user,
-            topic=topic,
-            skill_level=skill_level,
-            duration=duration,
-            roadmap_data=roadmap_data
-        )
-        
-        return render(request, 'learning/roadmap.html', {'roadmap': learning_path, 'roadmap_data': roadmap_data})
-        
+        # 1. Phase titles as soon as Gemini answers
+        topics = generate_roadmap_topics(learning_path.topic, learning_path.skill_level, learning_path.duration)
+        phases = build_roadmap_phases(topics, learning_path.duration, {})
+
+        yield "<script>document.getElementById('roadmapStreamStatus').remove();</script>"
+        for phase in phases:
+            yield render_to_string('learning/partials/roadmap_phase.html', {'phase': phase, 'phase_loading': True})
+
+        # 2. Each phase's videos as its lookup completes
+        videos_by_topic = {}
+        for topic, videos in iter_videos_for_topics(topics, max_results=3):
+            videos_by_topic[topic] = videos
+            for phase in phases:
+                if phase['search_query'] != topic:
+                    continue
+                cards = render_to_string('learning/partials/phase_videos.html', {'phase': {**phase, 'videos': videos or []}})
+                yield (
+                    f'<template id="phase-videos-tpl-{phase["phase_number"]}">{cards}</template>'
+                    f'<script>nerdoFillPhase({phase["phase_number"]});</script>'
+                )
+
+        roadmap_data = build_roadmap_phases(topics, learning_path.duration, videos_by_topic)
+        enrich_roadmap_videos(roadmap_data)
+        complete_learning_path(learning_path, roadmap_data)
+
     except Exception as e:
-        logger.error(f"Error generating roadmap: {e}")
-        messages.error(request, f"Could not generate roadmap. Error: {str(e)}")
-        return redirect('learning_home')
+        attrs['outcome'] = 'failed'
+        fail_learning_path(learning_path, e)
+        yield (
+            '<div class="alert alert-danger rounded-4">Could not generate roadmap. '
+            'Please refresh the page to try again.</div>'
+        )
+
+def _roadmap_etag(request, learning_path):
+    """
+    Version of a roadmap page: the row's updated_at, plus a digest of what the
+    shared page chrome shows (nav user details, CSRF token) so a 304 never
+    brings back a stale navbar or logout form.
+    """
+    get_token(request)  # Makes sure the CSRF secret exists (it is rendered in the nav)
+    user = request.user
+    profile = user.profile  # Already loaded by premium_required
+    chrome = '|'.join(str(value) for value in (
+        request.META.get('CSRF_COOKIE', ''), user.username, user.first_name, user.last_name,
+        user.email, profile.avatar.name if profile.avatar else '', profile.is_verified,
+    ))
+    digest = hashlib.md5(chrome.encode('utf-8'), usedforsecurity=False).hexdigest()[:12]
+    return f'"roadmap-{learning_path.id}-{learning_path.updated_at.timestamp():.6f}-{digest}"'
 
 @login_required
 @premium_required
 def roadmap_view_id(request, path_id):
-    """View a specific saved roadmap"""
-    learning_path = get_object_or_404(LearningPath, id=path_id, user=request.user)
-    return render(request, 'learning/roadmap.html', {'roadmap': learning_path, 'roadmap_data': learning_path.roadmap_data})
+    """
+    View a specific saved roadmap (or its generation progress).
+
+    A saved roadmap only changes when its row does, so the page carries an
+    ETag/Last-Modified built from updated_at and repeat visits get a 304.
+    The phase HTML is fragment-cached under the same version (see
+    roadmap.html), so a full render doesn't expand the videos either.
+    """
+    learning_path = get_object_or_404(LearningPath.objects.defer('generation_trace'), id=path_id, user=request.user)
+
+    if not learning_path.is_ready:
+        return render(request, 'learning/roadmap_status.html', {'roadmap': learning_path})
+
+    # Phases that missed the deadline may be in the cache by now (this bumps updated_at)
+    if has_pending_videos(learning_path.roadmap_data):
+        _refresh_pending_videos(learning_path)
+
+    # 1. Conditional GET. Pages with pending videos or flash messages get no
+    # validators: they can change (or must show once) without the row changing.
+    cacheable = not has_pending_videos(learning_path.roadmap_data) and not len(messages.get_messages(request))
+    etag = _roadmap_etag(request, learning_path)
+    last_modified = int(learning_path.updated_at.timestamp())
+    if cacheable:
+        not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if not_modified is not None:
+            return not_modified
+
+    # 2. Full render (roadmap.phases is only expanded on a fragment cache miss)
+    response = render(request, 'learning/roadmap.html', {
+        'roadmap': learning_path,
+        'fragment_ttl': getattr(settings, 'ROADMAP_FRAGMENT_CACHE_TTL', 86400),
+    })
+    patch_cache_control(response, private=True, no_cache=True)  # Revalidate every visit (cheap 304)
+    if cacheable:
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+    return response
+
+@login_required
+@premium_required
+def roadmap_status(request, path_id):
+    """Lightweight JSON endpoint polled by the roadmap status page"""
+    learning_path = get_object_or_404(
+        LearningPath.objects.only('id', 'user_id', 'generation_status'),
+        id=path_id,
+        user=request.user,
+    )
+    return JsonResponse({
+        'id': learning_path.id,
+        'status': learning_path.generation_status,
+        'ready': learning_path.is_ready,
+    })
 
 @login_required
 @premium_required
 def quick_search(request, topic):
     """Quick search from navbar or recent searches"""
     # Check existing first
-    existing = LearningPath.objects.filter(user=request.user, topic__iexact=topic).first()
+    existing = LearningPath.objects.filter(user=request.user, normalized_topic=normalize_topic(topic)).only('id').first()
     if existing:
         return redirect('roadmap_view_id', path_id=existing.id)
 
     from django.urls import reverse
-    url = reverse('roadmap_view') + f'?topic={topic}&level=beginner&duration=12'
+    url = reverse(_roadmap_generation_view()) + f'?topic={topic}&level=beginner&duration=12'
     return redirect(url)
 
 @login_required
@@ -161,8 +328,8 @@ def learning_history(request):
     """View full learning history"""
     from .models import LearningPath
     
-    # Get all paths
-    paths_list = LearningPath.objects.filter(user=request.user).order_by('-created_at')
+    # Get all paths (summary columns only, see LearningPath.LIST_FIELDS)
+    paths_list = LearningPath.objects.filter(user=request.user).only(*LearningPath.LIST_FIELDS).order_by('-created_at')
     
     # Pagination
     paginator = Paginator(paths_list, 9)  # 9 per page
@@ -170,3 +337,45 @@ def learning_history(request):
     learning_paths = paginator.get_page(page)
     
     return render(request, 'learning/history.html', {'learning_paths': learning_paths})
+
+# Persisted generation traces aggregated by the metrics endpoint
+METRICS_RECENT_TRACES = 200
+
+@staff_member_required
+def learning_metrics(request):
+    """
+    Internal metrics for roadmap generation.
+
+    Counters and latency histograms are per process (since its start);
+    'recent' aggregates the traces stored on the last generated paths, so it
+    covers every worker. ?format=prometheus returns the process metrics in
+    Prometheus text format.
+    """
+    if request.GET.get('format') == 'prometheus':
+        return HttpResponse(registry.prometheus(), content_type='text/plain; version=0.0.4')
+
+    traces = (
+        LearningPath.objects.filter(generation_trace__has_key='total_ms')
+        .order_by('-updated_at')
+        .values_list('generation_trace', flat=True)[:METRICS_RECENT_TRACES]
+    )
+
+    # 1. Collect per-stage totals of each generation
+    timings = {'total': []}
+    for trace in traces:
+        timings['total'].append(trace['total_ms'])
+        for stage, ms in trace.get('stages_ms', {}).items():
+            timings.setdefault(stage, []).append(ms)
+
+    # 2. Percentiles per stage
+    recent = {
+        stage: {
+            'count': len(values),
+            'p50_ms': percentile(values, 50),
+            'p95_ms': percentile(values, 95),
+            'p99_ms': percentile(values, 99),
+        }
+        for stage, values in timings.items()
+    }
+
+    return JsonResponse({'process': registry.snapshot(), 'recent': {'generations': len(timings['total']), 'stages': recent}})
@@ -0,0 +1,149 @@
+import hashlib
+import logging
+from datetime import datetime, time, timedelta
+from zoneinfo import ZoneInfo
+from django.conf import settings
+from django.db.models import F, Q
+from django.utils import timezone
+from .models import YouTubeKeyQuota
+from apps.billing.models import ProviderUsage
+from apps.billing.usage import record_usage
+
+logger = logging.getLogger(__name__)
+
+# YouTube Data API quota costs (units per call)
+SEARCH_COST = 100
+VIDEOS_LIST_COST = 1
+
+# Daily quotas reset at midnight Pacific Time
+QUOTA_TIMEZONE = ZoneInfo('America/Los_Angeles')
+
+# Times to re-pick a key after another process charged the chosen one first
+MAX_CHARGE_ATTEMPTS = 5
+
+# 403 reasons that mean "out of quota until tomorrow"
+QUOTA_REASONS = ('quotaExceeded', 'dailyLimitExceeded')
+
+
+class YouTubeQuotaExhausted(Exception):
+    """Raised when no configured API key has quota left."""
+
+
+def get_api_keys():
+    """All configured YouTube API keys (YOUTUBE_API_KEYS, or the single YOUTUBE_API_KEY)."""
+    api_keys = [k for k in getattr(settings, 'YOUTUBE_API_KEYS', []) if k]
+    if not api_keys:
+        single_key = getattr(settings, 'YOUTUBE_API_KEY', '')
+        api_keys = [single_key] if single_key else []
+    return api_keys
+
+
+def fingerprint(api_key):
+    return hashlib.sha256(api_key.encode('utf-8')).hexdigest()
+
+
+def quota_day():
+    """Today's date in the quota's timezone."""
+    return timezone.now().astimezone(QUOTA_TIMEZONE).date()
+
+
+def next_quota_reset():
+    """The next midnight Pacific Time, when daily quotas reset."""
+    tomorrow = quota_day() + timedelta(days=1)
+    return datetime.combine(tomorrow, time.min, tzinfo=QUOTA_TIMEZONE)
+
+
+# (quota day, fingerprints) whose rows this process has already prepared
+_rows_ready_for = None
+
+
+def _ensure_rows(api_keys):
+    global _rows_ready_for
+    today = quota_day()
+    marker = (today, tuple(sorted(fingerprint(k) for k in api_keys)))
+    if _rows_ready_for == marker:
+        return
+
+    YouTubeKeyQuota.objects.bulk_create(
+        [YouTubeKeyQuota(key_fingerprint=fingerprint(k), label=f"{k[:5]}...", quota_day=today) for k in api_keys],
+        ignore_conflicts=True,
+    )
+    # New quota day: everyone starts from zero
+    YouTubeKeyQuota.objects.exclude(quota_day=today).update(quota_day=today, units_used=0)
+    _rows_ready_for = marker
+
+
+def acquire_api_key(cost=SEARCH_COST):
+    """
+    Picks the least-used healthy key and charges `cost` units to it.
+
+    The charge is a single conditional UPDATE (... WHERE units_used + cost
+    <= quota and the key isn't cooling down), so there is no transaction to
+    hold open: on SQLite a SELECT-then-UPDATE transaction from the pool
+    threads deadlocks on the lock upgrade ("database is locked"). If another
+    process charged the key in between, the UPDATE matches nothing and the
+    next-best key is tried.
+
+    Returns:
+        str or None if no key is configured
+
+    Raises:
+        YouTubeQuotaExhausted: every key is cooling down or out of quota
+    """
+    api_keys = get_api_keys()
+    if not api_keys:
+        return None
+
+    keys_by_fingerprint = {fingerprint(k): k for k in api_keys}
+    daily_quota = getattr(settings, 'YOUTUBE_DAILY_QUOTA', 10000)
+    now = timezone.now()
+
+    _ensure_rows(api_keys)
+
+    available = (
+        YouTubeKeyQuota.objects
+        .filter(key_fingerprint__in=keys_by_fingerprint, units_used__lte=daily_quota - cost)
+        .filter(Q(cooldown_until__isnull=True) | Q(cooldown_until__lte=now))
+    )
+
+    for _ in range(MAX_CHARGE_ATTEMPTS):
+        candidate = available.order_by('units_used', 'last_used_at').values('id', 'key_fingerprint').first()
+        if candidate is None:
+            raise YouTubeQuotaExhausted("All YouTube API keys are out of quota until the daily reset")
+
+        charged = available.filter(id=candidate['id']).update(
+            units_used=F('units_used') + cost,
+            last_used_at=now,
+            cooldown_until=None,
+        )
+        if charged:
+            record_usage(ProviderUsage.PROVIDER_YOUTUBE, units=cost)
+            return keys_by_fingerprint[candidate['key_fingerprint']]
+
+    raise YouTubeQuotaExhausted("Could not charge a YouTube API key (every attempt lost to another process)")
+
+
+def report_key_failure(api_key, reason=''):
+    """
+    Puts a key in cooldown after a 403.
+    Quota errors last until the daily reset; anything else (e.g. a key
+    without API access) is retried after YOUTUBE_KEY_ERROR_COOLDOWN seconds.
+    """
+    if reason in QUOTA_REASONS:
+        cooldown_until = next_quota_reset()
+    else:
+        cooldown_until = timezone.now() + timedelta(seconds=getattr(settings, 'YOUTUBE_KEY_ERROR_COOLDOWN', 3600))
+
+    YouTubeKeyQuota.objects.filter(key_fingerprint=fingerprint(api_key)).update(
+        cooldown_until=cooldown_until,
+        last_error=(reason or 'forbidden')[:255],
+    )
+    logger.warning(f"YouTube API Key {api_key[:5]}... failed ({reason or 403}). Cooling down until {cooldown_until}.")
+
+
+def error_reason(response):
+    """Pulls the error reason (e.g. 'quotaExceeded') out of a YouTube API error response."""
+    try:
+        return response.json()['error']['errors'][0]['reason']
+    except Exception:
+        return ''
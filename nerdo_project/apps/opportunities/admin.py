@@ -1,7 +1,16 @@
 from django.contrib import admin
 from .models import Job
+from .facets import invalidate_facets
 
 @admin.register(Job)
 class JobAdmin(admin.ModelAdmin):
-    list_display = ('title', 'category', 'budget', 'deadline')
-    list_filter = ('category', 'job_type')
\ No newline at end of file
+    list_display = ('title', 'category', 'budget', 'deadline', 'is_approved')
+    list_filter = ('is_approved', 'category', 'job_type')
+    actions = ['approve_jobs']
+
+    @admin.action(description="Approve selected jobs")
+    def approve_jobs(self, request, queryset):
+        # update() skips the post_save signal, so refresh the pill counts here
+        updated = queryset.filter(is_approved=False).update(is_approved=True)
+        invalidate_facets()
+        self.message_user(request, f"Approved {updated} job(s).")
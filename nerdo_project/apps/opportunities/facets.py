@@ -0,0 +1,76 @@
+"""
+Job counts for the job market filter pills ("Tech (124)").
+
+One grouped query counts approved jobs matching the current search by
+(category, job_type, experience_level); the per-pill counts are summed from
+those few rows in Python, so the cost doesn't grow with the number of pills.
+
+Results are cached per search text under a generation number kept in the
+database (CacheGeneration), so every worker process sees the same one. Any Job
+change (the save/delete signals in models.py, the admin approve action) bumps
+it, which retires every worker's cached counts at once.
+"""
+import hashlib
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, F
+from .models import Job, CacheGeneration
+from .search import search_jobs
+
+# Filter pill (GET parameter) -> Job field
+FACET_FIELDS = {
+    'category': 'category',
+    'type': 'job_type',
+    'level': 'experience_level',
+}
+
+GENERATION = 'job_facets'
+
+
+def _generation():
+    return CacheGeneration.objects.filter(name=GENERATION).values_list('value', flat=True).first() or 0
+
+
+def invalidate_facets():
+    """Retires every cached count in every process (a job was created, approved, edited or deleted)."""
+    CacheGeneration.objects.bulk_create([CacheGeneration(name=GENERATION)], ignore_conflicts=True)
+    CacheGeneration.objects.filter(name=GENERATION).update(value=F('value') + 1)
+
+
+def _count(query):
+    jobs = Job.objects.filter(is_approved=True)
+    if query:
+        jobs = search_jobs(jobs, query)
+    rows = jobs.order_by().values(*FACET_FIELDS.values()).annotate(total=Count('id'))
+
+    counts = {param: {} for param in FACET_FIELDS}
+    for row in rows:
+        for param, field in FACET_FIELDS.items():
+            counts[param][row[field]] = counts[param].get(row[field], 0) + row['total']
+    return counts
+
+
+def facet_counts(query=None):
+    """
+    Approved jobs per category, type and level under a search.
+
+    Args:
+        query (str): Current search text, if any
+
+    Returns:
+        dict: e.g. {'category': {'Tech': 124, ...}, 'type': {...}, 'level': {...}}
+    """
+    query = ' '.join((query or '').lower().split())
+    digest = hashlib.md5(query.encode('utf-8'), usedforsecurity=False).hexdigest()
+    cache_key = f"job_facets:{_generation()}:{digest}"
+
+    counts = cache.get(cache_key)
+    if counts is None:
+        counts = _count(query)
+        cache.set(cache_key, counts, getattr(settings, 'JOB_FACETS_CACHE_TTL', 600))
+    return counts
+
+
+def pills(choices, counts):
+    """(code, label, count) for each choice, for the filter pill templates."""
+    return [(code, label, counts.get(code, 0)) for code, label in choices]
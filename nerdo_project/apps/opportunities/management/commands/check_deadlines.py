@@ -38,7 +38,7 @@ class Command(BaseCommand):
                     msg = f"Reminder: The job '{job.title}' closes in 3 days ({job.deadline})."
                     
                     self.stdout.write(f" -> Queued SMS for Applicant {user.username} ({phone})")
-                    send_sms(phone, msg)
+                    send_sms(phone, msg, user=user, feature='job_reminder')
                     count += 1
 
             # 4. Notify Reminder Subscribers (NEW)
@@ -56,7 +56,7 @@ class Command(BaseCommand):
                     msg = f"Reminder: The job '{job.title}' closes in 3 days ({job.deadline})."
                     
                     self.stdout.write(f" -> Queued SMS for Subscriber {user.username} ({phone})")
-                    send_sms(phone, msg)
+                    send_sms(phone, msg, user=user, feature='job_reminder')
                     count += 1
         
         self.stdout.write(self.style.SUCCESS(f"Done. Sent {count} reminders."))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from apps.opportunities.search import rebuild_index, search_backend
+
+class Command(BaseCommand):
+    help = 'Rebuilds the job market full-text search index from the Job table'
+
+    def handle(self, *args, **kwargs):
+        backend = search_backend()
+        if backend is None:
+            self.stdout.write(self.style.WARNING(
+                "No search index on this database (not SQLite with FTS5 or PostgreSQL, or migrations not applied). "
+                "Job search uses icontains."
+            ))
+            return
+
+        self.stdout.write(f"Rebuilding job search index ({backend})...")
+        with transaction.atomic():
+            indexed = rebuild_index()
+        self.stdout.write(self.style.SUCCESS(f"Done. Indexed {indexed} jobs."))
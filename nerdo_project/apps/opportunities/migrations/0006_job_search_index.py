@@ -0,0 +1,55 @@
+# Generated by Django 5.2.8 on 2026-10-17 23:50
+
+from django.db import migrations, OperationalError
+
+# Keep in sync with apps/opportunities/search.py
+SQLITE_TABLE = 'opportunities_job_fts'
+POSTGRES_TABLE = 'opportunities_job_search'
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    with schema_editor.connection.cursor() as cursor:
+        if vendor == 'sqlite':
+            try:
+                cursor.execute(
+                    f"CREATE VIRTUAL TABLE {SQLITE_TABLE} USING fts5("
+                    "title, description, tokenize = 'unicode61 remove_diacritics 2')"
+                )
+            except OperationalError:
+                return  # SQLite built without FTS5: search falls back to icontains
+            cursor.execute(
+                f"INSERT INTO {SQLITE_TABLE} (rowid, title, description) "
+                "SELECT id, title, description FROM opportunities_job"
+            )
+        elif vendor == 'postgresql':
+            cursor.execute(
+                f"CREATE TABLE {POSTGRES_TABLE} ("
+                "job_id bigint PRIMARY KEY REFERENCES opportunities_job (id) ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED, "
+                "document tsvector NOT NULL)"
+            )
+            cursor.execute(f"CREATE INDEX {POSTGRES_TABLE}_document_gin ON {POSTGRES_TABLE} USING gin (document)")
+            cursor.execute(
+                f"INSERT INTO {POSTGRES_TABLE} (job_id, document) "
+                "SELECT id, setweight(to_tsvector('simple', title), 'A') || setweight(to_tsvector('simple', description), 'B') "
+                "FROM opportunities_job"
+            )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    table = {'sqlite': SQLITE_TABLE, 'postgresql': POSTGRES_TABLE}.get(vendor)
+    if table:
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {table}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('opportunities', '0005_jobreminder'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
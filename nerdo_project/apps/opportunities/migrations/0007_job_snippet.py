@@ -0,0 +1,37 @@
+# Generated by Django 5.2.8 on 2026-10-17 23:55
+
+from django.db import migrations, models
+from django.utils.text import Truncator
+
+BATCH_SIZE = 500
+SNIPPET_LENGTH = 160  # Job.SNIPPET_LENGTH
+
+
+def fill_snippets(apps, schema_editor):
+    Job = apps.get_model('opportunities', 'Job')
+
+    batch = []
+    for job in Job.objects.only('id', 'description').order_by('id').iterator(chunk_size=BATCH_SIZE):
+        job.snippet = Truncator(' '.join(job.description.split())).chars(SNIPPET_LENGTH)
+        batch.append(job)
+        if len(batch) >= BATCH_SIZE:
+            Job.objects.bulk_update(batch, ['snippet'])
+            batch = []
+    if batch:
+        Job.objects.bulk_update(batch, ['snippet'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('opportunities', '0006_job_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='snippet',
+            field=models.CharField(blank=True, editable=False, help_text='Start of the description for list cards (set on save)', max_length=200),
+        ),
+        migrations.RunPython(fill_snippets, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.8 on 2026-10-18 00:05
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('opportunities', '0007_job_snippet'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(condition=models.Q(('is_approved', True)), fields=['-created_at', '-id'], name='job_approved_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(condition=models.Q(('is_approved', True)), fields=['category', '-created_at', '-id'], name='job_category_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(condition=models.Q(('is_approved', True)), fields=['job_type', '-created_at', '-id'], name='job_type_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(condition=models.Q(('is_approved', True)), fields=['experience_level', '-created_at', '-id'], name='job_level_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['deadline'], name='job_deadline_idx'),
+        ),
+    ]
@@ -1,6 +1,9 @@
 from django.db import models
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
 from django.contrib.auth.models import User
 from django.utils import timezone
+from django.utils.text import Truncator
 
 class Job(models.Model):
     # 1. Job Types
@@ -32,6 +35,7 @@ class Job(models.Model):
     author = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True)
     title = models.CharField(max_length=200, help_text="e.g., 'Looking for a Logo Designer'")
     description = models.TextField(help_text="Detailed requirements, deliverables, and skills needed.")
+    snippet = models.CharField(max_length=200, blank=True, editable=False, help_text="Start of the description for list cards (set on save)")
     budget = models.DecimalField(max_digits=10, decimal_places=2, help_text="Project budget in KES")
     job_type = models.CharField(max_length=20, choices=TYPE_CHOICES, default='Freelance')
     category = models.CharField(max_length=20, choices=CATEGORY_CHOICES, default='Tech')
@@ -45,11 +49,40 @@ class Job(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Columns the job market cards need; the list never loads full descriptions
+    CARD_FIELDS = (
+        'id', 'title', 'snippet', 'budget', 'job_type', 'category', 'experience_level',
+        'created_at', 'author__username',
+    )
+    SNIPPET_LENGTH = 160
+
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Job market: approved jobs newest first, optionally narrowed by one
+            # filter pill, paged on (created_at, id) (see pagination.py)
+            models.Index(fields=['-created_at', '-id'], condition=models.Q(is_approved=True), name='job_approved_recent_idx'),
+            models.Index(fields=['category', '-created_at', '-id'], condition=models.Q(is_approved=True), name='job_category_recent_idx'),
+            models.Index(fields=['job_type', '-created_at', '-id'], condition=models.Q(is_approved=True), name='job_type_recent_idx'),
+            models.Index(fields=['experience_level', '-created_at', '-id'], condition=models.Q(is_approved=True), name='job_level_recent_idx'),
+            # check_deadlines: jobs closing on a given day
+            models.Index(fields=['deadline'], name='job_deadline_idx'),
+        ]
 
     def __str__(self):
         return f"{self.title} by {self.author.username if self.author else 'Unknown'}"
+
+    @classmethod
+    def make_snippet(cls, description):
+        return Truncator(' '.join(description.split())).chars(cls.SNIPPET_LENGTH)
+
+    def save(self, *args, **kwargs):
+        if 'description' not in self.get_deferred_fields():
+            self.snippet = self.make_snippet(self.description)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'description' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'snippet'}
+        super().save(*args, **kwargs)
     
 class Application(models.Model):
     job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name='applications')
@@ -72,4 +105,35 @@ class JobReminder(models.Model):
         unique_together = ('job', 'user') # Prevent duplicate reminders
 
     def __str__(self):
-        return f"Reminder: {self.user.username} -> {self.job.title}"
\ No newline at end of file
+        return f"Reminder: {self.user.username} -> {self.job.title}"
+
+class CacheGeneration(models.Model):
+    """
+    Version number of a group of cached values, shared by every worker
+    process. Cache keys include it, so bumping it retires the whole group
+    in every process at once (see facets.py).
+    """
+    name = models.CharField(max_length=50, unique=True)
+    value = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.name} v{self.value}"
+
+# Keep the full-text search index (apps/opportunities/search.py) in sync
+@receiver(post_save, sender=Job)
+def index_job_for_search(sender, instance, raw=False, **kwargs):
+    if raw:
+        return  # loaddata: run rebuild_job_search afterwards
+    from .search import index_job
+    index_job(instance)
+
+@receiver(post_delete, sender=Job)
+def remove_job_from_search(sender, instance, **kwargs):
+    from .search import remove_job
+    remove_job(instance.id)
+
+# Job market filter pill counts (apps/opportunities/facets.py) go stale on any change
+@receiver([post_save, post_delete], sender=Job)
+def invalidate_job_facets(sender, **kwargs):
+    from .facets import invalidate_facets
+    invalidate_facets()
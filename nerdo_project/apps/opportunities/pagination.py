@@ -0,0 +1,86 @@
+"""
+Keyset (cursor) pagination for the job market.
+
+Instead of OFFSET, each page continues after the last card already shown:
+
+  * Browsing: ordered by (-created_at, -id), continues with
+    created_at <= last.created_at AND (created_at < last.created_at OR id < last.id)
+  * Searching: ordered by (search_rank, -id), continues the same way on the
+    rank (see search.search_jobs)
+
+Both seek straight to the next rows through an index, and one extra row is
+fetched to know whether there is a next page, so no COUNT is needed. The
+cost of a page stays the same however deep the user scrolls.
+"""
+import json
+import base64
+import binascii
+from datetime import datetime
+from django.db.models import Q
+from .search import search_jobs, search_backend, query_terms
+
+PAGE_SIZE = 20
+
+
+def encode_cursor(values):
+    raw = json.dumps(values, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """The cursor's values, or None when it is missing or tampered with (first page)."""
+    if not cursor:
+        return None
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except (binascii.Error, ValueError):
+        return None
+    if not isinstance(values, list) or len(values) != 2:
+        return None
+    return values
+
+
+def paginate_jobs(queryset, cursor=None, query=None, page_size=PAGE_SIZE):
+    """
+    One page of job cards.
+
+    Args:
+        queryset: Filtered Job queryset (not yet searched or ordered)
+        cursor (str): Cursor from the previous page, None for the first page
+        query (str): Search text, if any
+        page_size (int): Cards per page
+
+    Returns:
+        tuple: (list of jobs, cursor for the next page or None)
+    """
+    after = decode_cursor(cursor)
+    ranked = bool(query) and search_backend() is not None and bool(query_terms(query))
+
+    if ranked:
+        try:
+            after = (float(after[0]), int(after[1])) if after else None
+        except (TypeError, ValueError):
+            after = None
+        jobs = list(search_jobs(queryset, query, after=after)[:page_size + 1])
+    else:
+        if query:
+            queryset = search_jobs(queryset, query)  # icontains fallback
+        jobs = queryset.order_by('-created_at', '-id')
+        if after:
+            try:
+                created_at, job_id = datetime.fromisoformat(after[0]), int(after[1])
+            except (TypeError, ValueError):
+                created_at = None
+            if created_at is not None:
+                # The redundant created_at <= bound lets the index seek instead of scan
+                jobs = jobs.filter(Q(created_at__lte=created_at), Q(created_at__lt=created_at) | Q(id__lt=job_id))
+        jobs = list(jobs[:page_size + 1])
+
+    if len(jobs) <= page_size:
+        return jobs, None
+
+    jobs = jobs[:page_size]
+    last = jobs[-1]
+    if ranked:
+        return jobs, encode_cursor([last.search_rank, last.id])
+    return jobs, encode_cursor([last.created_at.isoformat(), last.id])
@@ -0,0 +1,169 @@
+"""
+Full-text search for the job market.
+
+Jobs are indexed in a side table kept in sync by the Job save/delete signals
+(see models.py) and rebuilt with `manage.py rebuild_job_search`:
+
+  * SQLite: an FTS5 virtual table (rowid = job id), ranked with bm25()
+  * PostgreSQL: a tsvector column with a GIN index, ranked with ts_rank_cd()
+
+Every word of the query must match, as a prefix, so "pyth dev" finds
+"Python Developer". Other databases (or an SQLite build without FTS5) fall
+back to icontains.
+"""
+import re
+from django.db import connection
+from django.db.models import Q
+
+SQLITE_TABLE = 'opportunities_job_fts'
+POSTGRES_TABLE = 'opportunities_job_search'
+
+# Title matches count more than description matches
+TITLE_WEIGHT = 10.0
+DESCRIPTION_WEIGHT = 1.0
+
+WORD = re.compile(r'\w+', re.UNICODE)
+
+# Connection aliases whose index table exists. Only found tables are
+# remembered, so a process started before the migration picks it up once it runs.
+_indexed_aliases = set()
+
+
+def search_backend():
+    """'sqlite', 'postgresql' or None when there is no index to query."""
+    vendor = connection.vendor
+    if vendor not in ('sqlite', 'postgresql'):
+        return None
+    if connection.alias not in _indexed_aliases:
+        table = SQLITE_TABLE if vendor == 'sqlite' else POSTGRES_TABLE
+        if table not in connection.introspection.table_names():
+            return None
+        _indexed_aliases.add(connection.alias)
+    return vendor
+
+
+def query_terms(text, max_terms=8):
+    return WORD.findall(str(text).lower())[:max_terms]
+
+
+def _match_expression(terms, vendor):
+    if vendor == 'sqlite':
+        # "pyth"* AND "dev"*  (quoted, so FTS5 syntax in user input is inert)
+        return ' AND '.join(f'"{term}"*' for term in terms)
+    return ' & '.join(f'{term}:*' for term in terms)
+
+
+def _rank_sql(vendor, match):
+    """SQL for a row's relevance (lower is better on both backends) and its params."""
+    if vendor == 'sqlite':
+        return f"bm25({SQLITE_TABLE}, {TITLE_WEIGHT}, {DESCRIPTION_WEIGHT})", []
+    # ts_rank_cd grows with relevance; negate it so lower is better here too
+    return f"-ts_rank_cd({POSTGRES_TABLE}.document, to_tsquery('simple', %s))", [match]
+
+
+def search_jobs(queryset, text, after=None):
+    """
+    Narrows a Job queryset to the jobs matching a search, best match first.
+
+    The index is joined into the same query, so filters already on the
+    queryset (approval, category, type, level) still apply. Results carry a
+    search_rank attribute and are ordered by (search_rank, -id).
+
+    Args:
+        after (tuple): (search_rank, id) of the last job already shown, for
+            keyset pagination (see pagination.py)
+    """
+    vendor = search_backend()
+    terms = query_terms(text)
+    if vendor is None or not terms:
+        return queryset.filter(Q(title__icontains=text) | Q(description__icontains=text))
+
+    match = _match_expression(terms, vendor)
+    job_table = queryset.model._meta.db_table
+    rank_sql, rank_params = _rank_sql(vendor, match)
+
+    if vendor == 'sqlite':
+        where = [f"{SQLITE_TABLE}.rowid = {job_table}.id", f"{SQLITE_TABLE} MATCH %s"]
+        table = SQLITE_TABLE
+    else:
+        where = [f"{POSTGRES_TABLE}.job_id = {job_table}.id", f"{POSTGRES_TABLE}.document @@ to_tsquery('simple', %s)"]
+        table = POSTGRES_TABLE
+    params = [match]
+
+    if after is not None:
+        rank, job_id = after
+        where.append(f"({rank_sql} > %s OR ({rank_sql} = %s AND {job_table}.id < %s))")
+        params += [*rank_params, rank, *rank_params, rank, job_id]
+
+    queryset = queryset.extra(
+        tables=[table],
+        where=where,
+        params=params,
+        select={'search_rank': rank_sql},
+        select_params=rank_params,
+    )
+    return queryset.order_by('search_rank', '-id')
+
+
+def index_job(job):
+    """Adds or refreshes one job in the index (called from the post_save signal)."""
+    vendor = search_backend()
+    if vendor is None:
+        return
+
+    with connection.cursor() as cursor:
+        if vendor == 'sqlite':
+            cursor.execute(f"DELETE FROM {SQLITE_TABLE} WHERE rowid = %s", [job.id])
+            cursor.execute(
+                f"INSERT INTO {SQLITE_TABLE} (rowid, title, description) VALUES (%s, %s, %s)",
+                [job.id, job.title, job.description],
+            )
+        else:
+            cursor.execute(
+                f"INSERT INTO {POSTGRES_TABLE} (job_id, document) VALUES (%s, "
+                "setweight(to_tsvector('simple', %s), 'A') || setweight(to_tsvector('simple', %s), 'B')) "
+                "ON CONFLICT (job_id) DO UPDATE SET document = EXCLUDED.document",
+                [job.id, job.title, job.description],
+            )
+
+
+def remove_job(job_id):
+    """Drops a deleted job from the index (called from the post_delete signal)."""
+    vendor = search_backend()
+    if vendor is None:
+        return
+
+    table, key = (SQLITE_TABLE, 'rowid') if vendor == 'sqlite' else (POSTGRES_TABLE, 'job_id')
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {table} WHERE {key} = %s", [job_id])
+
+
+def rebuild_index():
+    """
+    Re-indexes every job from scratch (after bulk imports or raw SQL edits,
+    which skip the signals).
+
+    Returns:
+        int: Number of jobs indexed
+    """
+    vendor = search_backend()
+    if vendor is None:
+        return 0
+
+    with connection.cursor() as cursor:
+        if vendor == 'sqlite':
+            cursor.execute(f"DELETE FROM {SQLITE_TABLE}")
+            cursor.execute(
+                f"INSERT INTO {SQLITE_TABLE} (rowid, title, description) "
+                "SELECT id, title, description FROM opportunities_job"
+            )
+            cursor.execute(f"INSERT INTO {SQLITE_TABLE} ({SQLITE_TABLE}) VALUES ('optimize')")
+        else:
+            cursor.execute(f"DELETE FROM {POSTGRES_TABLE}")
+            cursor.execute(
+                f"INSERT INTO {POSTGRES_TABLE} (job_id, document) "
+                "SELECT id, setweight(to_tsvector('simple', title), 'A') || setweight(to_tsvector('simple', description), 'B') "
+                "FROM opportunities_job"
+            )
+        cursor.execute("SELECT COUNT(*) FROM opportunities_job")
+        return cursor.fetchone()[0]
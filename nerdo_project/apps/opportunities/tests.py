@@ -1,3 +1,103 @@
+import re
+import datetime
+from io import StringIO
+from unittest import skipUnless
 from django.test import TestCase
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.core.management import call_command
+from django.urls import reverse
+from .models import Job
+from .pagination import paginate_jobs
 
-# Create your tests here.
+
+@skipUnless(connection.vendor in ('sqlite', 'postgresql'), 'Query plan checks cover SQLite and PostgreSQL')
+class JobQueryPlanTests(TestCase):
+    """
+    Runs EXPLAIN on the queries the job market and check_deadlines actually
+    send, against a table large enough for the planner to prefer an index,
+    and fails if one regresses to a full scan of opportunities_job or to
+    sorting it (see the indexes in Job.Meta).
+    """
+    SEED_SIZE = 5000
+
+    FULL_SCAN = {
+        'sqlite': re.compile(r'\bSCAN opportunities_job\b(?! USING)'),
+        'postgresql': re.compile(r'Seq Scan on opportunities_job\b'),
+    }
+    SORT = {
+        'sqlite': re.compile(r'USE TEMP B-TREE FOR ORDER BY'),
+        'postgresql': re.compile(r'\bSort Key\b'),
+    }
+
+    @classmethod
+    def setUpTestData(cls):
+        categories = [code for code, _ in Job.CATEGORY_CHOICES]
+        types = [code for code, _ in Job.TYPE_CHOICES]
+        levels = [code for code, _ in Job.LEVEL_CHOICES]
+        start = datetime.date.today()
+
+        Job.objects.bulk_create([
+            Job(
+                title=f"Python developer {i}" if i % 7 == 0 else f"Job {i}",
+                description="Requirements and deliverables",
+                snippet="Requirements and deliverables",
+                budget=1000 + i,
+                category=categories[i % len(categories)],
+                job_type=types[i % len(types)],
+                experience_level=levels[i % len(levels)],
+                is_approved=i % 10 != 0,
+                deadline=start + datetime.timedelta(days=i % 60),
+            )
+            for i in range(cls.SEED_SIZE)
+        ], batch_size=500)
+        call_command('rebuild_job_search', stdout=StringIO())  # bulk_create skips the index signals
+
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def explain(self, sql):
+        prefix = 'EXPLAIN QUERY PLAN' if connection.vendor == 'sqlite' else 'EXPLAIN'
+        with connection.cursor() as cursor:
+            cursor.execute(f"{prefix} {sql}")
+            return '\n'.join(str(row[-1]) for row in cursor.fetchall())
+
+    def job_queries(self, run):
+        """SQL of every query touching the jobs table while run() executes."""
+        with CaptureQueriesContext(connection) as ctx:
+            run()
+        queries = [q['sql'] for q in ctx.captured_queries if 'opportunities_job"' in q['sql'] and q['sql'].startswith('SELECT')]
+        self.assertTrue(queries, "No job query was captured")
+        return queries
+
+    def assertIndexed(self, queries, ordered=True):
+        for sql in queries:
+            plan = self.explain(sql)
+            self.assertIsNone(self.FULL_SCAN[connection.vendor].search(plan), f"Full scan:\n{plan}\n\n{sql}")
+            if ordered:
+                self.assertIsNone(self.SORT[connection.vendor].search(plan), f"Sort instead of index order:\n{plan}\n\n{sql}")
+
+    def test_market_first_page(self):
+        self.assertIndexed(self.job_queries(lambda: self.client.get(reverse('job_market'), {'partial': 1})))
+
+    def test_market_next_page(self):
+        _, cursor = paginate_jobs(Job.objects.filter(is_approved=True))
+        self.assertIsNotNone(cursor)
+        self.assertIndexed(self.job_queries(lambda: self.client.get(reverse('job_market'), {'partial': 1, 'cursor': cursor})))
+
+    def test_market_filter_pills(self):
+        for param, value in (('category', 'Design'), ('type', 'Contract'), ('level', 'Expert')):
+            with self.subTest(param=param):
+                self.assertIndexed(self.job_queries(lambda: self.client.get(reverse('job_market'), {param: value, 'partial': 1})))
+
+    def test_market_search(self):
+        # Ranked by relevance, so sorting the matches is expected; scanning every job is not
+        self.assertIndexed(self.job_queries(lambda: self.client.get(reverse('job_market'), {'q': 'python', 'partial': 1})), ordered=False)
+
+    def test_detail_pane(self):
+        job = Job.objects.filter(is_approved=True).first()
+        self.assertIndexed(self.job_queries(lambda: self.client.get(reverse('job_detail_pane', args=[job.pk]))), ordered=False)
+
+    def test_deadline_lookup(self):
+        target = datetime.date.today() + datetime.timedelta(days=3)
+        self.assertIndexed(self.job_queries(lambda: list(Job.objects.filter(deadline=target))), ordered=False)
@@ -5,6 +5,7 @@ from . import views
 urlpatterns = [
     path('', views.job_market, name='job_market'),
     path('job/<int:pk>/', views.job_detail, name='job_detail'),
+    path('job/<int:pk>/pane/', views.job_detail_pane, name='job_detail_pane'),
     path('my-jobs/', views.my_jobs, name='my_jobs'),
     path('reminder/<int:job_id>/', views.toggle_reminder, name='toggle_reminder'),
     path('apply/<int:pk>/', views.apply_job, name='apply_job'),
@@ -1,17 +1,30 @@
 
 from django.shortcuts import render, get_object_or_404, redirect
-from django.db.models import Q
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required, user_passes_test
+from django.db.models import Count, Q
 from .models import Job, Application
 from .forms import JobForm
+from .pagination import paginate_jobs
+from .facets import facet_counts, pills
 from apps.users.decorators import premium_required, is_verified_employer
 
+def _detail_queryset(request):
+    """
+    Jobs as the detail pane shows them: author, their profile (logo) and the
+    applicant count in a single query. Unapproved jobs are only visible to
+    their author (preview).
+    """
+    jobs = Job.objects.select_related('author__profile').annotate(application_count=Count('applications'))
+    if request.user.is_authenticated:
+        return jobs.filter(Q(is_approved=True) | Q(author=request.user))
+    return jobs.filter(is_approved=True)
+
 # 1. SPLIT VIEW: JOB MARKET WITH SEARCH & FILTERS
 def job_market(request):
     # Start with all APPROVED jobs
-    # Optimized: Fetch author efficiently
-    jobs = Job.objects.filter(is_approved=True).select_related('author')
+    # Optimized: Cards only load their own columns (+ author name), never full descriptions
+    jobs = Job.objects.filter(is_approved=True).select_related('author').only(*Job.CARD_FIELDS)
     
     # --- SEARCH & FILTER LOGIC ---
     query = request.GET.get('q')
@@ -19,13 +32,6 @@ def job_market(request):
     type_filter = request.GET.get('type')
     level_filter = request.GET.get('level')
 
-    if query:
-        # Search in Title OR Description
-        jobs = jobs.filter(
-            Q(title__icontains=query) | 
-            Q(description__icontains=query)
-        )
-    
     if category_filter:
         jobs = jobs.filter(category=category_filter)
         
@@ -35,6 +41,21 @@ def job_market(request):
     if level_filter:
         jobs = jobs.filter(experience_level=level_filter)
 
+    # Full-text search (best matches first) or newest first, one page at a time
+    jobs, next_cursor = paginate_jobs(jobs, request.GET.get('cursor'), query)
+
+    next_url = None
+    if next_cursor:
+        params = request.GET.copy()
+        params['cursor'] = next_cursor
+        params['partial'] = '1'
+        params.pop('job_id', None)
+        next_url = f"?{params.urlencode()}"
+
+    # Infinite scroll asks for the next page of cards only
+    if request.GET.get('partial'):
+        return render(request, "opportunities/partials/job_cards.html", {"jobs": jobs, "next_url": next_url})
+
     # --- SPLIT VIEW SELECTION ---
     # Check if a specific job was clicked via ?job_id=...
     selected_job_id = request.GET.get('job_id')
@@ -42,21 +63,29 @@ def job_market(request):
     selected_job = None
     if selected_job_id:
         # Allow selecting unapproved jobs IF you are the author (preview)
-        selected_job = get_object_or_404(Job.objects.select_related('author').prefetch_related('applications'), pk=selected_job_id)
-    else:
+        selected_job = get_object_or_404(_detail_queryset(request), pk=selected_job_id)
+    elif jobs:
         # Default to the first job in the filtered list
-        selected_job = jobs.prefetch_related('applications').first() if jobs.exists() else None
+        selected_job = _detail_queryset(request).filter(pk=jobs[0].pk).first()
+
+    # Filter Pills with job counts under the current search (cached)
+    facets = facet_counts(query)
 
     context = {
         "jobs": jobs,
+        "next_url": next_url,
         "selected_job": selected_job,
-        # Pass choices for Filter Pills
-        "categories": Job.CATEGORY_CHOICES,
-        "types": Job.TYPE_CHOICES,
-        "levels": Job.LEVEL_CHOICES,
+        "categories": pills(Job.CATEGORY_CHOICES, facets['category']),
+        "types": pills(Job.TYPE_CHOICES, facets['type']),
+        "levels": pills(Job.LEVEL_CHOICES, facets['level']),
     }
     return render(request, "opportunities/job_list.html", context)
 
+# 1b. SPLIT VIEW: DETAIL PANE ONLY (swapped in client-side when a card is clicked)
+def job_detail_pane(request, pk):
+    selected_job = get_object_or_404(_detail_queryset(request), pk=pk)
+    return render(request, "opportunities/partials/job_detail_pane.html", {"selected_job": selected_job})
+
 # 2. READ ONE (Details Page - Mobile Fallback)
 def job_detail(request, pk):
     # Optimized: Fetch author and applications
@@ -146,7 +175,7 @@ def apply_job(request, pk):
 # 7. My Jobs
 @login_required
 def my_jobs(request):
-    jobs = Job.objects.filter(author=request.user)
+    jobs = Job.objects.filter(author=request.user).select_related('author').only(*Job.CARD_FIELDS)
     return render(request, "opportunities/job_list.html", {"jobs": jobs})
 
 @login_required
@@ -1,7 +1,9 @@
-import requests
 import random
 import urllib3
 from django.conf import settings
+from nerdo_project.http_client import get_session
+from apps.billing.models import ProviderUsage
+from apps.billing.usage import record_usage, parse_cost
 
 # Disable the annoying "InsecureRequestWarning" that appears when verify=False
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
@@ -10,10 +12,11 @@ def generate_otp():
     """Generates a crytographically secure 6-digit code."""
     return str(random.randint(100000, 999999))
 
-def send_sms(phone_number, message):
+def send_sms(phone_number, message, user=None, feature='sms'):
     """
     Generic SMS sender using Africa's Talking (Sandbox).
     Replaces old 'send_otp_sms'.
+    The cost Africa's Talking reports is recorded against `user` and `feature`.
     
     NOTE: usage of 'verify=False' bypasses SSL errors common in Python 3.14 alpha versions.
     This is acceptable for the Sandbox/Dev environment but should be removed for Production.
@@ -54,8 +57,8 @@ def send_sms(phone_number, message):
     try:
         print(f"--> Sending Raw Request to Africa's Talking: {clean_phone}")
         
-        # 5. Send the POST Request
-        response = requests.post(url, data=data, headers=headers, verify=False)
+        # 5. Send the POST Request (pooled session, with connect/read timeouts)
+        response = get_session('africastalking').post(url, data=data, headers=headers, verify=False)
         
         # 6. Analyze the Response
         if response.status_code == 201:
@@ -63,6 +66,7 @@ def send_sms(phone_number, message):
             recipients = response_data.get('SMSMessageData', {}).get('Recipients', [])
             if recipients and recipients[0]['status'] == 'Success':
                 print(f"--> SMS Success! Cost: {recipients[0]['cost']}")
+                record_usage(ProviderUsage.PROVIDER_SMS, cost=parse_cost(recipients[0]['cost']), user=user, feature=feature)
                 return True
             else:
                 print(f"--> API accepted request but delivery failed: {response.text}")
@@ -75,9 +79,9 @@ def send_sms(phone_number, message):
         print(f"--> CRITICAL SMS ERROR: {str(e)}")
         return False
 
-def send_otp_sms(phone_number, otp):
+def send_otp_sms(phone_number, otp, user=None):
     """
     Wrapper for backward compatibility.
     """
     msg = f"Your Nerdo.Africa verification code is: {otp}"
-    return send_sms(phone_number, msg)
\ No newline at end of file
+    return send_sms(phone_number, msg, user=user, feature='otp')
\ No newline at end of file
@@ -285,7 +285,7 @@ def password_reset_request(request):
                     
                     # Removed debug prints here
                     
-                    send_otp_sms(real_phone, otp)
+                    send_otp_sms(real_phone, otp, user=user)
                     
                     request.session['reset_phone'] = real_phone
                     
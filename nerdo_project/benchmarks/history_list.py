@@ -0,0 +1,131 @@
+"""
+Benchmark: learning history/home list queries for a user with many saved roadmaps.
+
+Compares loading full LearningPath rows (roadmap_data included) with the
+summary-column query the list views use. Runs against a throwaway test
+database, so it never touches real data.
+
+Usage (from nerdo_project/):
+    python benchmarks/history_list.py --paths 500 --repeat 20
+"""
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'nerdo_project.settings')
+os.environ.setdefault('SECRET_KEY', 'benchmark')
+
+import django
+django.setup()
+
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.test.runner import DiscoverRunner
+
+
+def make_phases(path_number, phase_count=8, videos_per_phase=3):
+    phases = []
+    for phase_number in range(1, phase_count + 1):
+        title = f"Topic {path_number} phase {phase_number}"
+        phases.append({
+            'phase_number': phase_number,
+            'phase_title': title,
+            'title': title,
+            'estimated_duration': '1 week(s)',
+            'search_query': title,
+            'videos': [
+                {
+                    'video_id': f"v{path_number % 50}_{phase_number}_{n}",
+                    'title': f"Video {n} for {title}",
+                    'description': 'Lorem ipsum dolor sit amet ' * 6,
+                    'thumbnail': f"https://i.ytimg.com/vi/v{path_number}_{phase_number}_{n}/mqdefault.jpg",
+                    'playlist_id': '',
+                    'channel': 'Some Channel',
+                    'published_at': '2024-01-01',
+                    'duration': '12:34',
+                    'view_count': 123456,
+                }
+                for n in range(videos_per_phase)
+            ],
+        })
+    return phases
+
+
+def timed(label, func, repeat):
+    func()  # Warm up
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    elapsed = (time.perf_counter() - start) / repeat * 1000
+    print(f"{label:<45} {elapsed:8.2f} ms")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--paths', type=int, default=500, help='Saved roadmaps for the benchmark user')
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    from django.contrib.auth.models import User
+    from django.core.paginator import Paginator
+    from apps.learning.models import LearningPath, Video
+    from apps.learning.topic_cache import normalize_topic
+
+    user = User.objects.create(username='benchmark')
+    paths = []
+    videos_by_id = {}
+    for n in range(args.paths):
+        topic = f"Topic {n}"
+        # bulk_create skips save(), which fills normalized_topic
+        path = LearningPath(user=user, topic=topic, normalized_topic=normalize_topic(topic), duration=12, generation_status=LearningPath.GENERATION_READY)
+        videos_by_id.update(path.set_phases(make_phases(n), store_videos=False))
+        paths.append(path)
+    Video.store_many(videos_by_id)
+    LearningPath.objects.bulk_create(paths)
+    print(f"{args.paths} roadmaps, {Video.objects.count()} shared videos\n")
+
+    base = LearningPath.objects.filter(user=user).order_by('-created_at')
+
+    def full_home():
+        list(base.all()[:3])
+
+    def summary_home():
+        list(base.only(*LearningPath.LIST_FIELDS)[:3])
+
+    def full_history():
+        # Every page of the history list
+        paginator = Paginator(base.all(), 9)
+        for number in paginator.page_range:
+            list(paginator.page(number))
+
+    def summary_history():
+        paginator = Paginator(base.only(*LearningPath.LIST_FIELDS), 9)
+        for number in paginator.page_range:
+            list(paginator.page(number))
+
+    def full_scan():
+        list(base.all())
+
+    def summary_scan():
+        list(base.only(*LearningPath.LIST_FIELDS))
+
+    timed('home (3 cards), full rows', full_home, args.repeat)
+    timed('home (3 cards), summary columns', summary_home, args.repeat)
+    timed('history (all pages), full rows', full_history, args.repeat)
+    timed('history (all pages), summary columns', summary_history, args.repeat)
+    full = timed('all paths at once, full rows', full_scan, args.repeat)
+    summary = timed('all paths at once, summary columns', summary_scan, args.repeat)
+    print(f"\nSummary columns: {full / summary:.1f}x faster for a full scan")
+
+
+if __name__ == '__main__':
+    runner = DiscoverRunner(verbosity=0)
+    setup_test_environment()
+    old_config = runner.setup_databases()
+    try:
+        main()
+    finally:
+        runner.teardown_databases(old_config)
+        teardown_test_environment()
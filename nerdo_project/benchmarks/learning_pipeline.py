@@ -0,0 +1,384 @@
+"""
+Benchmark: roadmap generation end to end, fully offline.
+
+Gemini is replaced by a fake model and YouTube by `responses` callbacks that
+replay the recorded responses in benchmarks/fixtures/provider_responses.json,
+with configurable latency, jitter and 429/403 injection. Requests go through
+the same path as the process_roadmaps worker (enqueue -> claim -> generate ->
+save) at the requested concurrency, on a throwaway test database.
+
+Reports p50/p95/p99 latency, provider call counts and cache hit ratios.
+
+Usage (from nerdo_project/):
+    python benchmarks/learning_pipeline.py --requests 200 --concurrency 8
+    python benchmarks/learning_pipeline.py --gemini-429-rate 0.2 --youtube-403-rate 0.05
+    python benchmarks/learning_pipeline.py --pipelined --json results.json
+"""
+import os
+import sys
+import json
+import time
+import random
+import hashlib
+import argparse
+import tempfile
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse, parse_qs
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'nerdo_project.settings')
+os.environ.setdefault('SECRET_KEY', 'benchmark')
+
+import django
+django.setup()
+
+import responses
+from unittest import mock
+from django.core.cache import cache
+from django.db import close_old_connections, connections
+from django.test.utils import setup_test_environment, teardown_test_environment, override_settings
+from django.test.runner import DiscoverRunner
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'provider_responses.json')
+
+SEARCH_URL = "https://www.googleapis.com/youtube/v3/search"
+VIDEOS_URL = "https://www.googleapis.com/youtube/v3/videos"
+
+QUERIES = [
+    'Python', 'JavaScript', 'Data Science', 'Machine Learning', 'Web Development', 'UI/UX Design',
+    'Digital Marketing', 'SQL', 'Django', 'React', 'Cloud Computing', 'Cybersecurity', 'Excel',
+    'Graphic Design', 'Video Editing', 'Blockchain Development', 'Flutter', 'Java', 'Go', 'Rust',
+]
+SKILL_LEVELS = ['beginner', 'intermediate', 'advanced']
+DURATIONS = [4, 8, 12, 24]
+
+
+class Stats:
+    """Thread-safe counters shared by the fakes and the driver."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counts = Counter()
+        self.latencies = []
+
+    def incr(self, key, amount=1):
+        with self.lock:
+            self.counts[key] += amount
+
+    def record(self, seconds):
+        with self.lock:
+            self.latencies.append(seconds)
+
+
+class ProviderSimulator:
+    """Recorded responses plus latency/jitter/error injection for both providers."""
+
+    def __init__(self, options, stats):
+        with open(FIXTURES) as fixture_file:
+            self.fixtures = json.load(fixture_file)
+        self.options = options
+        self.stats = stats
+        self.random = random.Random(options.seed)
+        self.random_lock = threading.Lock()
+
+    def _roll(self, rate):
+        with self.random_lock:
+            return self.random.random() < rate
+
+    def _sleep(self, latency_ms):
+        with self.random_lock:
+            jitter = self.random.uniform(-self.options.jitter, self.options.jitter)
+        time.sleep(max(0, latency_ms + jitter) / 1000)
+
+    @staticmethod
+    def _fill(template, **values):
+        text = json.dumps(template)
+        for key, value in values.items():
+            text = text.replace('{' + key + '}', json.dumps(str(value))[1:-1])
+        return json.loads(text)
+
+    # Gemini
+
+    def gemini_text(self, prompt):
+        query = prompt.split('"')[1] if prompt.count('"') >= 2 else 'the topic'
+        with self.random_lock:
+            template = self.random.choice(self.fixtures['gemini_topics'])
+        return self._fill(template, query=query.title(), level='beginner')
+
+    def fake_model_class(self):
+        simulator = self
+
+        class FakeResponse:
+            def __init__(self, text):
+                self.text = text
+                self.candidates = []
+
+        class FakeChunk:
+            def __init__(self, text):
+                self.text = text
+
+        class FakeGenerativeModel:
+            def __init__(self, *args, **kwargs):
+                pass
+
+            def generate_content(self, prompt, stream=False, **kwargs):
+                simulator.stats.incr('gemini_calls')
+                simulator._sleep(simulator.options.gemini_latency)
+                if simulator._roll(simulator.options.gemini_429_rate):
+                    simulator.stats.incr('gemini_429')
+                    raise Exception("429 Quota exceeded for quota metric 'Generate Content API requests per minute'")
+
+                text = simulator.gemini_text(prompt)
+                if not stream:
+                    return FakeResponse(text)
+
+                # Stream line by line, spreading the latency over the chunks
+                lines = text.split('\n')
+
+                def chunks():
+                    for line in lines:
+                        simulator._sleep(simulator.options.gemini_latency / len(lines))
+                        yield FakeChunk(line + '\n')
+                return chunks()
+
+        return FakeGenerativeModel
+
+    # YouTube
+
+    def _forbidden(self):
+        self.stats.incr('youtube_403')
+        body = self._fill(self.fixtures['youtube_403'], reason=self.options.youtube_403_reason)
+        return 403, {}, json.dumps(body)
+
+    def search_callback(self, request):
+        self.stats.incr('youtube_search_calls')
+        self._sleep(self.options.youtube_latency)
+        if self._roll(self.options.youtube_403_rate):
+            return self._forbidden()
+
+        params = parse_qs(urlparse(request.url).query)
+        query = params.get('q', [''])[0]
+        max_results = int(params.get('maxResults', ['3'])[0])
+        item = self.fixtures['youtube_search']['items'][0]
+        items = []
+        for n in range(max_results):
+            video_id = hashlib.md5(f"{query}:{n}".encode()).hexdigest()[:11]
+            items.append(self._fill(item, video_id=video_id, query=query))
+        body = dict(self.fixtures['youtube_search'], items=items)
+        return 200, {}, json.dumps(body)
+
+    def videos_callback(self, request):
+        self.stats.incr('youtube_videos_list_calls')
+        self._sleep(self.options.youtube_latency)
+        if self._roll(self.options.youtube_403_rate):
+            return self._forbidden()
+
+        ids = parse_qs(urlparse(request.url).query).get('id', [''])[0].split(',')
+        items = [self._fill(self.fixtures['videos_list_item'], video_id=video_id) for video_id in ids if video_id]
+        return 200, {}, json.dumps({'kind': 'youtube#videoListResponse', 'items': items})
+
+
+def percentile(values, pct):
+    if not values:
+        return 0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+def build_workload(options):
+    """Zipf-like mix: a few popular requests repeat, the tail is unique-ish."""
+    rng = random.Random(options.seed)
+    combos = [
+        (query, level, duration)
+        for query in QUERIES[:options.unique_queries] for level in SKILL_LEVELS for duration in DURATIONS
+    ]
+    rng.shuffle(combos)
+    weights = [1 / (rank + 1) for rank in range(len(combos))]
+    return rng.choices(combos, weights=weights, k=options.requests)
+
+
+def run(options):
+    from django.contrib.auth.models import User
+    from apps.learning import utils, catalog
+    from apps.learning.models import LearningPath, RoadmapTopicCache
+    from apps.learning.tasks import get_or_enqueue_learning_path, claim_learning_path, process_learning_path
+    from apps.billing.usage import flush_usage
+
+    stats = Stats()
+    simulator = ProviderSimulator(options, stats)
+    cache.clear()
+    catalog.invalidate_catalog()
+
+    # Count how phase lookups were answered
+    real_catalog = utils.find_catalog_videos
+    real_cached = utils.get_cached_youtube_videos
+
+    def counting_catalog(topic, max_results=3):
+        videos = real_catalog(topic, max_results)
+        stats.incr('catalog_hits' if videos else 'catalog_misses')
+        return videos
+
+    def counting_cached(topic, max_results=3):
+        videos = real_cached(topic, max_results)
+        stats.incr('video_cache_hits' if videos else 'video_cache_misses')
+        return videos
+
+    users = [User(username=f"bench{n}") for n in range(options.requests)]
+    User.objects.bulk_create(users)
+    users = list(User.objects.filter(username__startswith='bench').order_by('id'))
+    workload = build_workload(options)
+
+    def one_request(n):
+        topic, level, duration = workload[n]
+        close_old_connections()
+        start = time.perf_counter()
+        try:
+            path_id = get_or_enqueue_learning_path(users[n], topic, level, duration)
+            if claim_learning_path(path_id):
+                ok = process_learning_path(LearningPath.objects.get(id=path_id))
+                stats.incr('generated' if ok else 'failed')
+        except Exception as e:
+            stats.incr('errors')
+            print(f"  request {n} failed: {e}")
+        finally:
+            stats.record(time.perf_counter() - start)
+            close_old_connections()
+
+    with responses.RequestsMock(assert_all_requests_are_fired=False) as provider_mock, \
+            mock.patch.object(utils.get_genai(), 'GenerativeModel', simulator.fake_model_class()), \
+            mock.patch.object(utils, 'find_catalog_videos', counting_catalog), \
+            mock.patch.object(utils, 'get_cached_youtube_videos', counting_cached):
+        provider_mock.add_callback(responses.GET, SEARCH_URL, callback=simulator.search_callback)
+        provider_mock.add_callback(responses.GET, VIDEOS_URL, callback=simulator.videos_callback)
+
+        wall_start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options.concurrency) as pool:
+            list(pool.map(one_request, range(options.requests)))
+        wall = time.perf_counter() - wall_start
+
+    # Write buffered ledger rows now, not at exit (the test DB is gone by then)
+    flush_usage()
+
+    counts = stats.counts
+    topic_cache_hits = sum(RoadmapTopicCache.objects.values_list('hits', flat=True))
+    lookups = counts['video_cache_hits'] + counts['video_cache_misses']
+    catalog_lookups = counts['catalog_hits'] + counts['catalog_misses']
+    latencies_ms = [seconds * 1000 for seconds in stats.latencies]
+
+    # A roadmap saved as ready can still have lost phases (e.g. a lookup hit "database is locked")
+    empty_phases = pending_phases = 0
+    for path in LearningPath.objects.filter(generation_status=LearningPath.GENERATION_READY).only('roadmap_data'):
+        for phase in path.roadmap_data:
+            pending_phases += bool(phase.get('videos_pending'))
+            empty_phases += not phase.get('video_ids') and not phase.get('videos_pending')
+
+    # Per-stage time spent in each generation, from the stored traces
+    stage_ms = {}
+    for trace in LearningPath.objects.filter(generation_trace__has_key='total_ms').values_list('generation_trace', flat=True):
+        for stage, ms in trace['stages_ms'].items():
+            stage_ms.setdefault(stage, []).append(ms)
+
+    return {
+        'requests': options.requests,
+        'concurrency': options.concurrency,
+        'pipelined': options.pipelined,
+        'wall_seconds': round(wall, 3),
+        'throughput_rps': round(options.requests / wall, 2) if wall else 0,
+        'latency_ms': {
+            'p50': round(percentile(latencies_ms, 50), 1),
+            'p95': round(percentile(latencies_ms, 95), 1),
+            'p99': round(percentile(latencies_ms, 99), 1),
+            'max': round(max(latencies_ms, default=0), 1),
+        },
+        'provider_calls': {
+            'gemini': counts['gemini_calls'],
+            'gemini_429': counts['gemini_429'],
+            'youtube_search': counts['youtube_search_calls'],
+            'youtube_videos_list': counts['youtube_videos_list_calls'],
+            'youtube_403': counts['youtube_403'],
+        },
+        'cache': {
+            'topic_cache_hits': topic_cache_hits,
+            'video_cache_hit_ratio': round(counts['video_cache_hits'] / lookups, 3) if lookups else 0,
+            'catalog_hit_ratio': round(counts['catalog_hits'] / catalog_lookups, 3) if catalog_lookups else 0,
+        },
+        'outcomes': {
+            'generated': counts['generated'],
+            'failed': counts['failed'],
+            'errors': counts['errors'],
+            'phases_without_videos': empty_phases,
+            'phases_still_pending': pending_phases,
+        },
+        'stages_ms': {
+            stage: f"p50 {round(percentile(values, 50), 1)}  p95 {round(percentile(values, 95), 1)}"
+            for stage, values in sorted(stage_ms.items())
+        },
+    }
+
+
+def print_report(result):
+    print(f"\n{result['requests']} requests at concurrency {result['concurrency']}"
+          f"{' (pipelined)' if result['pipelined'] else ''}: "
+          f"{result['wall_seconds']}s wall, {result['throughput_rps']} req/s")
+    for section in ('latency_ms', 'provider_calls', 'cache', 'outcomes', 'stages_ms'):
+        print(f"\n{section}")
+        for key, value in result[section].items():
+            print(f"  {key:<24} {value}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Offline benchmark for the roadmap generation pipeline')
+    parser.add_argument('--requests', type=int, default=100)
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--unique-queries', type=int, default=10, help=f'Distinct topics in the mix (max {len(QUERIES)})')
+    parser.add_argument('--gemini-latency', type=float, default=1500, help='Milliseconds per Gemini generation')
+    parser.add_argument('--youtube-latency', type=float, default=250, help='Milliseconds per YouTube call')
+    parser.add_argument('--jitter', type=float, default=100, help='Milliseconds of +/- random latency')
+    parser.add_argument('--gemini-429-rate', type=float, default=0.0, help='Share of Gemini calls that fail with 429')
+    parser.add_argument('--youtube-403-rate', type=float, default=0.0, help='Share of YouTube calls that fail with 403')
+    parser.add_argument('--youtube-403-reason', default='forbidden', help="403 reason, e.g. 'quotaExceeded' to exhaust keys")
+    parser.add_argument('--pipelined', action='store_true', help='Use the pipelined Gemini -> YouTube path')
+    parser.add_argument('--no-catalog', action='store_true', help='Disable the local video catalog')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json', help='Also write the results to this file (for comparing runs)')
+    options = parser.parse_args()
+
+    # File-backed test database: SQLite's shared in-memory DB can't take concurrent
+    # writers. Everything else (timeout, transaction mode) stays as in production,
+    # so lock contention shows up here the way it would there.
+    db_file = os.path.join(tempfile.mkdtemp(), 'benchmark.sqlite3')
+    connections['default'].settings_dict['TEST']['NAME'] = db_file
+
+    overrides = override_settings(
+        YOUTUBE_API_KEYS=['bench-key-1', 'bench-key-2', 'bench-key-3'],
+        YOUTUBE_DAILY_QUOTA=10 ** 9,
+        YOUTUBE_KEY_ERROR_COOLDOWN=1,
+        ROADMAP_PIPELINED=options.pipelined,
+        VIDEO_CATALOG_ENABLED=not options.no_catalog,
+        VIDEO_CATALOG_INDEX_TTL=5,
+    )
+
+    runner = DiscoverRunner(verbosity=0, interactive=False)
+    setup_test_environment()
+    old_config = runner.setup_databases()
+    try:
+        with overrides:
+            result = run(options)
+    finally:
+        runner.teardown_databases(old_config)
+        teardown_test_environment()
+        if os.path.exists(db_file):
+            os.remove(db_file)
+
+    print_report(result)
+    if options.json:
+        with open(options.json, 'w') as output:
+            json.dump(result, output, indent=2)
+        print(f"\nResults written to {options.json}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+"""
+Benchmark: web worker boot time and memory.
+
+Each run starts a fresh interpreter that does what a gunicorn worker does
+before its first request: build the WSGI application and load the URLconf
+(which imports every app's views). Reports boot time and peak RSS, which
+heavy SDKs got imported along the way, and the slowest top-level imports
+(from python -X importtime).
+
+Usage (from nerdo_project/):
+    python benchmarks/worker_startup.py --runs 5
+    python benchmarks/worker_startup.py --top 25 --json startup.json
+"""
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Provider SDKs that should only load on first use
+HEAVY_MODULES = ['google.generativeai', 'grpc', 'google.protobuf', 'pydantic', 'django_daraja.mpesa.core']
+
+BOOT_SCRIPT = """
+import os, sys, json, time, resource
+start = time.perf_counter()
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'nerdo_project.settings')
+from django.core.wsgi import get_wsgi_application
+get_wsgi_application()
+from django.urls import get_resolver
+get_resolver().url_patterns
+boot_ms = (time.perf_counter() - start) * 1000
+rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+if sys.platform == 'darwin':
+    rss_kb //= 1024  # macOS reports bytes
+print(json.dumps({
+    'boot_ms': boot_ms,
+    'rss_mb': rss_kb / 1024,
+    'modules': len(sys.modules),
+    'loaded': [name for name in %r if name in sys.modules],
+}))
+""" % (HEAVY_MODULES,)
+
+
+def boot_once(importtime=False):
+    env = {**os.environ, 'SECRET_KEY': os.environ.get('SECRET_KEY', 'benchmark')}
+    command = [sys.executable] + (['-X', 'importtime'] if importtime else []) + ['-c', BOOT_SCRIPT]
+    completed = subprocess.run(command, cwd=PROJECT_DIR, env=env, capture_output=True, text=True, check=True)
+    return json.loads(completed.stdout.strip().splitlines()[-1]), completed.stderr
+
+
+def slowest_imports(importtime_log, top):
+    """Top-level packages by cumulative import time (microseconds -> ms)."""
+    totals = {}
+    for line in importtime_log.splitlines():
+        # "import time:  self [us] | cumulative | imported package" (nested ones are indented)
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line.split('|', 2)
+        if name.startswith('  '):
+            continue  # Nested import, already counted in its parent
+        totals[name.strip()] = totals.get(name.strip(), 0) + int(cumulative) / 1000
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measures web worker boot time and memory')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=15, help='Slowest top-level imports to list')
+    parser.add_argument('--json', help='Also write the results to this file')
+    options = parser.parse_args()
+
+    runs = [boot_once()[0] for _ in range(options.runs)]
+    _, importtime_log = boot_once(importtime=True)
+
+    result = {
+        'runs': options.runs,
+        'boot_ms': {
+            'median': round(statistics.median(run['boot_ms'] for run in runs), 1),
+            'min': round(min(run['boot_ms'] for run in runs), 1),
+        },
+        'rss_mb': round(statistics.median(run['rss_mb'] for run in runs), 1),
+        'modules': runs[-1]['modules'],
+        'heavy_modules_loaded': runs[-1]['loaded'],
+        'slowest_imports_ms': {name: round(ms, 1) for name, ms in slowest_imports(importtime_log, options.top)},
+    }
+
+    print(f"\nWorker boot over {options.runs} runs: median {result['boot_ms']['median']} ms "
+          f"(min {result['boot_ms']['min']} ms), peak RSS {result['rss_mb']} MB, {result['modules']} modules")
+    print(f"Heavy SDKs loaded at boot: {', '.join(result['heavy_modules_loaded']) or 'none'}")
+    print("\nSlowest top-level imports")
+    for name, ms in result['slowest_imports_ms'].items():
+        print(f"  {name:<40} {ms} ms")
+
+    if options.json:
+        with open(options.json, 'w') as f:
+            json.dump(result, f, indent=2)
+        print(f"\nResults written to {options.json}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+"""
+Shared outbound HTTP client.
+
+Every third-party API we call (YouTube, Africa's Talking, M-Pesa) goes through
+one long-lived requests.Session per provider, so connections are pooled and
+kept alive instead of paying DNS + TCP + TLS setup on every call.
+
+Usage:
+    from nerdo_project.http_client import get_session
+    response = get_session('youtube').get(url, params=params)
+"""
+import logging
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Per-provider defaults; override any of these keys via settings.HTTP_PROVIDERS.
+#   timeout:          (connect, read) seconds, applied when a call doesn't pass its own
+#   retries:          attempts after the first one
+#   backoff:          base of the exponential backoff between retries (seconds)
+#   backoff_jitter:   random extra delay (seconds) so workers don't retry in lockstep
+#   status_forcelist: statuses worth retrying (idempotent methods only)
+#   pool_maxsize:     keep-alive connections kept per host
+DEFAULT_PROVIDER = {
+    'timeout': (3.05, 10),
+    'retries': 2,
+    'backoff': 0.5,
+    'backoff_jitter': 0.5,
+    'status_forcelist': (500, 502, 503, 504),
+    'pool_maxsize': 10,
+}
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+def provider_config(provider):
+    """Defaults merged with the provider's entry in settings.HTTP_PROVIDERS."""
+    overrides = getattr(settings, 'HTTP_PROVIDERS', {}).get(provider, {})
+    return {**DEFAULT_PROVIDER, **overrides}
+
+
+class ProviderSession(requests.Session):
+    """A requests.Session that applies the provider's timeout when none is given."""
+
+    def __init__(self, provider, timeout):
+        super().__init__()
+        self.provider = provider
+        self.default_timeout = timeout
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault('timeout', self.default_timeout)
+        return super().request(method, url, **kwargs)
+
+
+def build_session(provider):
+    """
+    Creates a pooled session for one provider.
+
+    Retries use urllib3's default allowed methods, so GETs are retried on
+    connection errors, read errors and 5xx responses, while POSTs (SMS, STK
+    push) are only retried when the connection was never established, so a
+    payment or message is never sent twice.
+    """
+    config = provider_config(provider)
+
+    retry = Retry(
+        total=config['retries'],
+        connect=config['retries'],
+        read=config['retries'],
+        status=config['retries'],
+        backoff_factor=config['backoff'],
+        backoff_jitter=config['backoff_jitter'],
+        status_forcelist=config['status_forcelist'],
+        respect_retry_after_header=True,
+        raise_on_status=False,  # Hand the last response back to the caller
+    )
+    adapter = HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=config['pool_maxsize'],
+        max_retries=retry,
+    )
+
+    session = ProviderSession(provider, config['timeout'])
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def get_session(provider):
+    """
+    The process-wide session for a provider, created on first use.
+
+    Sessions are safe to share between the YouTube fetch threads: each
+    request checks a connection out of the pool for its own use.
+    """
+    session = _sessions.get(provider)
+    if session is not None:
+        return session
+
+    with _sessions_lock:
+        if provider not in _sessions:
+            _sessions[provider] = build_session(provider)
+            logger.info(f"Created pooled HTTP session for {provider}")
+        return _sessions[provider]
+
+
+def close_sessions():
+    """Closes every pooled connection (e.g. after forking a worker)."""
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
+
+
+class SessionModule:
+    """
+    Stand-in for the `requests` module inside a third-party library.
+
+    Libraries that call `requests.get(...)` / `requests.post(...)` directly
+    can be pointed at a pooled session by replacing their module-level
+    `requests` name with one of these (see apps.billing.mpesa.get_mpesa_client).
+    """
+
+    exceptions = requests.exceptions
+
+    def __init__(self, provider):
+        self.provider = provider
+
+    def __getattr__(self, name):
+        # Anything other than the HTTP verbs (e.g. requests.auth) comes from requests itself
+        return getattr(requests, name)
+
+    def request(self, method, url, **kwargs):
+        return get_session(self.provider).request(method, url, **kwargs)
+
+    def get(self, url, **kwargs):
+        return get_session(self.provider).get(url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return get_session(self.provider).post(url, **kwargs)
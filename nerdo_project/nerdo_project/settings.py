@@ -162,10 +162,59 @@ YOUTUBE_API_KEYS = [
     os.getenv('YOUTUBE_API_KEY2'),
     os.getenv('YOUTUBE_API_KEY3'),
 ]
+YOUTUBE_DAILY_QUOTA = int(os.getenv('YOUTUBE_DAILY_QUOTA', 10000))  # Units per key per day (search = 100)
+YOUTUBE_KEY_ERROR_COOLDOWN = 3600  # Seconds to skip a key after a non-quota 403
+YOUTUBE_VIDEO_CACHE_TIMEOUT = 7 * 86400  # Seconds to trust videos.list metadata (duration, views, availability)
+YOUTUBE_FETCH_WORKERS = int(os.getenv('YOUTUBE_FETCH_WORKERS', 4))  # Concurrent per-phase searches
+ROADMAP_VIDEO_DEADLINE = float(os.getenv('ROADMAP_VIDEO_DEADLINE', 8))  # Seconds for all phase lookups
+ROADMAP_PENDING_VIDEO_DEADLINE = 30  # Seconds the worker then waits on the late lookups before writing them back
+ROADMAP_STREAMING = os.getenv('ROADMAP_STREAMING', 'False') == 'True'  # Stream new roadmaps inline instead of queueing them
+ROADMAP_PIPELINED = os.getenv('ROADMAP_PIPELINED', 'False') == 'True'  # Start video lookups while Gemini is still streaming topics
+ROADMAP_FRAGMENT_CACHE_TTL = 86400  # Seconds to keep a saved roadmap's rendered phases (keyed by updated_at)
+
+# Local video catalog (apps/learning/catalog.py), consulted before YouTube search
+VIDEO_CATALOG_ENABLED = os.getenv('VIDEO_CATALOG_ENABLED', 'True') == 'True'
+VIDEO_CATALOG_MIN_COVERAGE = 0.8  # Share (idf-weighted) of the phase's words a video must match
+VIDEO_CATALOG_MIN_RESULTS = 2  # Confident matches needed before skipping the API
+VIDEO_CATALOG_INDEX_TTL = 600  # Seconds before each process rebuilds its index
+VIDEO_CATALOG_MAX_TOPICS = 20  # Phase titles kept per video in catalog_topics (oldest dropped first)
+
+# Request coalescing (apps/learning/singleflight.py), shared across processes via the DB
+SINGLE_FLIGHT_TIMEOUT = int(os.getenv('SINGLE_FLIGHT_TIMEOUT', 30))  # Max seconds a follower waits
+SINGLE_FLIGHT_RESULT_TTL = 10  # Seconds a leader's result stays available to followers
+YOUTUBE_SINGLE_FLIGHT_TIMEOUT = 15
+
+# Outbound HTTP (nerdo_project/http_client.py): one pooled keep-alive session per provider.
+# timeout is (connect, read) seconds; POSTs are only retried on connection errors.
+HTTP_PROVIDERS = {
+    'youtube': {'timeout': (3.05, 5), 'pool_maxsize': max(10, YOUTUBE_FETCH_WORKERS * 2)},
+    'africastalking': {'timeout': (3.05, 10)},
+    'mpesa': {'timeout': (3.05, 30)},  # STK push waits on Safaricom's backend
+}
 
 # Gemini Generative AI
 GEMINI_API_KEY = os.getenv('GEMINI_API_KEY', '')
 CACHE_TIMEOUT = int(os.getenv('CACHE_TIMEOUT', 86400))
+GEMINI_MAX_RETRIES = 2  # Attempts per request on 429/5xx (backoff is ~1s, not the old 2-8s)
+GEMINI_COST_PER_1K_TOKENS = os.getenv('GEMINI_COST_PER_1K_TOKENS', '0')  # KES, for the provider usage ledger
+
+# Provider usage ledger (apps/billing/usage.py): calls are buffered in memory and written in batches
+USAGE_FLUSH_INTERVAL = 10  # Seconds between ledger writes
+USAGE_FLUSH_MAX_KEYS = 200  # Distinct day/user/provider/feature rows buffered before an early write
+
+# Provider circuit breakers (apps/learning/circuit_breaker.py), shared across processes via the DB
+CIRCUIT_BREAKER_FAILURE_THRESHOLD = int(os.getenv('CIRCUIT_BREAKER_FAILURE_THRESHOLD', 5))  # Consecutive failures before opening
+CIRCUIT_BREAKER_COOLDOWN = int(os.getenv('CIRCUIT_BREAKER_COOLDOWN', 60))  # Seconds to fail fast before a probe
+CIRCUIT_BREAKER_PROBE_TIMEOUT = 30  # Seconds before a probe that never reported back is replaced
+
+# Shared roadmap topic cache (see apps/learning/topic_cache.py)
+ROADMAP_TOPIC_CACHE_TTL = int(os.getenv('ROADMAP_TOPIC_CACHE_TTL', 30 * 86400))  # Seconds
+ROADMAP_TOPIC_CACHE_MAX_ENTRIES = int(os.getenv('ROADMAP_TOPIC_CACHE_MAX_ENTRIES', 5000))
+ROADMAP_TOPIC_VARIANTS = int(os.getenv('ROADMAP_TOPIC_VARIANTS', 3))  # Variants served per query (1 = always reuse)
+ROADMAP_TOPIC_CACHE_TOUCH_INTERVAL = int(os.getenv('ROADMAP_TOPIC_CACHE_TOUCH_INTERVAL', 300))  # Seconds between last_used_at updates of a cache entry
+
+# Job market filter pill counts (apps/opportunities/facets.py); retired in every worker on any Job change
+JOB_FACETS_CACHE_TTL = 600  # Seconds
 
 # Cache Configuration (LocMemCache for dev)
 CACHES = {